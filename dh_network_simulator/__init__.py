@@ -5,4 +5,22 @@ from .dh_network_simulator_core import *
 
 # Set absolute path of dhn_sim directory
 import os
-dir = os.path.dirname(os.path.realpath(__file__))
\ No newline at end of file
+dir = os.path.dirname(os.path.realpath(__file__))
+
+# Modules which are imported on first use of their attributes (fast start of headless worker processes)
+_LAZY_ATTRIBUTES = {'TimeseriesRunner': '.timeseries',
+                    'ParameterSweep': '.sweep',
+                    'DFData': 'pandapower.timeseries.data_sources.frame_data',
+                    'MemmapProfileData': '.io.profile_data'}
+
+
+def __getattr__(name):
+    """
+        Import the lazily loaded attributes of the package on first access.
+    """
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+    import importlib
+    module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+    return getattr(module, name)
@@ -0,0 +1,101 @@
+import numpy as np
+from .network_index import get_component_table
+
+
+class ComponentHandle():
+    """
+        Reusable handle of parameters of several network components of the same type, resolved once by name.
+
+        The handle stores the row positions of the components grouped by parameter (column), so that whole value
+        vectors are read from the network tables and written to them with one indexing operation per parameter.
+        Controller attributes are resolved to the controller objects and set in bulk across the objects.
+
+        get() reads the result table of the component type if it contains the parameter (e.g. 'mdot_from_kg_per_s'),
+        otherwise the component table (e.g. 'qext_w'). set() writes to the component table.
+    """
+
+    def __init__(self, type, names, parameters, net=None, index=None):
+        self.type = type
+        self.names = [names] if isinstance(names, str) else list(names)
+        if isinstance(parameters, str):
+            parameters = [parameters] * len(self.names)
+        self.parameters = list(parameters)
+        if len(self.parameters) != len(self.names):
+            raise ValueError(f'Number of parameters ({len(self.parameters)}) and names ({len(self.names)}) differ.')
+
+        self.groups = []
+        self.objects = []
+        self.index_signature = None
+        if net is not None:
+            self.resolve(net, index)
+
+    def __repr__(self):
+        return f'ComponentHandle(type={self.type}, components={len(self)}, parameters={len(self.groups)})'
+
+    def __len__(self):
+        return len(self.names)
+
+    def resolve(self, net, index):
+        """
+            Resolve the component names to row positions (or controller objects) by the NetworkIndex.
+        """
+        table = get_component_table(net, self.type)
+        if table is None:
+            raise KeyError(f"Component type '{self.type}' cannot be found.")
+        labels = index.positions(self.type, self.names)
+
+        if self.type == 'controller':
+            self.objects = list(table.loc[labels, 'object'].values)
+            self.groups = [(parameter, np.flatnonzero(np.array(self.parameters) == parameter), None)
+                           for parameter in dict.fromkeys(self.parameters)]
+        else:
+            # Result parameters are checked on first use if no results are available yet
+            result = net['res_' + self.type] if 'res_' + self.type in net else None
+            missing = [parameter for parameter in self.parameters
+                       if parameter not in table and (result is None or parameter not in result)]
+            if missing and result is not None:
+                raise KeyError(f"Parameters {sorted(set(missing))} of type '{self.type}' cannot be found.")
+            rows = table.index.get_indexer(labels)
+            self.groups = []
+            for parameter in dict.fromkeys(self.parameters):
+                positions = np.flatnonzero(np.array(self.parameters) == parameter)
+                self.groups.append((parameter, positions, rows[positions]))
+
+        self.index_signature = (id(index), index.build_count)
+
+        return self
+
+    def get(self, net):
+        """
+            Read the values of all resolved parameters as vector (ordered like the names).
+        """
+        values = np.full(len(self), np.nan)
+        if self.type == 'controller':
+            for parameter, positions, _ in self.groups:
+                values[positions] = [getattr(self.objects[p], parameter) for p in positions]
+            return values
+
+        result = net['res_' + self.type] if 'res_' + self.type in net else None
+        table = get_component_table(net, self.type)
+        for parameter, positions, rows in self.groups:
+            source = result if result is not None and parameter in result else table
+            if parameter not in source:
+                raise KeyError(f"Parameter '{parameter}' of type '{self.type}' cannot be found.")
+            values[positions] = source[parameter].values[rows]
+
+        return values
+
+    def set(self, net, values):
+        """
+            Write a vector of values (ordered like the names) to the resolved parameters.
+        """
+        values = np.broadcast_to(np.asarray(values), (len(self),))
+        if self.type == 'controller':
+            for parameter, positions, _ in self.groups:
+                for p in positions:
+                    setattr(self.objects[p], parameter, values[p])
+            return
+
+        table = get_component_table(net, self.type)
+        for parameter, positions, rows in self.groups:
+            table.iloc[rows, table.columns.get_loc(parameter)] = values[positions]
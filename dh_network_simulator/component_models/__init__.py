@@ -1 +1,2 @@
-from .valve_control import *
\ No newline at end of file
+from .valve_control import *
+from .joint_valve_control import *
@@ -0,0 +1,197 @@
+import numpy as np
+import pandapower.control as control
+
+# Setpoints below this mass flow close the valve (equal to CtrlValve)
+MDOT_CLOSED_KG_PER_S = 1e-6
+
+# Largest change of (1 + loss_coeff) per controller iteration
+MAX_STEP_FACTOR = 10
+
+
+class JointValveCtrl(control.basic_controller.Controller):
+    """
+        Coordinated flow controller of several control valves, a drop-in replacement for a set of CtrlValves.
+
+        The replaced CtrlValves are set out of service and only keep their setpoints, tolerances, gains and limits
+        (set_value_of_network_component() on the CtrlValves still works). All
+        loss coefficients of the opened valves are updated together by one Newton-like step per controller iteration,
+        based on an estimate of the sensitivity matrix of the valve mass flows to the loss coefficients. The estimate is
+        refined by Broyden (secant) updates, which capture the hydraulic interaction of the valves, and is kept between
+        the time steps.
+
+        The sensitivities are estimated with respect to ln(1 + loss_coeff), as the mass flow of a valve dominated branch
+        is proportional to loss_coeff^(-1/2), i.e. d(mdot)/d(ln loss_coeff) = - mdot / 2 (initial diagonal estimate).
+        The steps are limited to a factor of MAX_STEP_FACTOR of (1 + loss_coeff). Valves at their limits of loss_coeff
+        are excluded from the step and dependent valves (e.g. valves in series) are covered by a least squares step.
+
+        The controller iterations of the latest control run and of all runs are counted (iterations, total_iterations).
+    """
+
+    def __init__(self, net, controllers, name='joint_valve_ctrl', in_service=True, recycle=True, order=0, level=None,
+                 **kwargs):
+        controllers = list(controllers)
+        if level is None:
+            level = min([c.level for c in controllers])
+        super().__init__(net, in_service=in_service, recycle=recycle, order=order, level=level,
+                         initial_powerflow=True, **kwargs)
+
+        # Init controller attributes
+        self.in_service = bool(net.controller['in_service'].iloc[-1])
+        self.initial_run = bool(net.controller['initial_run'].iloc[-1])
+        self.level = net.controller['level'].iloc[-1]
+        self.order = net.controller['order'].iloc[-1]
+        self.recycle = bool(net.controller['recycle'].iloc[-1])
+        self.applied = False
+
+        # specific attributes
+        self.name = name
+        self.controllers = controllers
+        self.valve_ids = np.array([c.valve_id for c in controllers])
+
+        # Replaced controllers only keep their parameters
+        for c in controllers:
+            c.in_service = False
+        replaced = net.controller['object'].apply(lambda c: any([c is r for r in controllers]))
+        net.controller.loc[replaced.values, 'in_service'] = False
+
+        # Sensitivity estimate and secant state
+        self.jacobian = None
+        self.previous = None
+        self.iterations = 0
+        self.total_iterations = 0
+        self.broyden_updates = 0
+
+    def __repr__(self):
+        return f'JointValveCtrl(name={self.name}, valves={len(self.controllers)}, iterations={self.iterations})'
+
+    def initialize_control(self, net):
+        """
+            At the beginning of each run_control call reset the iteration counter and the secant state.
+        """
+        self.iterations = 0
+        self.previous = None
+
+    def is_converged(self, net):
+        mdot, mdot_set = self._get_mass_flows(net)
+        tol = np.array([c.tol for c in self.controllers])
+
+        self.applied = bool(np.all(np.abs(mdot - mdot_set) <= tol))
+        return self.applied
+
+    def write_to_net(self, net):
+        for c in self.controllers:
+            net.valve.at[c.valve_id, "loss_coefficient"] = c.loss_coeff
+            net.valve.at[c.valve_id, "opened"] = c.opened
+
+    def control_step(self, net):
+        mdot, mdot_set = self._get_mass_flows(net)
+
+        # Set valve status (valves with zero setpoints are closed)
+        for c, setpoint in zip(self.controllers, mdot_set):
+            if setpoint < MDOT_CLOSED_KG_PER_S:
+                c.opened = False
+        opened = np.array([bool(c.opened) for c in self.controllers])
+
+        # Logarithmic loss coefficients and mass flow residuals
+        x = np.log1p(np.array([c.loss_coeff for c in self.controllers], dtype=np.float64))
+        x_min = np.log1p(np.array([c.loss_coeff_min for c in self.controllers], dtype=np.float64))
+        x_max = np.log1p(np.array([c.loss_coeff_max for c in self.controllers], dtype=np.float64))
+        residual = mdot - mdot_set
+
+        self._update_jacobian(x, mdot, mdot_set, opened)
+
+        # Newton-like step of the valves which are not pushed beyond their limits of loss_coeff
+        free = opened.copy()
+        step = self._get_newton_step(residual, mdot_set, free)
+        bounded = ((x <= x_min) & (step < 0)) | ((x >= x_max) & (step > 0))
+        if (bounded & free).any():
+            free &= ~bounded
+            step = self._get_newton_step(residual, mdot_set, free)
+
+        # Validate limits of loss_coeff
+        x_new = np.clip(x + step, x_min, x_max)
+        for c, value, is_free in zip(self.controllers, np.expm1(x_new), free):
+            if is_free:
+                c.loss_coeff = value
+
+        self.previous = (x, mdot, opened)
+        self.write_to_net(net)
+        self.iterations += 1
+        self.applied = True
+
+    def time_step(self, net, time):
+        # Read new setpoints of the replaced controllers from their profiles
+        for c in self.controllers:
+            c.time_step(net, time)
+
+        self.applied = False
+
+    def finalize_control(self, net):
+        self.total_iterations += self.iterations
+
+    def _get_mass_flows(self, net):
+        mdot = np.nan_to_num(net.res_valve['mdot_from_kg_per_s'].loc[self.valve_ids].values.astype(np.float64))
+        mdot_set = np.array([c.mdot_set_kg_per_s for c in self.controllers], dtype=np.float64)
+        return mdot, mdot_set
+
+    def _update_jacobian(self, x, mdot, mdot_set, opened):
+        """
+            Broyden update of the sensitivity estimate by the secant of the latest controller iteration.
+        """
+        if self.jacobian is None:
+            self.jacobian = _get_initial_jacobian(mdot_set)
+        if self.previous is None or not np.array_equal(self.previous[2], opened):
+            return
+
+        dx = np.where(opened, x - self.previous[0], 0.)
+        d_mdot = np.where(opened, mdot - self.previous[1], 0.)
+        norm = dx @ dx
+        if not norm > 0:
+            return
+
+        jacobian = self.jacobian + np.outer(d_mdot - self.jacobian @ dx, dx) / norm
+
+        # Keep the estimate if the update is invalid (mass flows decrease with increasing loss coefficients)
+        if np.all(np.isfinite(jacobian)) and np.all(np.diag(jacobian)[opened] < 0):
+            self.jacobian = jacobian
+            self.broyden_updates += 1
+
+    def _get_newton_step(self, residual, mdot_set, free):
+        """
+            Newton-like step of the logarithmic loss coefficients of the free valves. The least squares solution covers
+            dependent valves, the initial diagonal estimate is used if the estimate cannot be solved.
+        """
+        step = np.zeros(len(residual))
+        if not free.any():
+            return step
+
+        jacobian = self.jacobian[np.ix_(free, free)]
+        try:
+            step[free] = np.linalg.lstsq(jacobian, - residual[free], rcond=None)[0]
+        except np.linalg.LinAlgError:
+            step[free] = np.nan
+        if not np.all(np.isfinite(step)):
+            step[free] = - residual[free] / np.diag(_get_initial_jacobian(mdot_set))[free]
+
+        max_step = np.log(MAX_STEP_FACTOR)
+        return np.clip(step, - max_step, max_step)
+
+    def to_json(self):
+        return {'in_service': self.in_service,
+                'initial_run': self.initial_run,
+                'level': self.level,
+                'order': self.order,
+                'recycle': self.recycle,
+                'name': self.name,
+                'type': 'JointValveCtrl',
+                'object': {
+                    'controllers': [c.name for c in self.controllers]
+                }
+        }
+
+
+def _get_initial_jacobian(mdot_set):
+    """
+        Initial diagonal sensitivity estimate of valve dominated branches d(mdot)/d(ln loss_coeff) = - mdot / 2.
+    """
+    return np.diag(- np.maximum(np.abs(mdot_set), 0.1) / 2)
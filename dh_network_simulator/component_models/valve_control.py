@@ -1,11 +1,8 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import pandapower as ppo
 import pandapipes as ppi
 import pandapower.control as control
 import pandas as pd
-import pandapower.timeseries as ts
-from simple_pid import PID
 import time
 import random
 
@@ -53,7 +50,18 @@ class CtrlValve(control.basic_controller.Controller):
         # init plot
         self.enable_plotting = enable_plotting
 
+    @property
+    def gain(self):
+        # Proportional gain of the PID control
+        return self.pid.Kp
+
+    @gain.setter
+    def gain(self, value):
+        self.pid.Kp = value
+
     def _init_pid_control(self, gain):
+        from simple_pid import PID
+
         self.pid = PID(gain, 0, 0)
         self.pid.output_limits = (None, None)  # Output will always be above 0, but with no upper bound
         self.loss_coeff_min = 0
@@ -67,6 +75,7 @@ class CtrlValve(control.basic_controller.Controller):
 
         # clear plot
         if self.enable_plotting == True:
+            import matplotlib.pyplot as plt
             self.axes = plt.gca()
             self.axes.set_xlim(0, 100)
             self.axes.set_ylim(0, 1)
@@ -162,6 +171,8 @@ class CtrlValve(control.basic_controller.Controller):
     #     self.mdot_set_kg_per_s = value
 
     def update_plot(self, net):
+        import matplotlib.pyplot as plt
+
         mdot = net.res_valve.at[self.valve_id, 'mdot_from_kg_per_s']
         mdot_set = self.mdot_set_kg_per_s
 
@@ -191,7 +202,7 @@ class CtrlValve(control.basic_controller.Controller):
                     'mdot_set_kg_per_s': self.mdot_set_kg_per_s,
                     'profile_name': self.profile_name,
                     'tol': self.tol,
-                    'gain': self.pid.Kp,
+                    'gain': self.gain,
                     'loss_coeff_min': self.loss_coeff_min,
                     'loss_coeff_max': self.loss_coeff_max,
                     'enable_plotting': self.enable_plotting
@@ -0,0 +1,3 @@
+from .mosaik_adapter import DHNetworkMosaikAdapter, META
+from .fmi import DHNetworkFMU, ValueReferenceTable, build_fmu, load_fmu, write_model_description
+from .fmu_runner import simulate_fmu, read_model_description
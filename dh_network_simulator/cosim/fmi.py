@@ -0,0 +1,450 @@
+import json
+import os
+import tempfile
+import uuid
+import zipfile
+import xml.etree.ElementTree as ET
+import numpy as np
+from ..dh_network_simulator import DHNetworkSimulator
+from ..network_index import get_component_table
+
+FMI_VERSION = '2.0'
+FMU_CONFIG_FILE = 'resources/fmu.json'  # inputs, outputs and simulation mode of the FMU
+FMU_NETWORK_DIR = 'resources/network/'  # readable network files (json_readable) of the FMU
+
+# Default input parameters (component tables and controller attributes) of the FMU variables
+DEFAULT_INPUTS = {'controller': ['mdot_set_kg_per_s'],
+                  'heat_exchanger': ['qext_w'],
+                  'ext_grid': ['t_k'],
+                  'sink': ['mdot_kg_per_s'],
+                  'source': ['mdot_kg_per_s']}
+
+# Default output parameters (result tables) of the FMU variables
+DEFAULT_OUTPUTS = {'junction': ['p_bar', 't_k'],
+                   'pipe': ['mdot_from_kg_per_s', 't_from_k', 't_to_k'],
+                   'valve': ['mdot_from_kg_per_s', 'p_from_bar', 'p_to_bar'],
+                   'heat_exchanger': ['mdot_from_kg_per_s', 't_from_k', 't_to_k'],
+                   'ext_grid': ['mdot_kg_per_s']}
+
+# Units of the parameter suffixes and their SI base units (exponents and factor)
+UNITS = {'_kg_per_s': ('kg/s', {'kg': 1, 's': -1}),
+         '_m_per_s': ('m/s', {'m': 1, 's': -1}),
+         '_bar': ('bar', {'kg': 1, 'm': -1, 's': -2, 'factor': 1e5}),
+         '_w': ('W', {'kg': 1, 'm': 2, 's': -3}),
+         '_k': ('K', {'K': 1})}
+
+# Read value of result parameters before the first simulated time step (no result tables)
+_MISSING_RESULT = np.nan
+
+
+class ValueReferenceTable():
+    """
+        Array-backed mapping of FMI value references to the network component tables.
+
+        The value references are numbered block by block, one block per (component type, parameter). Each value
+        reference is mapped to its block and its position in the block by two index arrays, and each block stores the
+        row positions of its components in the component table (controller objects for controller attributes). get()
+        and set() group the requested value references by block and read or write one vector per block, without name
+        lookups. The grouping of recurring value reference arrays is cached.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = [(type, parameter, list(names)) for type, parameter, names in blocks]
+        sizes = [len(names) for _, _, names in self.blocks]
+        self.block_ids = np.repeat(np.arange(len(self.blocks)), sizes)
+        self.offsets = np.concatenate([np.arange(size) for size in sizes]) if sizes else np.zeros(0, dtype=np.int64)
+        self.rows = []
+        self.groupings = {}
+        self.index_signature = None
+
+    def __repr__(self):
+        return f'ValueReferenceTable(value_references={len(self)}, blocks={len(self.blocks)})'
+
+    def __len__(self):
+        return len(self.block_ids)
+
+    def resolve(self, net, index):
+        """
+            Resolve the component names of the blocks to row positions (or controller objects) by the NetworkIndex.
+        """
+        self.rows = []
+        for type, parameter, names in self.blocks:
+            table = get_component_table(net, type)
+            if table is None:
+                raise KeyError(f"Component type '{type}' cannot be found.")
+            labels = index.positions(type, names)
+            if type == 'controller':
+                self.rows.append(list(table.loc[labels, 'object'].values))
+            else:
+                self.rows.append(table.index.get_indexer(labels))
+        self.index_signature = (id(index), index.build_count)
+
+        return self
+
+    def get(self, net, value_references):
+        """
+            Read the values of the value references (result table of the component type if it contains the parameter,
+            otherwise the component table).
+        """
+        values = np.empty(len(value_references))
+        for block, positions, offsets in self._get_grouping(value_references):
+            type, parameter, _ = self.blocks[block]
+            rows = self.rows[block]
+            if type == 'controller':
+                values[positions] = [getattr(rows[offset], parameter) for offset in offsets]
+                continue
+
+            result = net['res_' + type] if 'res_' + type in net else None
+            source = result if result is not None and parameter in result else get_component_table(net, type)
+            if parameter not in source or not len(source):
+                values[positions] = _MISSING_RESULT
+                continue
+            values[positions] = source[parameter].values[rows[offsets]]
+
+        return values
+
+    def set(self, net, value_references, values):
+        """
+            Write the values of the value references to the component tables (or controller attributes).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) != len(value_references):
+            raise ValueError(f'Number of values ({len(values)}) and value references ({len(value_references)}) '
+                             f'differ.')
+        for block, positions, offsets in self._get_grouping(value_references):
+            type, parameter, _ = self.blocks[block]
+            rows = self.rows[block]
+            if type == 'controller':
+                for offset, value in zip(offsets, values[positions]):
+                    setattr(rows[offset], parameter, value)
+                continue
+
+            table = get_component_table(net, type)
+            table.iloc[rows[offsets], table.columns.get_loc(parameter)] = values[positions]
+
+    def _get_grouping(self, value_references):
+        # Blocks, positions in the value reference array and offsets in the blocks of the value references
+        value_references = np.asarray(value_references, dtype=np.int64)
+        key = value_references.tobytes()
+        grouping = self.groupings.get(key)
+        if grouping is not None:
+            return grouping
+
+        if len(value_references) and (value_references.min() < 0 or value_references.max() >= len(self)):
+            invalid = value_references[(value_references < 0) | (value_references >= len(self))]
+            raise KeyError(f'Value references {invalid[:5].tolist()} do not exist.')
+        blocks = self.block_ids[value_references]
+        order = np.argsort(blocks, kind='stable')
+        bounds = np.flatnonzero(np.diff(blocks[order])) + 1
+        grouping = [(blocks[positions[0]], positions, self.offsets[value_references[positions]])
+                    for positions in np.split(order, bounds) if len(positions)]
+
+        # Bound the cache of the groupings (arbitrary value reference arrays of interactive use)
+        if len(self.groupings) >= 64:
+            self.groupings.clear()
+        self.groupings[key] = grouping
+
+        return grouping
+
+
+class DHNetworkFMU():
+    """
+        FMI 2.0 co-simulation slave of the DHNetworkSimulator.
+
+        The model variables are generated from the loaded network: inputs are component parameters and controller
+        attributes (e.g. mass flow setpoints, qext_w of heat exchangers, t_k of external grids) and outputs are result
+        parameters (res_* tables), named '<type>.<component name>.<parameter>'. The methods implement the FMI functions
+        of a co-simulation slave (set_real(): fmi2SetReal, get_real(): fmi2GetReal, do_step(): fmi2DoStep, ...) on a
+        ValueReferenceTable.
+
+        The initialization mode ends with a simulation of the start time (outputs of the initial state), do_step()
+        simulates the end of the communication step. reset() restores the state after the initialization.
+    """
+
+    def __init__(self, dhn_sim, inputs=None, outputs=None, sim_mode='static', model_name='DHNetwork', step_size=60.):
+        self.dhn_sim = dhn_sim
+        self.inputs = _get_parameters(DEFAULT_INPUTS if inputs is None else inputs)
+        self.outputs = _get_parameters(DEFAULT_OUTPUTS if outputs is None else outputs)
+        self.sim_mode = sim_mode
+        self.model_name = model_name
+        self.step_size = float(step_size)  # default step size of the experiment
+
+        self.variables = get_model_variables(dhn_sim.net, self.inputs, self.outputs)
+        self.guid = get_guid(model_name, self.variables)
+        self.value_references = ValueReferenceTable(_get_blocks(self.variables))
+        self._refresh()
+
+        self.time = None
+        self.start_time = 0.
+        self.stop_time = None
+        self.initial_state = None
+
+    def __repr__(self):
+        n_inputs = sum([variable['causality'] == 'input' for variable in self.variables])
+        return f'DHNetworkFMU(model_name={self.model_name}, inputs={n_inputs}, ' \
+               f'outputs={len(self.variables) - n_inputs}, sim_mode={self.sim_mode})'
+
+    def setup_experiment(self, start_time=0., stop_time=None, tolerance=None):
+        self.start_time = float(start_time)
+        self.stop_time = stop_time
+
+    def enter_initialization_mode(self):
+        pass
+
+    def exit_initialization_mode(self):
+        """
+            Simulate the start time (outputs of the initial state) and store the state for reset().
+        """
+        self.dhn_sim.run_simulation(self.start_time, sim_mode=self.sim_mode)
+        self.time = self.start_time
+        self.initial_state = self.dhn_sim.snapshot()
+
+    def get_real(self, value_references):
+        """
+            fmi2GetReal: Get the values of an array of value references.
+        """
+        return self._refresh().get(self.dhn_sim.net, value_references)
+
+    def set_real(self, value_references, values):
+        """
+            fmi2SetReal: Set the values of an array of value references (inputs).
+        """
+        self._refresh().set(self.dhn_sim.net, value_references, values)
+
+    def do_step(self, current_time, step_size, no_set_fmu_state_prior=True):
+        """
+            fmi2DoStep: Simulate the communication step from current_time to current_time + step_size.
+        """
+        if self.time is None:
+            raise RuntimeError('The FMU is not initialized (call exit_initialization_mode() first).')
+        self.time = current_time + step_size
+        self.dhn_sim.run_simulation(self.time, sim_mode=self.sim_mode)
+
+        return True
+
+    def terminate(self):
+        pass
+
+    def reset(self):
+        """
+            fmi2Reset: Restore the state after the initialization mode.
+        """
+        if self.initial_state is not None:
+            self.dhn_sim.restore(self.initial_state)
+            self.time = self.start_time
+
+    def get_value_references(self, names):
+        """
+            Get the value references of variable names (resolve once, e.g. by an FMU master).
+        """
+        value_references = {variable['name']: variable['valueReference'] for variable in self.variables}
+        try:
+            return np.array([value_references[name] for name in names], dtype=np.int64)
+        except KeyError as error:
+            raise KeyError(f'Variable {error} does not exist.')
+
+    def get_model_description(self):
+        return get_model_description(self)
+
+    def _refresh(self):
+        # Resolve the value references again if the topology index has been rebuilt
+        index = self.dhn_sim.network_index
+        index.refresh(self.dhn_sim.net, deep=False)
+        if self.value_references.index_signature != (id(index), index.build_count):
+            self.value_references.resolve(self.dhn_sim.net, index)
+        return self.value_references
+
+
+def get_model_variables(net, inputs=None, outputs=None):
+    """
+        Get the model variables of the network (value references numbered by inputs and outputs, grouped by
+        component type and parameter). Inputs have the current parameter values as start values.
+    """
+    variables = []
+    for causality, parameters in (('input', _get_parameters(DEFAULT_INPUTS if inputs is None else inputs)),
+                                  ('output', _get_parameters(DEFAULT_OUTPUTS if outputs is None else outputs))):
+        for type, type_parameters in parameters.items():
+            table = get_component_table(net, type)
+            if table is None or not len(table):
+                continue
+            for parameter in type_parameters:
+                for name, start in _get_components(net, type, table, parameter, causality):
+                    variables.append({'name': f'{type}.{name}.{parameter}',
+                                      'valueReference': len(variables),
+                                      'causality': causality,
+                                      'type': type,
+                                      'component': name,
+                                      'parameter': parameter,
+                                      'start': start,
+                                      'unit': get_unit(parameter)})
+
+    return variables
+
+def get_unit(parameter):
+    """
+        Get the unit of a parameter by its suffix (None if the parameter has no unit suffix).
+    """
+    for suffix, (unit, _) in UNITS.items():
+        if parameter.endswith(suffix):
+            return unit
+    return None
+
+def get_guid(model_name, variables):
+    """
+        Get the GUID of the model description (stable for the same model name and variables).
+    """
+    content = ';'.join([model_name] + [f"{v['name']}:{v['valueReference']}:{v['causality']}" for v in variables])
+    return '{' + str(uuid.uuid5(uuid.NAMESPACE_URL, content)) + '}'
+
+def get_model_description(fmu):
+    """
+        Get the FMI 2.0 model description (co-simulation) of an FMU as ElementTree element.
+    """
+    root = ET.Element('fmiModelDescription', {
+        'fmiVersion': FMI_VERSION,
+        'modelName': fmu.model_name,
+        'guid': fmu.guid,
+        'description': 'District heating network simulator (dh_network_simulator)',
+        'generationTool': 'dh_network_simulator',
+        'variableNamingConvention': 'structured',
+        'numberOfEventIndicators': '0'})
+    ET.SubElement(root, 'CoSimulation', {'modelIdentifier': fmu.model_name,
+                                         'canHandleVariableCommunicationStepSize': 'true',
+                                         'canGetAndSetFMUstate': 'false',
+                                         'canSerializeFMUstate': 'false'})
+
+    # Unit definitions of the used units
+    units = ET.SubElement(root, 'UnitDefinitions')
+    for suffix, (unit, base_unit) in UNITS.items():
+        if any([variable['unit'] == unit for variable in fmu.variables]):
+            element = ET.SubElement(units, 'Unit', {'name': unit})
+            ET.SubElement(element, 'BaseUnit', {key: repr(value) if key == 'factor' else str(value)
+                                                for key, value in base_unit.items()})
+    if not len(units):
+        root.remove(units)
+
+    ET.SubElement(root, 'DefaultExperiment', {'startTime': '0.0', 'stepSize': repr(fmu.step_size)})
+
+    # Model variables (the index of the model structure counts from 1)
+    model_variables = ET.SubElement(root, 'ModelVariables')
+    for variable in fmu.variables:
+        element = ET.SubElement(model_variables, 'ScalarVariable', {'name': variable['name'],
+                                                                    'valueReference': str(variable['valueReference']),
+                                                                    'causality': variable['causality'],
+                                                                    'variability': 'continuous'})
+        real = {'unit': variable['unit']} if variable['unit'] is not None else {}
+        if variable['causality'] == 'input':
+            real['start'] = repr(float(variable['start']))
+        ET.SubElement(element, 'Real', real)
+
+    structure = ET.SubElement(root, 'ModelStructure')
+    outputs = [str(i + 1) for i, variable in enumerate(fmu.variables) if variable['causality'] == 'output']
+    for tag in ('Outputs', 'InitialUnknowns'):
+        element = ET.SubElement(structure, tag)
+        for index in outputs:
+            ET.SubElement(element, 'Unknown', {'index': index})
+
+    return root
+
+def write_model_description(fmu, path):
+    """
+        Write the model description of an FMU to an .xml file.
+    """
+    root = get_model_description(fmu)
+    if hasattr(ET, 'indent'):
+        ET.indent(root)
+    else:
+        # Python < 3.9
+        _indent(root)
+    ET.ElementTree(root).write(path, encoding='UTF-8', xml_declaration=True)
+
+def build_fmu(dhn_sim, path, inputs=None, outputs=None, sim_mode='static', model_name='DHNetwork', step_size=60.):
+    """
+        Build an FMU archive (.fmu) of the loaded network: the model description generated from the network, the
+        readable network files (json_readable) and the FMU configuration as resources. The archive contains no
+        binaries, it is instantiated by load_fmu() (e.g. by the pure-Python runner simulate_fmu()).
+        Returns the FMU.
+    """
+    fmu = DHNetworkFMU(dhn_sim, inputs=inputs, outputs=outputs, sim_mode=sim_mode, model_name=model_name,
+                       step_size=step_size)
+    config = {'model_name': model_name,
+              'inputs': fmu.inputs,
+              'outputs': fmu.outputs,
+              'sim_mode': sim_mode,
+              'step_size': fmu.step_size}
+
+    with tempfile.TemporaryDirectory() as directory:
+        model_description = os.path.join(directory, 'modelDescription.xml')
+        write_model_description(fmu, model_description)
+        network_dir = os.path.join(directory, 'network') + os.sep
+        os.makedirs(network_dir)
+        dhn_sim.save_network(path=network_dir, format='json_readable')
+
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.write(model_description, 'modelDescription.xml')
+            archive.writestr(FMU_CONFIG_FILE, json.dumps(config, indent=4))
+            for file in sorted(os.listdir(network_dir)):
+                archive.write(os.path.join(network_dir, file), FMU_NETWORK_DIR + file)
+
+    return fmu
+
+def load_fmu(path, guid=None, **sim_params):
+    """
+        Instantiate the FMU of an archive of build_fmu(). The sim_params are passed to the DHNetworkSimulator. Raises a
+        ValueError if the GUID of the instantiated FMU differs from guid (e.g. of the model description).
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        with zipfile.ZipFile(path) as archive:
+            archive.extractall(directory)
+        with open(os.path.join(directory, FMU_CONFIG_FILE)) as fin:
+            config = json.load(fin)
+
+        dhn_sim = DHNetworkSimulator(**sim_params)
+        dhn_sim.load_network(from_file=True, path=os.path.join(directory, FMU_NETWORK_DIR), format='json_readable')
+
+    fmu = DHNetworkFMU(dhn_sim, inputs=config['inputs'], outputs=config['outputs'], sim_mode=config['sim_mode'],
+                       model_name=config['model_name'], step_size=config['step_size'])
+    if guid is not None and fmu.guid != guid:
+        raise ValueError(f'GUID of the FMU {path} ({fmu.guid}) differs from the model description ({guid}).')
+
+    return fmu
+
+def _get_parameters(parameters):
+    # Parameters of the component types as lists
+    return {type: [type_parameters] if isinstance(type_parameters, str) else list(type_parameters)
+            for type, type_parameters in parameters.items()}
+
+def _get_components(net, type, table, parameter, causality):
+    # Component names and current values of a parameter (controllers without the attribute are skipped)
+    if type == 'controller':
+        return [(controller.name, getattr(controller, parameter)) for controller in table['object']
+                if hasattr(controller, parameter)]
+    # Result parameters are checked if results are available
+    result = net['res_' + type] if 'res_' + type in net else None
+    if parameter not in table and (causality == 'input' or result is not None and parameter not in result):
+        raise KeyError(f"Parameter '{parameter}' of type '{type}' cannot be found.")
+
+    values = table[parameter].values if parameter in table else np.full(len(table), np.nan)
+    return list(zip(table['name'], values))
+
+def _get_blocks(variables):
+    # Blocks of consecutive value references of the same component type and parameter
+    blocks = []
+    for variable in variables:
+        key = (variable['type'], variable['parameter'])
+        if not blocks or blocks[-1][:2] != key:
+            blocks.append((variable['type'], variable['parameter'], []))
+        blocks[-1][2].append(variable['component'])
+
+    return blocks
+
+def _indent(element, level=0):
+    # Indentation of the child elements by two spaces per level (like ET.indent of Python >= 3.9)
+    children = list(element)
+    if not children:
+        return
+    element.text = '\n' + '  ' * (level + 1)
+    for child in children:
+        _indent(child, level + 1)
+        child.tail = '\n' + '  ' * (level + 1)
+    children[-1].tail = '\n' + '  ' * level
@@ -0,0 +1,120 @@
+"""
+    Pure-Python FMI 2.0 co-simulation master of the FMUs of build_fmu() (local verification without an FMI tool).
+    Usage (results as .csv file or on stdout):
+
+        python -m dh_network_simulator.cosim.fmu_runner network.fmu --stop-time 3600 --step-size 60 --output results.csv
+"""
+import argparse
+import sys
+import zipfile
+import xml.etree.ElementTree as ET
+import numpy as np
+import pandas as pd
+from .fmi import load_fmu
+
+
+def read_model_description(path):
+    """
+        Read the model description of an FMU archive (or of a modelDescription.xml file) as dict (attributes, default
+        experiment and variables with name, value reference, causality and start value).
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            root = ET.fromstring(archive.read('modelDescription.xml'))
+    else:
+        root = ET.parse(path).getroot()
+
+    variables = []
+    for element in root.find('ModelVariables'):
+        real = element.find('Real')
+        start = real.get('start') if real is not None else None
+        variables.append({'name': element.get('name'),
+                          'valueReference': int(element.get('valueReference')),
+                          'causality': element.get('causality', 'local'),
+                          'start': float(start) if start is not None else None,
+                          'unit': real.get('unit') if real is not None else None})
+
+    experiment = root.find('DefaultExperiment')
+    return {'fmiVersion': root.get('fmiVersion'),
+            'modelName': root.get('modelName'),
+            'guid': root.get('guid'),
+            'defaultExperiment': dict(experiment.attrib) if experiment is not None else {},
+            'variables': variables}
+
+def simulate_fmu(path, start_time=None, stop_time=None, step_size=None, input=None, output=None, **sim_params):
+    """
+        Simulate an FMU of build_fmu() with fixed communication steps and get the outputs as DataFrame (one row per
+        communication point, incl. the start time).
+
+        input: DataFrame of input values (index: time, columns: input variable names), sampled and held at the
+               communication points
+        output: Output variable names (default: all outputs)
+        sim_params: Parameters of the DHNetworkSimulator of the FMU
+    """
+    model_description = read_model_description(path)
+    experiment = model_description['defaultExperiment']
+    start_time = float(experiment.get('startTime', 0.)) if start_time is None else float(start_time)
+    step_size = float(experiment.get('stepSize', 60.)) if step_size is None else float(step_size)
+    stop_time = float(experiment.get('stopTime', start_time + step_size)) if stop_time is None else float(stop_time)
+
+    # Resolve the variable names to value references once
+    variables = {variable['name']: variable for variable in model_description['variables']}
+    if output is None:
+        output = [name for name, variable in variables.items() if variable['causality'] == 'output']
+    output_vrs = _get_value_references(variables, output, 'output')
+    if input is not None:
+        input_vrs = _get_value_references(variables, list(input.columns), 'input')
+        input_values = input.values.astype(np.float64)
+
+    times = start_time + step_size * np.arange(int(round((stop_time - start_time) / step_size)) + 1)
+    results = np.full((len(times), len(output)), np.nan)
+
+    fmu = load_fmu(path, guid=model_description['guid'], **sim_params)
+    fmu.setup_experiment(start_time=start_time, stop_time=stop_time)
+    fmu.enter_initialization_mode()
+    for step, time in enumerate(times):
+        # Set the inputs of the previous communication point (held over the communication step)
+        if input is not None:
+            row = input.index.get_indexer([times[max(step - 1, 0)]], method='ffill')[0]
+            if row >= 0:
+                fmu.set_real(input_vrs, input_values[row])
+        if step == 0:
+            fmu.exit_initialization_mode()
+        else:
+            fmu.do_step(times[step - 1], time - times[step - 1])
+        results[step] = fmu.get_real(output_vrs)
+    fmu.terminate()
+
+    return pd.DataFrame(results, index=pd.Index(times, name='time'), columns=output)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Simulate an FMU of the district heating network simulator.')
+    parser.add_argument('fmu', help='Path of the .fmu file')
+    parser.add_argument('--start-time', type=float, default=None)
+    parser.add_argument('--stop-time', type=float, default=None)
+    parser.add_argument('--step-size', type=float, default=None)
+    parser.add_argument('--input', default=None, help='Path of a .csv file of input values (index column: time)')
+    parser.add_argument('--output', default=None, help='Path of the .csv file of the results (stdout if not given)')
+    args = parser.parse_args(argv)
+
+    input = pd.read_csv(args.input, index_col=0) if args.input is not None else None
+    results = simulate_fmu(args.fmu, start_time=args.start_time, stop_time=args.stop_time, step_size=args.step_size,
+                           input=input, logging_enabled=False)
+    results.to_csv(args.output if args.output is not None else sys.stdout)
+
+    return results
+
+def _get_value_references(variables, names, causality):
+    try:
+        references = [variables[name] for name in names]
+    except KeyError as error:
+        raise KeyError(f'Variable {error} does not exist in the model description.')
+    invalid = [variable['name'] for variable in references if variable['causality'] != causality]
+    if invalid:
+        raise ValueError(f'Variables {invalid[:5]} are not of causality {causality}.')
+
+    return np.array([variable['valueReference'] for variable in references], dtype=np.int64)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+import numpy as np
+from ..dh_network_simulator import DHNetworkSimulator
+
+try:
+    import mosaik_api_v3 as mosaik_api
+except ImportError:
+    try:
+        import mosaik_api
+    except ImportError:
+        mosaik_api = None
+
+# Models of the adapter and their network component types
+MODEL_TYPES = {'Junction': 'junction',
+               'Pipe': 'pipe',
+               'Valve': 'valve',
+               'HeatExchanger': 'heat_exchanger',
+               'Sink': 'sink',
+               'Source': 'source',
+               'ExtGrid': 'ext_grid',
+               'CtrlValve': 'controller'}
+
+# Result parameters of the branch components (pipes, valves and heat exchangers)
+BRANCH_RESULTS = ['v_mean_m_per_s', 'p_from_bar', 'p_to_bar', 't_from_k', 't_to_k', 'mdot_from_kg_per_s',
+                  'mdot_to_kg_per_s', 'vdot_norm_m3_per_s', 'reynolds', 'lambda']
+
+# Exchanged attributes of the models (component parameters and results, see ComponentHandle)
+MODEL_ATTRS = {'Junction': ['pn_bar', 'tfluid_k', 'p_bar', 't_k'],
+               'Pipe': ['alpha_w_per_m2k', 'text_k', 'qext_w'] + BRANCH_RESULTS,
+               'Valve': ['opened', 'loss_coefficient'] + BRANCH_RESULTS,
+               'HeatExchanger': ['qext_w', 'loss_coefficient'] + BRANCH_RESULTS,
+               'Sink': ['mdot_kg_per_s', 'scaling'],
+               'Source': ['mdot_kg_per_s', 'scaling'],
+               'ExtGrid': ['p_bar', 't_k', 'mdot_kg_per_s'],
+               'CtrlValve': ['mdot_set_kg_per_s', 'loss_coeff', 'gain', 'tol']}
+
+# Boolean attributes (float inputs of the orchestrator are cast before they are written to the boolean columns)
+BOOLEAN_ATTRS = {'opened'}
+
+META = {
+    'api_version': '3.0',
+    'type': 'time-based',
+    'models': {model: {'public': True,
+                       'params': ['names', 'name'],
+                       'attrs': attrs} for model, attrs in MODEL_ATTRS.items()},
+}
+
+# Base class of the adapter (plain object without the optional mosaik API package, e.g. in-process orchestrators)
+_SimulatorBase = mosaik_api.Simulator if mosaik_api is not None else object
+
+
+class DHNetworkMosaikAdapter(_SimulatorBase):
+    """
+        mosaik co-simulation adapter of the DHNetworkSimulator (mosaik API 3, time-based).
+
+        Entities are existing network components, created by model and component name, e.g.
+        create(2, 'Sink', names=['sink1', 'sink2']). The attributes exchanged with the orchestrator are resolved to
+        ComponentHandles once per distinct request layout (e.g. the attributes of a connection) and reused in later
+        steps, so step() writes all inputs and get_data() gathers all requested attributes with one vector operation
+        per component type and parameter instead of one lookup per attribute.
+
+        Values of several sources of the same input attribute are summed up. Without the optional mosaik-api-v3
+        package the adapter is a plain class with the same interface, so in-process orchestrators can drive it.
+    """
+
+    def __init__(self, dhn_sim=None):
+        if mosaik_api is not None:
+            super().__init__(META)
+        else:
+            self.meta = META
+        self.dhn_sim = dhn_sim  # simulator of the network (created by init() if not given)
+        self.sid = None
+        self.time_resolution = 1.  # seconds per integer time step of the orchestrator
+        self.step_size = 60  # time steps between two simulation steps
+        self.sim_mode = 'static'
+        self.entities = {}  # entity id: (component type, component name)
+        self.input_plans = {}  # cached scatter plans of the input layouts
+        self.output_plans = {}  # cached gather plans of the output layouts
+
+    def __repr__(self):
+        return f'DHNetworkMosaikAdapter(sid={self.sid}, entities={len(self.entities)}, sim_mode={self.sim_mode})'
+
+    def init(self, sid, time_resolution=1., network_path=None, format='json_readable', step_size=60,
+             sim_mode='static', **sim_params):
+        """
+            Initialize the adapter. The network is loaded from network_path (see DHNetworkSimulator.load_network()),
+            the remaining sim_params are passed to the DHNetworkSimulator if the adapter has no simulator yet.
+        """
+        self.sid = sid
+        self.time_resolution = float(time_resolution)
+        self.step_size = int(step_size)
+        self.sim_mode = sim_mode
+        if self.dhn_sim is None:
+            self.dhn_sim = DHNetworkSimulator(**sim_params)
+        if network_path is not None:
+            self.dhn_sim.load_network(from_file=True, path=network_path, format=format)
+            self._clear_plans()
+
+        return self.meta
+
+    def create(self, num, model, names=None, name=None):
+        """
+            Create num entities of a model, mapped to the network components names (or name if num is 1).
+        """
+        if model not in MODEL_TYPES:
+            raise ValueError(f"Model '{model}' does not exist. Available models: {list(MODEL_TYPES)}.")
+        if names is None:
+            names = [] if name is None else [name]
+        names = [names] if isinstance(names, str) else list(names)
+        if len(names) != num:
+            raise ValueError(f'Number of component names ({len(names)}) differs from the number of entities ({num}).')
+
+        # Get the entities (the component names are checked by the topology index)
+        type = MODEL_TYPES[model]
+        self.dhn_sim.network_index.refresh(self.dhn_sim.net)
+        self.dhn_sim.network_index.positions(type, names)
+        entities = []
+        for component_name in names:
+            eid = get_entity_id(model, component_name)
+            self.entities[eid] = (type, component_name)
+            entities.append({'eid': eid, 'type': model})
+
+        return entities
+
+    def setup_done(self):
+        pass
+
+    def step(self, time, inputs, max_advance=None):
+        """
+            Write the inputs and run the simulation of the time step. Returns the next time step.
+        """
+        self.set_data(inputs)
+        self.dhn_sim.run_simulation(time * self.time_resolution, sim_mode=self.sim_mode)
+
+        return time + self.step_size
+
+    def set_data(self, inputs):
+        """
+            Write inputs {eid: {attr: {source id: value}}} (or {eid: {attr: value}}) to the network components.
+        """
+        if not inputs:
+            return
+        keys = tuple([(eid, tuple(attrs)) for eid, attrs in inputs.items()])
+        plan = self.input_plans.get(keys)
+        if plan is None:
+            plan = self.input_plans[keys] = self._resolve_plan(keys)
+
+        values = np.array([_get_input_value(value) for attrs in inputs.values() for value in attrs.values()],
+                          dtype=np.float64)
+        for handle, positions, boolean in plan:
+            self.dhn_sim.set_values(handle, values[positions].astype(bool) if boolean else values[positions])
+
+    def get_data(self, outputs):
+        """
+            Get the requested attributes {eid: [attr, ...]} as {eid: {attr: value}}.
+        """
+        keys = tuple([(eid, tuple(attrs)) for eid, attrs in outputs.items()])
+        plan = self.output_plans.get(keys)
+        if plan is None:
+            plan = self.output_plans[keys] = self._resolve_plan(keys)
+
+        # Gather the values of all attributes (one vector per component type)
+        values = np.empty(sum([len(attrs) for _, attrs in keys]))
+        for handle, positions, _ in plan:
+            values[positions] = self.dhn_sim.get_values(handle)
+        values = values.tolist()
+
+        data = {}
+        position = 0
+        for eid, attrs in keys:
+            data[eid] = dict(zip(attrs, values[position:position + len(attrs)]))
+            position += len(attrs)
+
+        return data
+
+    def finalize(self):
+        pass
+
+    def _resolve_plan(self, keys):
+        """
+            Resolve the attributes of the entities ((eid, attrs), ...) to one handle per component type (boolean
+            attributes separately) with the positions of the attributes in the flattened value vector.
+        """
+        targets = {}
+        position = 0
+        for eid, attrs in keys:
+            try:
+                type, component_name = self.entities[eid]
+            except KeyError:
+                raise KeyError(f"Entity '{eid}' does not exist.")
+            model = get_entity_model(eid)
+            for attr in attrs:
+                if attr not in MODEL_ATTRS[model]:
+                    raise KeyError(f"Attribute '{attr}' of model '{model}' does not exist.")
+                targets.setdefault((type, attr in BOOLEAN_ATTRS), []).append((component_name, attr, position))
+                position += 1
+
+        plan = []
+        for (type, boolean), type_targets in targets.items():
+            names, parameters, positions = zip(*type_targets)
+            plan.append((self.dhn_sim.resolve(type, names, parameters), np.array(positions), boolean))
+
+        return plan
+
+    def _clear_plans(self):
+        self.entities.clear()
+        self.input_plans.clear()
+        self.output_plans.clear()
+
+
+def get_entity_id(model, name):
+    return f'{model}-{name}'
+
+def get_entity_model(eid):
+    return eid.split('-', 1)[0]
+
+def _get_input_value(value):
+    # Sum of the values of several sources (mosaik inputs) or a plain value
+    if isinstance(value, dict):
+        return sum(value.values())
+    return value
+
+def main():
+    """
+        Start the adapter as mosaik simulator process (requires the mosaik-api-v3 package).
+    """
+    if mosaik_api is None:
+        raise ImportError('The mosaik adapter requires the mosaik-api-v3 package (pip install mosaik-api-v3).')
+    return mosaik_api.start_simulation(DHNetworkMosaikAdapter(), 'District heating network simulator')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,28 @@
 from dataclasses import dataclass, field
 import pandapipes as pp
-from collections import deque
-import pandapipes.plotting as plot
 from pandapipes.pandapipes_net import pandapipesNet
 from .dh_network_simulator_core import *
-from pandapower.timeseries.data_sources.frame_data import DFData
+from .network_index import NetworkIndex
+from .thermal_kernel import DynamicThermalKernel
+from .pipe_ordering import PipeFlowOrder
+from .plug_flow import PlugFlowKernel, DEFAULT_PARCELS
+from .thermal_solver import ThermalNetworkSolver
+from .history import HistoryBuffer, DEFAULT_MAX_HORIZON_S
+from .component_handle import ComponentHandle
+from .results_recorder import ResultsRecorder
+from .step_stats import StepStats, STEP_PHASES
+from .network_generator import create_synthetic_network
+from .profiling import SimulationProfiler
+from .component_models import CtrlValve, JointValveCtrl
+from .io.network_cache import import_network_components_cached
+from .snapshot import SnapshotStore, DEFAULT_MAX_SNAPSHOTS, get_net_state, set_net_state, get_controller_state, \
+    set_controller_state
+from pandapower.control.run_control import ControllerNotConverged
+from pandapipes.pipeflow import PipeflowNotConverged
 from typing import Dict
 # Do not print python UserWarnings
 import sys
+import time
 import logging
 
 if not sys.warnoptions:
@@ -21,21 +36,52 @@ class DHNetworkSimulator():
             pandapipesNet: DHN containing all network components and characteristics based on the pandapipes library
 
         and public functions:
-            load_network(): Imports and initializes the pandapipes network components from .json files or by using the default pandapipes import filehandler
+            load_network(): Imports and initializes the pandapipes network components from .json files or by using the default pandapipes import filehandler (json_readable files are cached if network_cache is set, see network_cache)
+            load_synthetic_network(): Creates a synthetic radial or meshed network with N consumers (benchmarks)
             save_network(): Exports the pandapipes network components to .json files or by using the default pandapipes export filehandler
             plot_network_topology(): Plots the network components based on the geodata of the network junctions
-            run_simulation(): Runs the static or quasi-dynamic heat flow simulation (steady-state mass flows and pressures) for a time step t
+            run_simulation(): Runs the static, quasi-dynamic or plug flow heat flow simulation (steady-state mass flows and pressures) for a time step t
+            run_timeseries(): Runs the simulation for all time steps of profile data with resolved inputs and outputs
+            run_sweep(): Runs the time series of several scenario variants of the network in parallel worker processes
             get_value_of_network_component(): Getter for network component parameters and attributes
             set_value_of_network_component(): Setter for network component parameters and attributes
+            resolve(): Resolves parameters of several network components by name to a reusable handle
+            get_values()/set_values(): Bulk getter/setter for the parameters of a resolved handle as vectors
+            add_joint_valve_control(): Replaces the CtrlValves by a coordinated multi-valve flow controller
+            attach_recorder(): Attaches a ResultsRecorder which records result columns after each time step
+            snapshot()/restore(): In-memory snapshot and rollback of the simulation state (co-simulation)
+            last_step_stats/step_stats: Performance counters of the latest time step and cumulative counters of all steps
+            profiler: Opt-in profiling of a window of time steps (profile_path or environment variable DHNSIM_PROFILE)
 
     """
 
     logging_enabled: bool = True  # Logging modes: 'default', 'all'
+    static_engine: str = 'pandapipes'  # Static temperature flow engines: 'pandapipes', 'sparse'
+    dynamic_engine: str = 'vectorized'  # Dynamic temperature flow engines: 'vectorized', 'reference'
+    fused_step: bool = False  # Controller iterations solve hydraulics only, followed by a single heat transfer solve
+    history_max_horizon_s: float = DEFAULT_MAX_HORIZON_S  # Upper bound of the auto-sized historical data horizon
+    plugflow_parcels: int = DEFAULT_PARCELS  # Number of fluid parcels per pipe in sim_mode 'plugflow'
+    collect_stats: bool = False  # Collect the performance counters of the time steps (see step_stats)
+    profile_path: str = None  # Output path prefix of the profiling mode (.prof and .collapsed files), see profiler
+    profile_steps: tuple = (0, None)  # Window of profiled time steps (start, stop) counted by run_simulation() calls
+    network_cache: bool = False  # Load readable network files (json_readable) by the binary network cache (pyarrow)
+    network_cache_dir: str = None  # Directory of the network cache (default: DHNSIM_CACHE_DIR or the user cache)
+    max_snapshots: int = DEFAULT_MAX_SNAPSHOTS  # Number of stored snapshots of snapshot() (the oldest is evicted)
     net: pandapipesNet = field(init=False)
+    network_index: NetworkIndex = field(init=False)  # Cached name/topology lookups of the network components
 
     # Internal variables
     collector_connections: dict = field(init=False)
-    historical_data: dict = field(init=False)  # Dict of FIFO shift registers for each datapoint
+    historical_data: dict = field(init=False)  # Dict of circular buffers (HistoryBuffer) for each datapoint
+    thermal_kernel: DynamicThermalKernel = field(init=False)  # Vectorized dynamic temperature flow engine
+    pipe_flow_order: PipeFlowOrder = field(init=False)  # Cached topological pipe order along the flow direction
+    plug_flow_kernel: PlugFlowKernel = field(init=False)  # Lagrangian parcel state of the pipes (sim_mode 'plugflow')
+    thermal_solver: ThermalNetworkSolver = field(init=False)  # Sparse linear static temperature flow solver
+    pipeflow_stats: dict = field(init=False)  # Pandapipes solves and Newton iterations of the latest time step
+    recorders: list = field(init=False)  # Attached ResultsRecorders
+    step_stats: StepStats = field(init=False)  # Performance counters of the latest and all time steps
+    profiler: SimulationProfiler = field(init=False)  # Profiler of the time steps (None if the mode is disabled)
+    snapshots: SnapshotStore = field(init=False)  # Bounded store of the snapshots of the simulation state
 
     def __repr__(self):
         rep = str(f'DHNetworkSimulator(logging={self.logging})')
@@ -46,21 +92,41 @@ class DHNetworkSimulator():
         self._init_dh_network()
         self._init_collector_connections()
         self._init_historical_data_storage()
+        self._init_profiling()
 
     def _init_logging(self):
+        # Warnings are logged without enabled logging (default level)
+        self.logger = logging.getLogger(__name__)
         if self.logging_enabled:
-            self.logger = logging.getLogger(__name__)
             self.logger.setLevel(logging.INFO)
             self.logger.info(f'DH Network Simulator: Logging (level="{logging.getLevelName(self.logger.level)}") enabled.')
 
         # Ignore filter warning of hydraulic dynamics
         warnings.filterwarnings("ignore", message="Pipeflow converged, however, the results are phyisically incorrect as pressure is negative at nodes*")
 
+    def _init_profiling(self):
+        # Profiling mode enabled by profile_path or by the environment variables DHNSIM_PROFILE(_STEPS)
+        if self.profile_path is not None:
+            start, stop = self.profile_steps
+            self.profiler = SimulationProfiler(self.profile_path, start=start, stop=stop)
+        else:
+            self.profiler = SimulationProfiler.from_env()
+
     def _init_dh_network(self):
         # create empty network
         self.net = pp.create_empty_network("net", add_stdtypes=False)
         # create fluid
         pp.create_fluid_from_lib(self.net, "water", overwrite=True)
+        # create topology index
+        self.network_index = NetworkIndex(self.net)
+        self.thermal_kernel = None
+        self.plug_flow_kernel = None
+        self.thermal_solver = None
+        self.pipe_flow_order = PipeFlowOrder()
+        self.pipeflow_stats = {}
+        self.recorders = []
+        self.step_stats = StepStats()
+        self.snapshots = SnapshotStore(self.max_snapshots)
 
     def _init_collector_connections(self):
         # Define stored attributes of the simulation
@@ -73,52 +139,179 @@ class DHNetworkSimulator():
         for key, param_list in self.collector_connections.items():
             component = getattr(self.net, key)
             dict.update({key: {}})
-            for i in component.name:
-                dict[key].update({i: {}})
-                for param in param_list:
-                    dict[key][i].update({param:[]})
+            for param in param_list:
+                dict[key].update({param: HistoryBuffer(component.name, max_horizon_s=self.history_max_horizon_s)})
 
         self.historical_data = dict
 
 
     def load_network(self, from_file=False, path='', format='json_default'):
         # import from file
+        network_index = None
         if from_file is True:
             try:
-                import_network_components(net=self.net,
-                                      format=format,
-                                      path=path)
+                if format == 'json_readable' and self.network_cache:
+                    _, network_index = import_network_components_cached(net=self.net,
+                                                                        path=path,
+                                                                        cache_dir=self.network_cache_dir)
+                else:
+                    import_network_components(net=self.net,
+                                          format=format,
+                                          path=path)
             except ImportError as error:
                 # Throw error if import was not successful
                 self.logger.error(error)
 
+        # build topology index (precomputed by the network cache)
+        self.network_index = network_index if network_index is not None else NetworkIndex(self.net)
+        self.thermal_kernel = None
+        self.plug_flow_kernel = None
+        self.thermal_solver = None
+        self.pipe_flow_order = PipeFlowOrder()
+        self.snapshots.clear()
+
         # initialize historical data storage
         self._init_historical_data_storage()
 
+    def load_synthetic_network(self, n_consumers, topology='radial', **kwargs):
+        """
+            Create a synthetic network with n_consumers controlled consumer substations, see create_synthetic_network().
+        """
+        self._init_dh_network()
+        create_synthetic_network(net=self.net,
+                                 n_consumers=n_consumers,
+                                 topology=topology,
+                                 **kwargs)
+        self.load_network()
+
     def save_network(self, path='', format='json_default'):
         export_network_components(net=self.net,
                                   format=format,
                                   path=path)
 
     def run_simulation(self, t, sim_mode='static'):
-        # Run hydraulic flow (steady-state)
+        # Profile the time step within the window of the profiling mode
+        if self.profiler is not None and self.profiler.start_step():
+            try:
+                self._run_simulation_step(t, sim_mode)
+            finally:
+                self.profiler.stop_step()
+        else:
+            self._run_simulation_step(t, sim_mode)
+
+    def _run_simulation_step(self, t, sim_mode):
+        step_start = time.perf_counter()
+        timings = {} if self.collect_stats else None
+
+        # Rebuild topology index if the network tables have changed
+        self.network_index.refresh(self.net)
+
+        # Run hydraulic flow (steady-state, controller iterations are counted if the stats are collected)
+        counter = {'control_solves': 0, 'hydraulic_solves': 0, 'heat_solves': 0, 'newton_iterations': 0,
+                   'pipeflow_calls': 0}
+        not_converged = []
+        start = time.perf_counter()
         try:
-            run_hydraulic_control(net=self.net)
-        except:
+            run_hydraulic_control(net=self.net,
+                                  counter=counter if self.collect_stats else None)
+        except ControllerNotConverged:
             # Throw UserWarning
-            self.logger.warning(f'ControllerNotConverged: Maximum number of iterations per controller is reached.')
+            not_converged = get_not_converged_controllers(self.net)
+            self.logger.warning(f'ControllerNotConverged: Maximum number of iterations per controller is reached '
+                                f'({", ".join(not_converged)}).')
+        except PipeflowNotConverged:
+            not_converged = ['pipeflow']
+            self.logger.warning('PipeflowNotConverged: The pipeflow of the controller iterations has not converged.')
+        add_time(timings, 'time_control_s', start)
 
         if sim_mode == 'static':
-            run_static_pipeflow(self.net)
+            run_static_pipeflow(net=self.net,
+                                solver=self._get_thermal_solver(),
+                                index=self.network_index,
+                                fused=self.fused_step,
+                                counter=counter,
+                                timings=timings)
         elif sim_mode == 'dynamic':
             # Run dynamic pipeflow
             run_dynamic_pipeflow(net=self.net,
                                  historical_data=self.historical_data,
                                  collector_connections=self.collector_connections,
-                                 t=t)
+                                 t=t,
+                                 index=self.network_index,
+                                 kernel=self._get_thermal_kernel(),
+                                 order=self.pipe_flow_order,
+                                 timings=timings)
+        elif sim_mode == 'plugflow':
+            # Run Lagrangian plug flow simulation
+            start = time.perf_counter()
+            run_plugflow_pipeflow(net=self.net,
+                                  t=t,
+                                  kernel=self._get_plug_flow_kernel(),
+                                  index=self.network_index)
+            add_time(timings, 'time_thermal_s', start)
         else:
             self.logger.error(f"Simulation mode '{sim_mode}' does not exist. Simulation has stopped.")
 
+        # Store pandapipes solves of the time step
+        counter['saved_solves'] = get_saved_pipeflow_solves(counter=counter,
+                                                            sim_mode=sim_mode)
+        self.pipeflow_stats = counter
+
+        # Record results of the time step
+        start = time.perf_counter()
+        for recorder in self.recorders:
+            recorder.record(self.net, t, index=self.network_index)
+        add_time(timings, 'time_record_s', start)
+
+        # Store performance counters of the time step
+        if self.collect_stats:
+            self._add_step_stats(t, sim_mode, counter, timings, not_converged, step_start)
+
+    @property
+    def last_step_stats(self):
+        """
+            Performance counters of the latest time step as dict (see StepStats).
+        """
+        return self.step_stats.last
+
+    def _add_step_stats(self, t, sim_mode, counter, timings, not_converged, step_start):
+        stats = {'t': t, 'sim_mode': sim_mode}
+        for phase in STEP_PHASES:
+            stats[f'time_{phase}_s'] = timings.get(f'time_{phase}_s', 0.)
+        stats.update(counter)
+        stats['controller_iterations'] = max(counter['control_solves'] - 1, 0)
+        stats['not_converged'] = not_converged
+        stats['time_step_s'] = time.perf_counter() - step_start
+
+        self.step_stats.add(stats)
+
+    def _get_thermal_kernel(self):
+        # Per-pipe reference implementation
+        if self.dynamic_engine == 'reference':
+            return None
+
+        # Create vectorized kernel on first use (built on its first refresh)
+        if self.thermal_kernel is None:
+            self.thermal_kernel = DynamicThermalKernel(order=self.pipe_flow_order)
+        return self.thermal_kernel
+
+    def _get_thermal_solver(self):
+        # Second full pandapipes solve
+        if self.static_engine == 'pandapipes':
+            return None
+
+        # Create sparse solver on first use
+        if self.thermal_solver is None:
+            self.thermal_solver = ThermalNetworkSolver(order=self.pipe_flow_order)
+        return self.thermal_solver
+
+    def _get_plug_flow_kernel(self):
+        # Create plug flow kernel on first use (built on its first refresh)
+        if self.plug_flow_kernel is None:
+            self.plug_flow_kernel = PlugFlowKernel(order=self.pipe_flow_order,
+                                                   n_parcels=self.plugflow_parcels)
+        return self.plug_flow_kernel
+
     def get_value_of_network_component(self, type, name, parameter):
         error = False
 
@@ -149,7 +342,8 @@ class DHNetworkSimulator():
             error = True
 
         if not error:
-            val = get_value_of(component, name, type, parameter, result)
+            self.network_index.refresh(self.net, deep=False)
+            val = get_value_of(component, name, type, parameter, result, index=self.network_index)
             return val
 
     def set_value_of_network_component(self, type, name, parameter, value):
@@ -175,15 +369,164 @@ class DHNetworkSimulator():
             error = True
 
         if not error:
-            set_value_of(component, name, type, parameter, value)
+            self.network_index.refresh(self.net, deep=False)
+            set_value_of(component, name, type, parameter, value, index=self.network_index)
+
+    def resolve(self, type, names, parameters):
+        """
+            Resolve parameters of network components of the same type to a reusable ComponentHandle.
+            parameters: One parameter for all components or a list of parameters (one per component name).
+        """
+        self.network_index.refresh(self.net)
+        return ComponentHandle(type, names, parameters, net=self.net, index=self.network_index)
+
+    def get_values(self, handle):
+        """
+            Get the values of a resolved handle as vector (ordered like the component names of the handle).
+        """
+        return self._refresh_handle(handle).get(self.net)
+
+    def set_values(self, handle, values):
+        """
+            Set the values of a resolved handle from a vector (ordered like the component names of the handle).
+        """
+        self._refresh_handle(handle).set(self.net, values)
+
+    def add_joint_valve_control(self, names=None, name='joint_valve_ctrl'):
+        """
+            Replace the CtrlValves (all in service CtrlValves if no names are given) by one JointValveCtrl.
+        """
+        if names is None:
+            controllers = [c for c, in_service in zip(self.net.controller['object'], self.net.controller['in_service'])
+                           if isinstance(c, CtrlValve) and in_service]
+        else:
+            self.network_index.refresh(self.net)
+            controllers = [self.net.controller.at[self.network_index.position('controller', n), 'object'] for n in names]
+
+        return JointValveCtrl(net=self.net,
+                              controllers=controllers,
+                              name=name)
+
+    def attach_recorder(self, recorder):
+        """
+            Attach a ResultsRecorder (or a list of channel specs) which records after each time step of run_simulation().
+        """
+        if not isinstance(recorder, ResultsRecorder):
+            recorder = ResultsRecorder(recorder)
+        self.network_index.refresh(self.net)
+        recorder.resolve(self.net, self.network_index)
+        self.recorders.append(recorder)
+        return recorder
+
+    def detach_recorder(self, recorder):
+        self.recorders.remove(recorder)
+
+    def snapshot(self):
+        """
+            Take an in-memory snapshot of the simulation state and get its token for restore(), e.g. to retry a time step
+            of a co-simulation. The snapshot contains copies of the network tables (incl. results), the controller
+            states, the historical data and the plug flow parcels. Attached recorders and the performance counters are
+            not part of the snapshot. The oldest snapshot is evicted after max_snapshots.
+        """
+        kernel = self.plug_flow_kernel
+        state = {'net': get_net_state(self.net),
+                 'controllers': get_controller_state(self.net),
+                 'historical_data': _copy_historical_data(self.historical_data),
+                 'plug_flow': kernel.get_state() if kernel is not None and kernel.build_count else None,
+                 'pipeflow_stats': dict(self.pipeflow_stats)}
+
+        return self.snapshots.add(state)
+
+    def restore(self, token):
+        """
+            Restore the simulation state of a snapshot (the snapshot is kept and can be restored again).
+        """
+        state = self.snapshots.get(token)
+
+        set_net_state(self.net, state['net'])
+        set_controller_state(state['controllers'])
+        self.historical_data = _copy_historical_data(state['historical_data'])
+        if state['plug_flow'] is None:
+            self.plug_flow_kernel = None
+        elif self.plug_flow_kernel is not None:
+            self.plug_flow_kernel.set_state(state['plug_flow'])
+        self.pipeflow_stats = dict(state['pipeflow_stats'])
+
+        # Rebuild topology index if the restored tables differ
+        self.network_index.refresh(self.net)
+
+    def _refresh_handle(self, handle):
+        # Resolve the handle again if the topology index has been rebuilt
+        self.network_index.refresh(self.net, deep=False)
+        if handle.index_signature != (id(self.network_index), self.network_index.build_count):
+            handle.resolve(self.net, self.network_index)
+        return handle
 
     def plot_network_topology(self):
+        # Load plotting on first use (headless simulations do not import it)
+        import pandapipes.plotting as plot
+
         # plot network
         plot.simple_plot(self.net, plot_sinks=True, plot_sources=True, sink_size=4.0, source_size=4.0)
 
-    def load_data(self):
-        # TODO: Create API for datafiles in .csv format
-        file = ''
-        profiles_source = pd.read_csv(file, index_col=0)
+    def run_timeseries(self, profiles, input_map, outputs, t_range=None, sim_mode='static'):
+        """
+            Run the simulation for the time steps of the profiles (DataFrame, DFData, MemmapProfileData or path of a .csv
+            file).
+            The component names of the input map and outputs are resolved once, see TimeseriesRunner.
+            Returns a DataFrame of the outputs (time steps x outputs).
+        """
+        from .timeseries import TimeseriesRunner
+
+        self.network_index.refresh(self.net)
+        runner = TimeseriesRunner(net=self.net,
+                                  index=self.network_index,
+                                  profiles=profiles,
+                                  input_map=input_map,
+                                  outputs=outputs,
+                                  t_range=t_range)
+
+        for step, t in enumerate(runner.t_range):
+            runner.set_inputs(self.net, step)
+            self.run_simulation(t, sim_mode=sim_mode)
+            runner.get_outputs(self.net, step)
+
+        return runner.to_frame()
+
+    def run_sweep(self, scenarios, profiles, input_map, outputs, t_range=None, sim_mode='static', max_workers=None):
+        """
+            Run the time series of scenario variants (parameter deltas and profile scalings) of the current network on
+            a pool of worker processes, see ParameterSweep. Returns a list of DataFrames (ordered like the scenarios).
+        """
+        from .sweep import ParameterSweep
+
+        with ParameterSweep(simulator=self,
+                            profiles=profiles,
+                            input_map=input_map,
+                            outputs=outputs,
+                            t_range=t_range,
+                            sim_mode=sim_mode,
+                            max_workers=max_workers) as sweep:
+            return sweep.run(scenarios)
+
+    def load_data(self, path, index_col=0, memory_map=False, interpolate=False, **kwargs):
+        """
+            Load profile data from a .csv file (index column: time steps) as pandapower data source. With
+            memory_map=True, the .csv file is converted once into a memory mapped profile data source (large profiles
+            shared by controllers and worker processes, optionally interpolated between the time steps), see
+            MemmapProfileData.
+        """
+        if memory_map:
+            from .io.profile_data import MemmapProfileData
+            return MemmapProfileData.from_csv(path, index_col=index_col, interpolate=interpolate, **kwargs)
+
+        from pandapower.timeseries.data_sources.frame_data import DFData
+
+        profiles_source = pd.read_csv(path, index_col=index_col, **kwargs)
         data_source = DFData(profiles_source)
-        return data_source
\ No newline at end of file
+        return data_source
+
+
+def _copy_historical_data(historical_data):
+    # Copy the history buffers of all datapoints
+    return {key: {param: buffer.copy() for param, buffer in params.items()} for key, params in historical_data.items()}
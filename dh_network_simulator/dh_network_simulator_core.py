@@ -3,128 +3,294 @@ import numpy as np
 import math
 import pandapipes as pp
 import pandapipes.control.run_control as run_control
-import sys
-from collections import deque
+from pandapipes.idx_node import PINIT
+import time
 from .io.import_export import *
 from .constants import *
+from .network_index import NetworkIndex
+from .history import HistoryBuffer
 
-# Do not print python UserWarnings
-if not sys.warnoptions:
-    import warnings
+# Controller variables of the run_control loop (counted pipeflow calls, plain loop if not available)
+try:
+    from pandapipes.control.run_control import prepare_run_ctrl
+except ImportError:
+    prepare_run_ctrl = None
 
-def run_hydraulic_control(net, **kwargs):
+# Initial flow column of the branch pit (velocities up to pandapipes 0.6, mass flows of later versions)
+try:
+    from pandapipes.idx_branch import VINIT as FLOW_INIT
+except ImportError:
+    from pandapipes.idx_branch import MDOTINIT as FLOW_INIT
+
+# Result tables of the branch and node components
+RESULT_TABLES = ('res_junction', 'res_pipe', 'res_valve', 'res_heat_exchanger', 'res_sink', 'res_source', 'res_ext_grid')
+
+def run_hydraulic_control(net, counter=None, **kwargs):
     """
         Run hydraulic control step (mass flows and pressures) of the dhs by considering the controller setpoints and hierarchy.
+        The pipeflow calls and Newton iterations of the controller iterations are counted in the optional counter dict.
+        Without counter (or without prepare_run_ctrl of pandapipes), the plain run_control loop is run.
     """
-    # run pandapipes hydraulic control
-    run_control(net, max_iter=100, **kwargs)
+    if prepare_run_ctrl is None or counter is None:
+        # run pandapipes hydraulic control
+        run_control(net, max_iter=100, **kwargs)
+    else:
+        # run pandapipes hydraulic control with counted pipeflow calls
+        ctrl_variables = prepare_run_ctrl(net, None)
+        ctrl_variables['run'] = _count_calls_of(ctrl_variables['run'], counter,
+                                                ('control_solves', 'hydraulic_solves', 'pipeflow_calls'),
+                                                iterations='newton_iterations')
+        run_control(net, ctrl_variables=ctrl_variables, max_iter=100, **kwargs)
 
 
-def run_static_pipeflow(net):
+def run_static_pipeflow(net, solver=None, index=None, fused=False, counter=None, timings=None):
     """
         Run the static temperature flow simulation step of the dhs.
+        If a ThermalNetworkSolver is given, the temperatures are calculated by the sparse linear solver based on the
+        current hydraulic results instead of a second full pandapipes solve.
+        If fused is True, a single heat transfer solve is run based on the hydraulic results of the controller iterations.
+        The wall times of the phases are summed up in the optional timings dict.
+    """
+    if counter is None:
+        counter = {}
+    start = time.perf_counter()
+
+    if solver is not None:
+        # Build topology index if not provided by the caller
+        if index is None:
+            index = NetworkIndex(net)
+        solver.solve(net=net,
+                     index=index)
+        add_time(timings, 'time_thermal_s', start)
+    elif fused and '_active_pit' in net:
+        run_heat_transfer(net)
+        counter['heat_solves'] = counter.get('heat_solves', 0) + 1
+        counter['pipeflow_calls'] = counter.get('pipeflow_calls', 0) + 1
+        add_time(timings, 'time_thermal_s', start)
+    else:
+        pp.pipeflow(net, transient=False, mode="all", max_iter=100, run_control=True, heat_transfer=True)
+        counter['hydraulic_solves'] = counter.get('hydraulic_solves', 0) + 1
+        counter['heat_solves'] = counter.get('heat_solves', 0) + 1
+        counter['pipeflow_calls'] = counter.get('pipeflow_calls', 0) + 1
+        add_time(timings, 'time_hydraulic_s', start)
+
+def run_heat_transfer(net):
+    """
+        Run a single heat transfer solve of the dhs based on the hydraulic results of the latest pipeflow.
+    """
+    # Hydraulic solution of the latest pipeflow (pressures of the nodes and flows of the branches)
+    sol_vec = np.concatenate([net['_active_pit']['node'][:, PINIT], net['_active_pit']['branch'][:, FLOW_INIT]])
+    hydraulic_results = {key: net[key].copy() for key in RESULT_TABLES if key in net}
+
+    pp.pipeflow(net, sol_vec=sol_vec, transient=False, mode="heat", max_iter=100, heat_transfer=True)
+
+    # Keep the hydraulic results and update the temperatures only
+    for key, result in hydraulic_results.items():
+        for column in ('t_k', 't_from_k', 't_to_k'):
+            if column in result and column in net[key] and len(net[key]) == len(result):
+                result[column] = net[key][column].values
+        net[key] = result
+
+def get_saved_pipeflow_solves(counter, sim_mode):
+    """
+        Get the number of pandapipes solves saved compared to the default step (controller iterations followed by a
+        full hydraulic and heat transfer solve in static mode).
     """
-    pp.pipeflow(net, transient=False, mode="all", max_iter=100, run_control=True, heat_transfer=True)
+    if sim_mode != 'static':
+        return 0
 
-def run_dynamic_pipeflow(net, t, historical_data, collector_connections):
+    default_solves = counter.get('control_solves', 0) + 2
+
+    return default_solves - counter.get('hydraulic_solves', 0) - counter.get('heat_solves', 0)
+
+def get_not_converged_controllers(net):
+    """
+        Get the names of the in service controllers which have not converged (index of unnamed controllers).
+    """
+    names = []
+    in_service = net.controller['in_service'].values.astype(bool)
+    for i, controller in net.controller['object'][in_service].items():
+        if not controller.is_converged(net):
+            names.append(getattr(controller, 'name', '') or str(i))
+
+    return names
+
+def add_time(timings, key, start):
+    """
+        Add the wall time since start (time.perf_counter()) to a key of the optional timings dict.
+    """
+    if timings is not None:
+        timings[key] = timings.get(key, 0.) + time.perf_counter() - start
+
+def _count_calls_of(function, counter, keys, iterations=None):
+    """
+        Wrap a function to count its calls in a counter dict.
+        If iterations is given, the Newton iterations of the pipeflow calls are summed up under this key.
+    """
+    def counted(net, *args, **kwargs):
+        for key in keys:
+            counter[key] = counter.get(key, 0) + 1
+        result = function(net, *args, **kwargs)
+        if iterations is not None:
+            counter[iterations] = counter.get(iterations, 0) + _get_newton_iterations(net)
+        return result
+
+    return counted
+
+def _get_newton_iterations(net):
+    """
+        Get the number of Newton iterations of the latest pipeflow.
+    """
+    if '_internal_results' not in net or net['_internal_results'] is None:
+        return 0
+
+    return int(net['_internal_results'].get('iterations', 0))
+
+def run_dynamic_pipeflow(net, t, historical_data, collector_connections, index=None, kernel=None, order=None,
+                         timings=None):
     """
         Run the dynamic temperature flow simulation step of the dhs.
+        If a DynamicThermalKernel is given, the pipes are calculated level-wise by the vectorized kernel.
+        Otherwise, the pipes are calculated successively (reference implementation). A cached PipeFlowOrder is
+        reused for the pipe stream if given. The wall times of the phases are summed up in the optional timings dict.
     """
+    start = time.perf_counter()
+
+    # Build topology index if not provided by the caller
+    if index is None:
+        index = NetworkIndex(net)
+
     # Dynamic heat flow distribution
-    _dynamic_temp_flow_sim(net=net,
-                           historical_data=historical_data,
-                           t=t)
+    if kernel is not None:
+        kernel.refresh(net=net,
+                       index=index)
+        kernel.run(net=net,
+                   historical_data=historical_data,
+                   t=t)
+    else:
+        _dynamic_temp_flow_sim(net=net,
+                               historical_data=historical_data,
+                               t=t,
+                               index=index,
+                               order=order)
+    add_time(timings, 'time_thermal_s', start)
 
     # Store historic values
+    start = time.perf_counter()
     enqueue_results(net=net,
                     queue=historical_data,
                     collector_connections=collector_connections,
-                    cur_t=t)
+                    cur_t=t,
+                    horizon=get_max_transit_time(net))
+    add_time(timings, 'time_enqueue_s', start)
 
-def _dynamic_temp_flow_sim(net, historical_data, t):
+def run_plugflow_pipeflow(net, t, kernel, index=None):
+    """
+        Run the Lagrangian plug flow temperature simulation step of the dhs (no historical data required).
+    """
+    # Build topology index if not provided by the caller
+    if index is None:
+        index = NetworkIndex(net)
+
+    # Advance the fluid parcels of all pipes
+    kernel.refresh(net=net,
+                   index=index)
+    kernel.run(net=net,
+               historical_data=None,
+               t=t)
+
+def _dynamic_temp_flow_sim(net, historical_data, t, index, order=None):
     """
         Dynamic temperature flow simulation step considering the thermal inertia in the network.
     """
     # Get pipe stream according to the temperature flow in the network
-    pipe_stream = _get_pipe_stream_of(net=net)
+    pipe_stream = _get_pipe_stream_of(net=net,
+                                      index=index,
+                                      order=order)
 
     # Simulate temperature flow according to determined pipe stream
     _dynamic_temp_flow_sim_of(net=net,
                               pipe_stream=pipe_stream,
                               historical_data=historical_data,
-                              t=t)
+                              t=t,
+                              index=index)
 
-def _dynamic_temp_flow_sim_of(net, pipe_stream, historical_data, t):
+def _dynamic_temp_flow_sim_of(net, pipe_stream, historical_data, t, index):
     """
         Successive temperature flow calculation for a given pipe stream (from heat injection towards the consumers).
     """
     for pipe in pipe_stream:
         inlet_junction = _get_inlet_junction_of_pipe(net=net,
-                                                     pipe=pipe)
+                                                     pipe=pipe,
+                                                     index=index)
 
         _dynamic_temp_flow_calc_of(net=net,
                                    pipe=pipe,
-                                   historical_data=historical_data['junction'][inlet_junction],
+                                   historical_data=historical_data['junction'],
                                    inlet_junction=inlet_junction,
-                                   t=t)
+                                   t=t,
+                                   index=index)
 
         _update_temperatures_of_connected_junctions_to(net=net,
-                                                       pipe=pipe)
+                                                       pipe=pipe,
+                                                       index=index)
 
         _update_temperatures_of_connected_hex_to(net=net,
-                                                 pipe=pipe)
+                                                 pipe=pipe,
+                                                 index=index)
 
-def _get_inlet_junction_of_pipe(net, pipe):
+def _get_inlet_junction_of_pipe(net, pipe, index):
     """
         Get network junction connected to the inlet of the pipe.
     """
-    # Get list of pipes and junction of the network
-    p = net.pipe['name'].to_list()
-    j = net.junction['name'].to_list()
-
     # Get index of connected junction to pipe inlet
-    index = net.pipe.at[p.index(pipe), 'from_junction']
+    j_id = net.pipe.at[index.position('pipe', pipe), 'from_junction']
 
-    return j[index]
+    return net.junction.at[j_id, 'name']
 
-def _calc_consumer_return_temperature(net, hex):
+def _calc_consumer_return_temperature(net, hex, index):
     """
         Get network junction connected to the inlet of the pipe.
     """
-    h = net.heat_exchanger['name'].to_list()
-    p = net.pipe['name'].to_list()
+    h_id = index.position('heat_exchanger', hex)
 
-    from_j_id = net.heat_exchanger.at[h.index(hex), 'from_junction']
-    to_j_id = net.heat_exchanger.at[h.index(hex), 'to_junction']
-    qext_w = net.heat_exchanger.at[h.index(hex), 'qext_w']
+    from_j_id = net.heat_exchanger.at[h_id, 'from_junction']
+    to_j_id = net.heat_exchanger.at[h_id, 'to_junction']
+    qext_w = net.heat_exchanger.at[h_id, 'qext_w']
     forward_temp = net.res_junction.at[from_j_id, 't_k']
-    mdot = net.res_heat_exchanger.at[h.index(hex), 'mdot_from_kg_per_s']
+    mdot = net.res_heat_exchanger.at[h_id, 'mdot_from_kg_per_s']
     Cp_w = ISOBARIC_SPECIFIC_HEAT_WATER
 
     # Set forward temperature to hex component
-    net.res_heat_exchanger.at[h.index(hex), 't_from_k'] = forward_temp
+    net.res_heat_exchanger.at[h_id, 't_from_k'] = forward_temp
 
     # Calc return temperature at hex component
     return_temp = forward_temp - qext_w / (Cp_w * mdot)
 
     # Set return temperature at hex component and connected junctions and pipes
-    net.res_heat_exchanger.at[h.index(hex), 't_to_k'] = return_temp
+    net.res_heat_exchanger.at[h_id, 't_to_k'] = return_temp
     net.res_junction.at[to_j_id, 't_k'] = return_temp
 
-    conn_p_name = net.pipe['name'].loc[net.pipe['from_junction'] == to_j_id].values.tolist()
-    for pipe in conn_p_name:
-        net.res_pipe.at[p.index(pipe), 't_from_k'] = return_temp
+    for p_id in index.connected('pipe', to_j_id, side='from'):
+        net.res_pipe.at[p_id, 't_from_k'] = return_temp
 
-def _get_pipe_stream_of(net, type='pipe'):
+def _get_pipe_stream_of(net, type='pipe', index=None, order=None):
     """
         Get the pipe stream in the network from heat injection towards the consumers.
+        If a PipeFlowOrder is given, the pipes are sorted topologically along the flow direction (cached).
     """
     # Get subset of pipes based on 'type' (deprecated!)
     # pipe_index = net.pipe['name'].loc[net.pipe['type'] == type].index.tolist()
 
-    # Sort pipes by pressure drop along the network
-    pipe_stream = _get_pipe_flow_by_pressures(net=net,
-                                              pipe_index=net.pipe['name'].index.tolist())
+    if order is not None:
+        # Sort pipes topologically along the flow direction
+        order.update(net=net,
+                     index=index if index is not None else NetworkIndex(net))
+        pipe_stream = net.pipe['name'].values[order.stream]
+    else:
+        # Sort pipes by pressure drop along the network
+        pipe_stream = _get_pipe_flow_by_pressures(net=net,
+                                                  pipe_index=net.pipe['name'].index.tolist())
 
     if not pipe_stream.size:
         # Throw RuntimeError
@@ -144,192 +310,216 @@ def _get_pipe_flow_by_pressures(net, pipe_index):
 
     return pipenames
 
-def _dynamic_temp_flow_calc_of(net, pipe, historical_data, inlet_junction, t):
+def _dynamic_temp_flow_calc_of(net, pipe, historical_data, inlet_junction, t, index):
     """
         Dynamic temperature flow calculation for a given pipe based on the mass flow, pipe length and ambient temperature.
     """
-    # Set list of network junctions and pipes
-    p = net.pipe['name'].to_list()
-    j = net.junction['name'].to_list()
+    p_id = index.position('pipe', pipe)
 
     # Get required input parameters
     Cp_w = ISOBARIC_SPECIFIC_HEAT_WATER
-    mf = net.res_pipe.at[p.index(pipe), 'mdot_from_kg_per_s']
-    dx = net.pipe.at[p.index(pipe), 'length_km'] * 1000
-    v_mean = net.res_pipe.at[p.index(pipe), 'v_mean_m_per_s']
-    alpha = net.pipe.at[p.index(pipe), 'alpha_w_per_m2k']
-    dia = net.pipe.at[p.index(pipe), 'diameter_m']
+    mf = net.res_pipe.at[p_id, 'mdot_from_kg_per_s']
+    dx = net.pipe.at[p_id, 'length_km'] * 1000
+    v_mean = net.res_pipe.at[p_id, 'v_mean_m_per_s']
+    alpha = net.pipe.at[p_id, 'alpha_w_per_m2k']
+    dia = net.pipe.at[p_id, 'diameter_m']
     loss_coeff = alpha * math.pi * dia  # Heat loss coefficient in [W/mK]
-    Ta = net.pipe.at[p.index(pipe), 'text_k']
+    Ta = net.pipe.at[p_id, 'text_k']
 
     # Get historic inlet temperature
-    if historical_data['t_k']:
-        df = pd.DataFrame().from_records(historical_data['t_k'], columns=['ts', 't_k'], index=['ts'])
+    history = historical_data['t_k']
+    if len(history):
         dt = dx / v_mean
         delay_t = t - dt
-        Tin = np.interp(delay_t, df.index, df['t_k'])
+        Tin = history.interp(history.rows[inlet_junction], delay_t)
     else:
-        Tin = net.res_junction.at[j.index(inlet_junction), 't_k']
+        Tin = net.res_junction.at[index.position('junction', inlet_junction), 't_k']
 
     # Set current inlet temperature of pipe
-    net.res_pipe.at[p.index(pipe), 't_from_k'] = Tin
+    net.res_pipe.at[p_id, 't_from_k'] = Tin
 
     # Dynamic temperature drop along a pipe
     exp = - (loss_coeff * dx) / (Cp_w * mf)
     Tout = Ta + (Tin - Ta) * math.exp(exp)
 
     # Set pipe outlet temperature
-    net.res_pipe.at[p.index(pipe), 't_to_k'] = Tout
+    net.res_pipe.at[p_id, 't_to_k'] = Tout
 
-def _get_connected_junctions_id(net, pipe):
+def _get_connected_junctions_id(net, pipe, index):
     """
-        Dynamic temperature flow calculation for a given pipe based on the mass flow, pipe length and ambient temperature.
+        Get the junctions connected to the end of a pipe (directly or via an opened valve).
     """
-    p = net.pipe['name'].to_list()
-    v = net.valve['name'].to_list()
-
     # Get connected junctions (direct and indirect)
     # Check direct connection via junction
     j_ids = []
-    j_ids.append(net.pipe.at[p.index(pipe), 'to_junction'])
+    j_ids.append(net.pipe.at[index.position('pipe', pipe), 'to_junction'])
 
     # Check connection via valve
-    valve_names = net.valve['name'].loc[net.valve['from_junction'].isin(j_ids)].values.tolist()
-    for valve in valve_names:
-        opened = net.valve.at[v.index(valve), 'opened']
+    for v_id in index.connected('valve', j_ids[0], side='from'):
+        opened = net.valve.at[v_id, 'opened']
         if opened:
-            j_ids.append(net.valve.at[v.index(valve), 'to_junction'])
+            j_ids.append(net.valve.at[v_id, 'to_junction'])
 
     # Get connected junction names
-    j_names = net.junction['name'].iloc[j_ids].values.tolist()
+    j_names = net.junction['name'].loc[j_ids].values.tolist()
 
     return j_ids, j_names
 
 
-def _update_temperatures_of_connected_junctions_to(net, pipe):
+def _update_temperatures_of_connected_junctions_to(net, pipe, index):
     """
         Overwrite the temperatures of the junction(s) connected to the end of a pipe.
     """
     # Get connected junctions to the pipe end
     j_ids, j_names = _get_connected_junctions_id(net=net,
-                                                 pipe=pipe)
+                                                 pipe=pipe,
+                                                 index=index)
 
     # Set temperature at connected junctions
     for junction in j_names:
         _update_pipe_inlet_temperature_at_junction(net=net,
-                                                junction=junction)
+                                                   junction=junction,
+                                                   index=index)
 
-def _update_temperatures_of_connected_hex_to(net, pipe):
+def _update_temperatures_of_connected_hex_to(net, pipe, index):
     """
         Overwrite the temperatures of the connected heat exchangers connected to the end of a pipe.
     """
     # Get connected junctions to the pipe end
     j_ids, j_names = _get_connected_junctions_id(net=net,
-                                                 pipe=pipe)
+                                                 pipe=pipe,
+                                                 index=index)
 
     # Set hex consumer return temperature
-    hex_name = net.heat_exchanger['name'].loc[net.heat_exchanger['from_junction'].isin(j_ids)].values.tolist()
-    for hex in hex_name:
+    hex_ids = sorted(set([h_id for j_id in j_ids for h_id in index.connected('heat_exchanger', j_id, side='from')]))
+    for h_id in hex_ids:
         # Set temperature at the return side of each hex consumer
         _calc_consumer_return_temperature(net=net,
-                                          hex=hex)
+                                          hex=net.heat_exchanger.at[h_id, 'name'],
+                                          index=index)
 
-def _update_pipe_inlet_temperature_at_junction(net, junction):
+def _update_pipe_inlet_temperature_at_junction(net, junction, index):
     """
         Overwrites the inlet temperature of all pipes connected to a junction.
         If a valve is connected to the junction, it also overwrites the inlet temperature of pipes connected to the outlet of the valve.
     """
-    j = net.junction['name'].to_list()
-    p = net.pipe['name'].to_list()
-    v = net.valve['name'].to_list()
+    j_id = index.position('junction', junction)
 
-    conn_j_id = [j.index(junction)]
+    conn_j_id = [j_id]
     # Get number of incoming pipes
     # Check connection via valve
-    conn_v_name = net.valve['name'].loc[net.valve['to_junction'].isin(conn_j_id)].values.tolist()
-    for valve in conn_v_name:
-        opened = net.valve.at[v.index(valve), 'opened']
+    for v_id in index.connected('valve', j_id, side='to'):
+        opened = net.valve.at[v_id, 'opened']
         if opened:
-            conn_j_id.append(net.valve.at[v.index(valve), 'from_junction'])
-    pipes_in = net.pipe['name'].loc[net.pipe['to_junction'].isin(conn_j_id)].values.tolist()
+            conn_j_id.append(net.valve.at[v_id, 'from_junction'])
+    pipes_in = sorted(set([p_id for j in conn_j_id for p_id in index.connected('pipe', j, side='to')]))
 
     mfsum = []
     mtsum = []
     if pipes_in:
-        for name in pipes_in:
+        for p_id in pipes_in:
             # Do temperature mix weighted by share of incoming mass flow
-            mdot = net.res_pipe.at[p.index(name), 'mdot_from_kg_per_s']
-            t_in = net.res_pipe.at[p.index(name), 't_to_k']
+            mdot = net.res_pipe.at[p_id, 'mdot_from_kg_per_s']
+            t_in = net.res_pipe.at[p_id, 't_to_k']
             mfsum.append(mdot)
             mtsum.append(mdot * t_in)
         Tset = (1 / sum(mfsum)) * sum(mtsum)
     else:
         raise AttributeError(f"Junction '{junction}' not connected to a network pipe.")
 
-    net.res_junction.at[j.index(junction), 't_k'] = Tset
+    net.res_junction.at[j_id, 't_k'] = Tset
 
-def set_value_of(component, name, type, parameter, value):
+def set_value_of(component, name, type, parameter, value, index=None):
     """
         Public setter for the pandapipes network component parameters and attributes.
+        The optional NetworkIndex replaces the linear search of the component name.
     """
     # Call controller object and set attribute by name (str)
     if type == 'controller':
-        index = [c.name for c in component['object']].index(name)
-        c = component['object'].iloc[index]
+        c = _get_controller_object(component, name, index)
         setattr(c, parameter, value)
 
     # Get parameter from component dataframe
     else:
-        index = component.name.to_list().index(name)
-        component.at[index, parameter] = value
+        if index is None:
+            c_id = component.index[component.name.to_list().index(name)]
+        else:
+            c_id = index.position(type, name)
+        component.at[c_id, parameter] = value
 
-def get_value_of(component, name, type, parameter, result):
+def get_value_of(component, name, type, parameter, result, index=None):
     """
         Public getter for the pandapipes network component parameters and attributes.
+        The optional NetworkIndex replaces the linear search of the component name.
     """
     if type == 'controller':
-        index = [c.name for c in component['object']].index(name)
-        c = component['object'].iloc[index]
+        c = _get_controller_object(component, name, index)
         value = getattr(c, parameter)
 
     else:
         # Search for component index by name
-        index = component.name.to_list().index(name)
-        value = result.at[index, parameter]
+        if index is None:
+            c_id = component.index[component.name.to_list().index(name)]
+        else:
+            c_id = index.position(type, name)
+        value = result.at[c_id, parameter]
 
     return value
 
-def enqueue_results(net, cur_t, queue, collector_connections):
+def _get_controller_object(component, name, index=None):
+    """
+        Get controller object of the controller table by name.
+    """
+    if index is None:
+        c_id = [getattr(c, 'name', None) for c in component['object']].index(name)
+        return component['object'].iloc[c_id]
+
+    return component.at[index.position('controller', name), 'object']
+
+def enqueue_results(net, cur_t, queue, collector_connections, horizon=None):
     """
         Enqueue simulation results of defined connections to a data storage queue.
+        If a time horizon is given, the queue is auto-sized to cover the horizon.
     """
     for key, param_list in collector_connections.items():
         component = getattr(net, key)
         result = getattr(net, 'res_'+key)
 
-        for i in component.name:
-            for param in param_list:
-                index = component['name'].to_list().index(i)
-                val = round(result.at[index, param], 2)
-                queue[key][i][param].append((cur_t, val))
+        for param in param_list:
+            # Reinitialize queue if the components have changed
+            if queue[key][param].names != component.name.to_list():
+                queue[key][param] = HistoryBuffer(component.name, max_horizon_s=queue[key][param].max_horizon_s)
+
+            if horizon is not None:
+                queue[key][param].fit_horizon(horizon)
+
+            values = result[param].reindex(component.index).values
+            queue[key][param].append(cur_t, np.round(values, 2))
 
     return queue
 
-def dequeue_results(t, queue, collector_connections, auto_sizing_enabled='False'):
+def dequeue_results(t, queue, collector_connections):
     """
-        Dequeue simulation results of defined connections from a data storage queue.
+        Dequeue simulation results of defined connections from a data storage queue at a (delayed) time t.
     """
-    if isinstance(queue, list):
-        if auto_sizing_enabled == 'True':
-            val = queue.pop()
-        else:
-            val = queue.index()
+    results = {}
+    for key, param_list in collector_connections.items():
+        results[key] = {}
+        for param in param_list:
+            history = queue[key][param]
+            results[key][param] = history.interp(np.arange(len(history.names)), t)
 
+    return results
 
-    elif isinstance(queue, deque):
-        if auto_sizing_enabled == 'True':
-            val = queue.pop()
-        else:
-            val = queue.index()
+def get_max_transit_time(net):
+    """
+        Get the longest transit time of the fluid through a network pipe (dx / v_mean) in seconds.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        transit_time = net.pipe['length_km'].values * 1000 / np.abs(net.res_pipe['v_mean_m_per_s'].values)
+
+    transit_time = transit_time[np.isfinite(transit_time)]
+    if not transit_time.size:
+        return 0.
 
-    return val
\ No newline at end of file
+    return float(transit_time.max())
@@ -0,0 +1,142 @@
+import copy
+import math
+import numpy as np
+
+DEFAULT_CAPACITY = 8  # initial number of stored time steps
+DEFAULT_MAX_HORIZON_S = 6 * 60 * 60  # upper bound of the auto-sized history horizon in seconds
+
+
+class HistoryBuffer():
+    """
+        Bounded circular buffer of the historic values of one parameter of a network component table.
+
+        The values of all components are stored in one preallocated 2-D array (components x time steps) sharing a
+        common time axis. Once the buffer is full, the oldest time step is overwritten. The capacity grows
+        automatically (auto sizing) to cover the longest delay which is requested by the dynamic simulation.
+    """
+
+    def __init__(self, names, capacity=DEFAULT_CAPACITY, max_horizon_s=DEFAULT_MAX_HORIZON_S):
+        self.names = list(names)
+        self.rows = {name: i for i, name in reversed(list(enumerate(self.names)))}
+        self.max_horizon_s = max_horizon_s
+        self.values = np.full((len(self.names), capacity), np.nan)
+        self.times = np.full(capacity, np.nan)
+        self.head = 0  # next write position
+        self.size = 0
+
+    def __repr__(self):
+        return f'HistoryBuffer(rows={len(self.names)}, size={self.size}, capacity={self.capacity})'
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def capacity(self):
+        return len(self.times)
+
+    @property
+    def start(self):
+        """
+            Physical position of the oldest stored time step.
+        """
+        return (self.head - self.size) % self.capacity
+
+    def append(self, t, values):
+        """
+            Store the values of all components at time t. Stored time steps >= t are discarded first.
+        """
+        while self.size and self.times[(self.head - 1) % self.capacity] >= t:
+            self.head = (self.head - 1) % self.capacity
+            self.size -= 1
+
+        self.times[self.head] = t
+        self.values[:, self.head] = values
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def fit_horizon(self, horizon_s):
+        """
+            Grow the capacity to cover a time horizon based on the latest time step size (never shrinks).
+        """
+        if self.size < 2:
+            return self
+
+        latest = (self.head - 1) % self.capacity
+        dt = self.times[latest] - self.times[(latest - 1) % self.capacity]
+        if not dt > 0 or not np.isfinite(horizon_s):
+            return self
+
+        horizon_s = min(horizon_s, self.max_horizon_s)
+        required = math.ceil(horizon_s / dt) + 2
+        if required > self.capacity:
+            max_capacity = math.ceil(self.max_horizon_s / dt) + 2
+            self.resize(min(max(required, 2 * self.capacity), max_capacity))
+
+        return self
+
+    def resize(self, capacity):
+        """
+            Reallocate the buffer with a new capacity keeping the latest time steps in chronological order.
+        """
+        order = (self.start + np.arange(self.size)) % self.capacity
+        order = order[max(0, self.size - capacity):]
+
+        values = np.full((len(self.names), capacity), np.nan)
+        times = np.full(capacity, np.nan)
+        values[:, :len(order)] = self.values[:, order]
+        times[:len(order)] = self.times[order]
+
+        self.values = values
+        self.times = times
+        self.size = len(order)
+        self.head = self.size % capacity
+
+        return self
+
+    def interp(self, rows, t):
+        """
+            Linear interpolation of the stored values of the given rows at the times t (equal to np.interp of each
+            row, values outside the stored time range are clamped). Returns NaN if the buffer is empty.
+        """
+        rows = np.asarray(rows)
+        t = np.asarray(t, dtype=np.float64)
+        if not self.size:
+            return np.full(np.broadcast(rows, t).shape, np.nan)
+
+        # Logical position by searching in the two sorted segments of the circular buffer (older, newer)
+        start = self.start
+        end = start + self.size
+        older = self.times[start:min(end, self.capacity)]
+        newer = self.times[0:max(0, end - self.capacity)]
+        k = np.searchsorted(older, t, side='right') + np.searchsorted(newer, t, side='right')
+
+        lo = (start + np.clip(k - 1, 0, self.size - 1)) % self.capacity
+        hi = (start + np.clip(k, 0, self.size - 1)) % self.capacity
+        t_lo = self.times[lo]
+        t_hi = self.times[hi]
+        v_lo = self.values[rows, lo]
+        v_hi = self.values[rows, hi]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            w = np.where(t_hi > t_lo, (t - t_lo) / (t_hi - t_lo), 0.)
+
+        return np.where(np.isnan(t), np.nan, v_lo + w * (v_hi - v_lo))
+
+    def copy(self):
+        """
+            Get an independent copy of the buffer (stored time steps and capacity).
+        """
+        buffer = copy.copy(self)
+        buffer.values = self.values.copy()
+        buffer.times = self.times.copy()
+
+        return buffer
+
+    def to_records(self, name):
+        """
+            Get the stored (t, value) tuples of a component in chronological order.
+        """
+        order = (self.start + np.arange(self.size)) % self.capacity
+        row = self.rows[name]
+
+        return list(zip(self.times[order].tolist(), self.values[row, order].tolist()))
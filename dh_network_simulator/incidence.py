@@ -0,0 +1,110 @@
+import numpy as np
+import scipy.sparse as sp
+from .constants import ISOBARIC_SPECIFIC_HEAT_WATER
+
+
+class JunctionIncidence():
+    """
+        Sparse incidence matrices of the directed network branches (PipeFlowOrder) containing the following objects:
+            pipe_in/pipe_out: Junctions x pipes, 1 if a pipe flows into/out of a junction
+            valve: Junctions x junctions, 1 at [outlet, inlet] of each opened valve
+            mix: Junctions x pipes, incoming pipes of each junction (directly or via an opened valve)
+            hex_in/hex_out: Heat exchangers x junctions, 1 at the inlet/outlet junction of each heat exchanger
+            hex_pipe: Pipes x heat exchangers, 1 if a pipe leaves the outlet junction of a heat exchanger
+
+        The matrices are only rebuilt if the pipe order has changed (valve states or flow directions).
+    """
+
+    def __init__(self):
+        self.signature = None
+        self.build_count = 0
+
+    def __repr__(self):
+        return f'JunctionIncidence(junctions={self.mix.shape[0]}, pipes={self.mix.shape[1]}, builds={self.build_count})'
+
+    def update(self, order, n_junctions):
+        """
+            Rebuild the incidence matrices if the pipe order has been rebuilt since the last update.
+        """
+        signature = (id(order), order.build_count, n_junctions)
+        if signature != self.signature:
+            self.build(order, n_junctions)
+            self.signature = signature
+
+        return self
+
+    def build(self, order, n_junctions):
+        """
+            Build the incidence matrices of the pipes, opened valves and heat exchangers along the flow direction.
+        """
+        n_pipes = len(order.pipe_inlet)
+        n_hexes = len(order.hex_inlet)
+
+        self.pipe_in = _incidence(order.pipe_outlet, n_junctions, n_pipes)
+        self.pipe_out = _incidence(order.pipe_inlet, n_junctions, n_pipes)
+        self.valve = sp.csr_matrix((np.ones(len(order.valve_inlet)), (order.valve_outlet, order.valve_inlet)),
+                                   shape=(n_junctions, n_junctions))
+
+        # Incoming pipes of a junction and of the junctions connected via opened valves
+        self.mix = _binarize(self.pipe_in + self.valve @ self.pipe_in)
+
+        self.hex_in = _incidence(order.hex_inlet, n_junctions, n_hexes).T.tocsr()
+        self.hex_out = _incidence(order.hex_outlet, n_junctions, n_hexes).T.tocsr()
+        self.hex_pipe = _binarize(self.pipe_out.T @ self.hex_out.T)
+
+        self.build_count += 1
+
+        return self
+
+    def targets_of(self, pipes):
+        """
+            Get the junctions connected to the outlet of pipes (directly or via an opened valve).
+        """
+        outlets = np.asarray(self.pipe_in[:, pipes].sum(axis=1)).ravel() > 0
+        reached = outlets | (self.valve @ outlets.astype(np.float64) > 0)
+
+        return np.flatnonzero(reached)
+
+    def hexes_of(self, junctions):
+        """
+            Get the heat exchangers connected to the given inlet junctions.
+        """
+        indicator = np.zeros(self.hex_in.shape[1])
+        indicator[junctions] = 1
+
+        return np.flatnonzero(self.hex_in @ indicator)
+
+
+def mix_temperatures(mix, mdot, t_outlet):
+    """
+        Mass flow weighted temperature mix of the incoming pipes of a batch of junctions (rows of the mix matrix).
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (mix @ (mdot * t_outlet)) / (mix @ mdot)
+
+def hex_return_temperatures(hex_in, t_junction, qext_w, mdot):
+    """
+        Forward and return temperatures T_fwd - qext_w / (cp * mdot) of a batch of heat exchangers.
+    """
+    forward_temp = hex_in @ t_junction
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return_temp = forward_temp - qext_w / (ISOBARIC_SPECIFIC_HEAT_WATER * mdot)
+
+    return forward_temp, return_temp
+
+def _incidence(rows, n_rows, n_columns):
+    """
+        Sparse matrix with a single 1 in each column at the given row.
+    """
+    return sp.csr_matrix((np.ones(n_columns), (np.asarray(rows, dtype=np.int64), np.arange(n_columns))),
+                         shape=(n_rows, n_columns))
+
+def _binarize(matrix):
+    """
+        Set all stored entries of a sparse matrix to 1 (connections counted twice are weighted once).
+    """
+    matrix = matrix.tocsr()
+    matrix.eliminate_zeros()
+    matrix.data[:] = 1
+
+    return matrix
@@ -1,8 +1,23 @@
 import pandapipes as pp
 import json
+from pandapipes.component_models import HeatExchanger
 from ..component_models.valve_control import CtrlValve
+from ..component_models.joint_valve_control import JointValveCtrl
 import pandapower.control as control
-import pandapipes.plotting as plot
+
+# Bulk creation of heat exchangers (private creation helpers, per-record pp.create_heat_exchanger if not available)
+try:
+    try:
+        from pandapipes.component_models.component_toolbox import add_new_component
+    except ImportError:
+        from pandapipes.component_models.auxiliaries.component_toolbox import add_new_component
+    from pandapipes.create import _check_branches
+    from pandapower.create import _get_multiple_index_with_check, _set_multiple_entries
+except ImportError:
+    add_new_component = None
+
+# Significant digits of the floats in the readable export (maximum of the pandas json writer)
+JSON_DOUBLE_PRECISION = 15
 
 def export_network_components(net, path='', format=''):
     """
@@ -15,12 +30,13 @@ def export_network_components(net, path='', format=''):
     # Readable component-wise json export
     elif format == 'json_readable':
         # Create components list from network
-        components_dict = {'junctions': net.junction,
+        components_dict = {'junctions': _get_junctions_with_geodata(net),
                            'pipes': net.pipe,
                            'heat_exchangers': net.heat_exchanger,
                            'sinks': net.sink,
                            'sources': net.source,
                            'valves': net.valve,
+                           'ext_grids': net.ext_grid,
                            'controllers': net.controller
         }
 
@@ -30,15 +46,14 @@ def export_network_components(net, path='', format=''):
             # Setup customized json export for controller components
             if component == 'controllers':
                 json_object = [c.to_json() for c in components_dict.get(component)['object']]
+                with open(path + component + '.json', "w") as fout:
+                    json.dump(json_object, fout, indent=4, sort_keys=True)
 
-            # Default df export for other components
+            # Default df export for other components (written directly by the pandas json writer)
             else:
-                json_string = components_dict.get(component).to_json(orient='records')
-                json_object = json.loads(json_string)
-
-            # Write json to file
-            with open(path + component + '.json', "w") as fout:
-                json.dump(json_object, fout, indent=4, sort_keys=True)
+                df = components_dict.get(component)
+                df[sorted(df.columns)].to_json(path + component + '.json', orient='records', indent=4,
+                                               double_precision=JSON_DOUBLE_PRECISION)
 
 
 def import_network_components(net, format='json_default', path=''):
@@ -71,20 +86,39 @@ def _import_heat_exchangers_to(net, path):
         Import all heat exchanger components from import file (json_readable).
     """
     # Load JSON from file
-    f = open(path+'heat_exchangers.json')
-    heat_exchangers = json.load(f)
-
-    # add heat exchangers to pandapipes network
-    for hex in heat_exchangers:
-        pp.create_heat_exchanger(net,
-                                 diameter_m=hex.get('diameter_m'),
-                                 from_junction=hex.get('from_junction'),
-                                 in_service=hex.get('in_service'),
-                                 loss_coefficient=hex.get('loss_coefficient'),
-                                 name=hex.get('name'),
-                                 qext_w=hex.get('qext_w'),
-                                 to_junction=hex.get('to_junction'),
-                                 type='heat_exchanger')
+    heat_exchangers = _load_records(path, 'heat_exchangers')
+    if not heat_exchangers:
+        return heat_exchangers
+    columns = _get_columns(heat_exchangers, ['diameter_m', 'from_junction', 'in_service', 'loss_coefficient', 'name',
+                                             'qext_w', 'to_junction'])
+
+    # add heat exchangers to pandapipes network (public per-record creation without the bulk creation helpers)
+    if add_new_component is None:
+        for record in heat_exchangers:
+            pp.create_heat_exchanger(net,
+                                     diameter_m=record.get('diameter_m'),
+                                     from_junction=record.get('from_junction'),
+                                     in_service=bool(record.get('in_service')),
+                                     loss_coefficient=record.get('loss_coefficient'),
+                                     name=record.get('name'),
+                                     qext_w=record.get('qext_w'),
+                                     to_junction=record.get('to_junction'),
+                                     type='heat_exchanger')
+        return heat_exchangers
+
+    # bulk creation like pp.create_valves (no pp.create_heat_exchangers)
+    add_new_component(net, HeatExchanger)
+    index = _get_multiple_index_with_check(net, 'heat_exchanger', None, len(heat_exchangers))
+    _check_branches(net, columns['from_junction'], columns['to_junction'], 'heat_exchanger')
+    _set_multiple_entries(net, 'heat_exchanger', index,
+                          name=columns['name'],
+                          from_junction=columns['from_junction'],
+                          to_junction=columns['to_junction'],
+                          diameter_m=columns['diameter_m'],
+                          qext_w=columns['qext_w'],
+                          loss_coefficient=columns['loss_coefficient'],
+                          in_service=[bool(s) for s in columns['in_service']],
+                          type='heat_exchanger')
 
     return heat_exchangers
 
@@ -93,18 +127,27 @@ def _import_junctions_to(net, path):
         Import all junction components from import file (json_readable).
     """
     # Load JSON from file
-    f = open(path+'junctions.json')
-    junctions = json.load(f)
+    junctions = _load_records(path, 'junctions')
+    if not junctions:
+        return junctions
+    columns = _get_columns(junctions, ['height_m', 'pn_bar', 'tfluid_k', 'name', 'in_service', 'geodata'])
 
     # add junctions to pandapipes network
-    for j in junctions:
-        pp.create_junction(net, height_m=j.get('height_m'),
-                           pn_bar=j.get('pn_bar'),
-                           tfluid_k=j.get('tfluid_k'),
-                           name=j.get('name'),
-                           in_service=j.get('in_service'),
-                           type='junction',
-                           geodata=j.get('geodata'))
+    geodata = columns['geodata']
+    index = pp.create_junctions(net, len(junctions),
+                                height_m=columns['height_m'],
+                                pn_bar=columns['pn_bar'],
+                                tfluid_k=columns['tfluid_k'],
+                                name=columns['name'],
+                                in_service=columns['in_service'],
+                                type='junction',
+                                geodata=geodata if None not in geodata else None)
+
+    # Add the geodata of partially located junctions
+    if None in geodata and any(g is not None for g in geodata):
+        for i, g in zip(index, geodata):
+            if g is not None:
+                net.junction_geodata.loc[i, ['x', 'y']] = g
 
     return junctions
 
@@ -113,26 +156,29 @@ def _import_pipes_to(net, path):
         Import all pipe components from import file (json_readable).
     """
     # Load JSON from file
-    f = open(path+'pipes.json')
-    pipes = json.load(f)
+    pipes = _load_records(path, 'pipes')
+    if not pipes:
+        return pipes
+    columns = _get_columns(pipes, ['from_junction', 'to_junction', 'length_km', 'diameter_m', 'k_mm',
+                                   'loss_coefficient', 'sections', 'alpha_w_per_m2k', 'text_k', 'qext_w', 'name',
+                                   'in_service', 'type'])
 
     # add pipes to pandapipes network
-    for p in pipes:
-        pp.create_pipe_from_parameters(net,
-                                       from_junction=p.get('from_junction'),
-                                       to_junction=p.get('to_junction'),
-                                       length_km=p.get('length_km'),
-                                       diameter_m=p.get('diameter_m'),
-                                       k_mm=p.get('k_mm'),
-                                       loss_coefficient=p.get('loss_coefficient'),
-                                       sections=p.get('sections'),
-                                       alpha_w_per_m2k=p.get('alpha_w_per_m2k'),
-                                       text_k=p.get('text_k'),
-                                       qext_w=p.get('qext_w'),
-                                       name=p.get('name'),
-                                       geodata=None,
-                                       in_service=p.get('in_service'),
-                                       type=p.get('type'))
+    pp.create_pipes_from_parameters(net,
+                                    from_junctions=columns['from_junction'],
+                                    to_junctions=columns['to_junction'],
+                                    length_km=columns['length_km'],
+                                    diameter_m=columns['diameter_m'],
+                                    k_mm=columns['k_mm'],
+                                    loss_coefficient=columns['loss_coefficient'],
+                                    sections=columns['sections'],
+                                    alpha_w_per_m2k=columns['alpha_w_per_m2k'],
+                                    text_k=columns['text_k'],
+                                    qext_w=columns['qext_w'],
+                                    name=columns['name'],
+                                    geodata=None,
+                                    in_service=columns['in_service'],
+                                    type=columns['type'])
 
     return pipes
 
@@ -142,18 +188,19 @@ def _import_sinks_to(net, path):
         Import all sink components from import file (json_readable).
     """
     # Load JSON from file
-    f = open(path+'sinks.json')
-    sinks = json.load(f)
+    sinks = _load_records(path, 'sinks')
+    if not sinks:
+        return sinks
+    columns = _get_columns(sinks, ['junction', 'mdot_kg_per_s', 'scaling', 'name', 'in_service'])
 
     # add sinks to pandapipes network
-    for s in sinks:
-        pp.create_sink(net,
-                       junction=s.get('junction'),
-                       mdot_kg_per_s=s.get('mdot_kg_per_s'),
-                       scaling=s.get('scaling'),
-                       name=s.get('name'),
-                       in_service=s.get('in_service'),
-                       type='sink')
+    pp.create_sinks(net,
+                    junctions=columns['junction'],
+                    mdot_kg_per_s=columns['mdot_kg_per_s'],
+                    scaling=columns['scaling'],
+                    name=columns['name'],
+                    in_service=columns['in_service'],
+                    type='sink')
 
     return sinks
 
@@ -162,18 +209,19 @@ def _import_sources_to(net, path):
         Import all source components from import file (json_readable).
     """
     # Load JSON from file
-    f = open(path+'sources.json')
-    sources = json.load(f)
+    sources = _load_records(path, 'sources')
+    if not sources:
+        return sources
+    columns = _get_columns(sources, ['junction', 'mdot_kg_per_s', 'scaling', 'name', 'in_service'])
 
     # add sources to pandapipes network
-    for s in sources:
-        pp.create_source(net,
-                       junction=s.get('junction'),
-                       mdot_kg_per_s=s.get('mdot_kg_per_s'),
-                       scaling=s.get('scaling'),
-                       name=s.get('name'),
-                       in_service=s.get('in_service'),
-                       type='source')
+    pp.create_sources(net,
+                      junctions=columns['junction'],
+                      mdot_kg_per_s=columns['mdot_kg_per_s'],
+                      scaling=columns['scaling'],
+                      name=columns['name'],
+                      in_service=columns['in_service'],
+                      type='source')
 
     return sources
 
@@ -182,19 +230,21 @@ def _import_valves_to(net, path):
         Import all valve components from import file (json_readable).
     """
     # Load JSON from file
-    f = open(path+'valves.json')
-    valves = json.load(f)
+    valves = _load_records(path, 'valves')
+    if not valves:
+        return valves
+    columns = _get_columns(valves, ['from_junction', 'to_junction', 'diameter_m', 'opened', 'loss_coefficient',
+                                    'name'])
 
     # add valves to pandapipes network
-    for v in valves:
-        pp.create_valve(net,
-                        from_junction=v.get('from_junction'),
-                        to_junction=v.get('to_junction'),
-                        diameter_m=v.get('diameter_m'),
-                        opened=v.get('opened'),
-                        loss_coefficient=v.get('loss_coefficient'),
-                        name=v.get('name'),
-                        type='valve')
+    pp.create_valves(net,
+                     from_junctions=columns['from_junction'],
+                     to_junctions=columns['to_junction'],
+                     diameter_m=columns['diameter_m'],
+                     opened=columns['opened'],
+                     loss_coefficient=columns['loss_coefficient'],
+                     name=columns['name'],
+                     type='valve')
 
     return valves
 
@@ -203,8 +253,7 @@ def _import_controllers_to(net, path):
         Import all controller components from import file (json_readable).
     """
     # Load JSON from file
-    f = open(path + 'controllers.json')
-    controllers = json.load(f)
+    controllers = _load_records(path, 'controllers')
 
     # add valves to pandapipes network
     for c in controllers:
@@ -224,6 +273,19 @@ def _import_controllers_to(net, path):
                       name=c.get('name')
                       )
 
+        elif c.get('type') == 'JointValveCtrl':
+            # create coordinated flow control of the imported valve controllers
+            names = c.get('object').get('controllers')
+            replaced = {getattr(ctrl, 'name', None): ctrl for ctrl in net.controller['object']}
+            JointValveCtrl(net=net,
+                           controllers=[replaced[name] for name in names],
+                           in_service=c.get('in_service'),
+                           initial_run=c.get('initial_run'),
+                           level=c.get('level'),
+                           order=c.get('order'),
+                           name=c.get('name')
+                           )
+
         elif c.get('type') == 'ConstControl':
             control.ConstControl(net=net,
                                  in_service=c.get('in_service'),
@@ -244,10 +306,9 @@ def _import_external_grids_to(net, path):
         Import all external grid components from import file (json_readable).
     """
     # Load JSON from file
-    f = open(path+'ext_grids.json')
-    ext_grids = json.load(f)
+    ext_grids = _load_records(path, 'ext_grids')
 
-    # add valves to pandapipes network
+    # add external grids to pandapipes network (few elements, no bulk creation in pandapipes)
     for g in ext_grids:
         pp.create_ext_grid(net,
                            junction=g.get('junction'),
@@ -266,3 +327,26 @@ def _import_pumps_to(net, path):
     # TODO: Implement import function of pumps
     pumps = []
     return pumps
+
+def _load_records(path, component):
+    # Load the records of a component file (closed after parsing)
+    with open(path + component + '.json') as fin:
+        return json.load(fin)
+
+def _get_columns(records, keys):
+    # Get the columns of the records for the bulk creation (single pass, missing keys as None)
+    columns = {key: [] for key in keys}
+    for record in records:
+        for key in keys:
+            columns[key].append(record.get(key))
+    return columns
+
+def _get_junctions_with_geodata(net):
+    # Get the junction table with the geodata [x, y] per junction (None if not located)
+    if len(net.junction_geodata) == 0:
+        return net.junction
+    junctions = net.junction.copy()
+    geodata = net.junction_geodata.reindex(junctions.index)[['x', 'y']]
+    located = geodata.notna().all(axis=1).values
+    junctions['geodata'] = [xy if is_located else None for xy, is_located in zip(geodata.values.tolist(), located)]
+    return junctions
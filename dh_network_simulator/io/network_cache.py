@@ -0,0 +1,221 @@
+import hashlib
+import logging
+import os
+import pickle
+import platform
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import pandapipes as pp
+import pandapower
+from .import_export import import_network_components
+from ..network_index import NetworkIndex, get_topology_signature
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+
+try:
+    from pandapipes.component_models.component_toolbox import add_new_component
+except ImportError:
+    try:
+        from pandapipes.component_models.auxiliaries.component_toolbox import add_new_component
+    except ImportError:
+        add_new_component = None
+
+logger = logging.getLogger(__name__)
+
+# Component files of the readable network format (json_readable), hashed as cache key
+COMPONENT_FILES = ('junctions', 'pipes', 'heat_exchangers', 'sinks', 'sources', 'valves', 'ext_grids', 'controllers')
+
+# Version of the cache layout (part of the cache key, cached networks of other versions are rebuilt)
+CACHE_FORMAT_VERSION = 1
+CACHE_DIR_ENV = 'DHNSIM_CACHE_DIR'
+
+
+def import_network_components_cached(net, path='', cache_dir=None):
+    """
+        Import the network components of the readable network files (json_readable) into an empty network by a
+        content-hashed binary cache. The cache of a network is written after the first import and keyed by the hash of
+        the component files, so changed files are imported again. Cached networks contain:
+            tables: Component tables (incl. geodata) as Arrow IPC files
+            objects: Component list, controller objects and the topology index (NetworkIndex) as pickle
+
+        Damaged cache entries are removed and the network files are imported again, failed cache writes are logged
+        (the import itself is kept). The pickled objects are executed on load, the cache directory (see
+        get_cache_dir()) must only be writable by trusted users. Returns the net and the topology index (the index is
+        None if the cache cannot be used).
+    """
+    if pa is None or add_new_component is None or not _is_empty_network(net):
+        return import_network_components(net, format='json_readable', path=path), None
+
+    cache_path = os.path.join(get_cache_dir(cache_dir), get_cache_key(path))
+    if os.path.isdir(cache_path):
+        state = _get_network_state(net)
+        try:
+            return net, read_network_cache(net, cache_path)
+        except Exception as error:
+            logger.warning(f'NetworkCacheDamaged: The cache entry {cache_path} cannot be read ({error!r}), the '
+                           f'network files are imported again.')
+            _set_network_state(net, state)
+            shutil.rmtree(cache_path, ignore_errors=True)
+
+    import_network_components(net, format='json_readable', path=path)
+    network_index = NetworkIndex(net)
+    try:
+        write_network_cache(net, cache_path, network_index)
+    except Exception as error:
+        logger.warning(f'NetworkCacheNotWritten: The cache entry {cache_path} cannot be written ({error!r}).')
+
+    return net, network_index
+
+def get_cache_key(path=''):
+    """
+        Get the cache key of the readable network files (sha256 of the file contents, the cache format and the versions
+        of the package and its pickled dependencies, so cached networks are rebuilt after upgrades).
+    """
+    digest = hashlib.sha256(f'{CACHE_FORMAT_VERSION}:{get_versions()}'.encode())
+    for component in COMPONENT_FILES:
+        with open(path + component + '.json', 'rb') as fin:
+            content = fin.read()
+        digest.update(f'{component}:{len(content)}:'.encode())
+        digest.update(content)
+
+    return digest.hexdigest()
+
+def get_versions():
+    """
+        Get the versions of python, the package and the dependencies of the cached objects and tables.
+    """
+    return {'python': platform.python_version(),
+            'dh_network_simulator': _get_package_version(),
+            'pandapipes': pp.__version__,
+            'pandapower': pandapower.__version__,
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'pyarrow': pa.__version__ if pa is not None else None}
+
+def get_cache_dir(cache_dir=None):
+    """
+        Get the directory of the network cache: cache_dir, the environment variable DHNSIM_CACHE_DIR or the user cache
+        directory (XDG_CACHE_HOME or ~/.cache).
+    """
+    if cache_dir is not None:
+        return str(cache_dir)
+    if os.environ.get(CACHE_DIR_ENV):
+        return os.environ[CACHE_DIR_ENV]
+    user_cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+
+    return os.path.join(user_cache, 'dh_network_simulator', 'networks')
+
+def write_network_cache(net, cache_path, network_index=None):
+    """
+        Write the component tables and controllers of the network to the cache directory cache_path. The directory is
+        written to a temporary directory first and renamed, so concurrent workers never read partially written caches.
+    """
+    parent = os.path.dirname(os.path.abspath(cache_path))
+    os.makedirs(parent, exist_ok=True)
+    directory = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+    try:
+        # Component tables (controller objects are pickled)
+        tables = _get_table_names(net)
+        for table in tables:
+            df = net[table].drop(columns='object') if table == 'controller' else net[table]
+            _write_table(df, os.path.join(directory, table + '.arrow'))
+
+        objects = {'components': list(net.component_list),
+                   'tables': {table: net[table].dtypes.to_dict() for table in tables},
+                   'controllers': list(net.controller['object']),
+                   'network_index': network_index}
+        with open(os.path.join(directory, 'objects.pickle'), 'wb') as fout:
+            pickle.dump(objects, fout, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.rename(directory, cache_path)
+    except OSError:
+        # Cache written by another worker in the meantime
+        if not os.path.isdir(cache_path):
+            raise
+    finally:
+        # Temporary directory of failed or concurrent writes
+        shutil.rmtree(directory, ignore_errors=True)
+
+def read_network_cache(net, cache_path):
+    """
+        Read the component tables and controllers of the cache directory cache_path into an empty network. Returns the
+        cached topology index (None if no index was cached).
+    """
+    with open(os.path.join(cache_path, 'objects.pickle'), 'rb') as fin:
+        objects = pickle.load(fin)
+
+    # Register the components (component list and empty tables) in their original order
+    for component in objects['components']:
+        add_new_component(net, component)
+
+    # Component tables (with the original dtypes, e.g. object columns of integers)
+    for table, dtypes in objects['tables'].items():
+        df = _read_table(os.path.join(cache_path, table + '.arrow'))
+        df = df.astype({column: dtype for column, dtype in dtypes.items() if column in df})
+        if table == 'controller':
+            df.insert(0, 'object', objects['controllers'])
+            df = df[net.controller.columns]
+        net[table] = df
+
+    # Restart the PID clocks of the controllers (monotonic time of the writing process)
+    for controller in objects['controllers']:
+        pid = getattr(controller, 'pid', None)
+        if pid is not None:
+            pid.reset()
+
+    # Topology index (the signature contains string hashes of the writing process)
+    network_index = objects['network_index']
+    if network_index is not None:
+        network_index.signature = get_topology_signature(net)
+
+    return network_index
+
+def _get_package_version():
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:
+        # Python < 3.8
+        return None
+    try:
+        return version('dh_network_simulator')
+    except PackageNotFoundError:
+        return None
+
+def _get_table_names(net):
+    # Component tables, their geodata and the controller table
+    tables = []
+    for component in net.component_list:
+        name = component.table_name()
+        tables += [table for table in (name, name + '_geodata') if table in net]
+
+    return tables + ['controller']
+
+def _get_network_state(net):
+    # Items and component list of the network (restored after a failed cache read)
+    return dict(net), list(net.component_list)
+
+def _set_network_state(net, state):
+    items, components = state
+    for key in [key for key in net if key not in items]:
+        del net[key]
+    net.update(items)
+    net.component_list[:] = components
+
+def _is_empty_network(net):
+    return all([len(net[table]) == 0 for table in _get_table_names(net)])
+
+def _write_table(df, path):
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    with pa.OSFile(path, 'wb') as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+def _read_table(path):
+    with pa.OSFile(path, 'rb') as source:
+        return ipc.open_file(source).read_all().to_pandas()
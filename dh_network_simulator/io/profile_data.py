@@ -0,0 +1,213 @@
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Version of the converted profile format (converted profiles of other versions are converted again)
+PROFILE_FORMAT_VERSION = 1
+DEFAULT_CHUNKSIZE = 100000  # number of csv rows parsed at once during the conversion
+
+
+class MemmapProfileData():
+    """
+        Memory mapped profile data source of the controllers (replaces the pandapower DFData of load_data()).
+
+        The profiles are stored as columnar on-disk array (profiles x time steps, see convert_profiles()) and memory
+        mapped read-only, so controllers and worker processes share the pages of the operating system instead of
+        loading their own copy. The profile names are resolved to column indices when the data is opened. Time steps
+        are resolved to rows in O(1) (arithmetic for equidistant time steps, otherwise by lookup table). With
+        interpolate=True, values between the stored time steps are linearly interpolated.
+
+        Implements the data source interface of the controllers (get_time_step_value(), get_time_steps_len()).
+        Pickled data sources only contain the path and are mapped again when they are unpickled (worker processes).
+    """
+
+    def __init__(self, path, interpolate=False):
+        self.path = str(path)
+        self.interpolate = interpolate
+        self._open()
+
+    def __repr__(self):
+        return f'MemmapProfileData(path={self.path}, profiles={len(self.columns)}, time_steps={len(self.times)}, ' \
+               f'interpolate={self.interpolate})'
+
+    def __getstate__(self):
+        return {'path': self.path, 'interpolate': self.interpolate}
+
+    def __setstate__(self, state):
+        self.path = state['path']
+        self.interpolate = state['interpolate']
+        self._open()
+
+    def _open(self):
+        with open(os.path.join(self.path, 'meta.json')) as fin:
+            meta = json.load(fin)
+        # Plain array view of the memory map (indexing without the overhead of the np.memmap subclass)
+        self.values = np.load(os.path.join(self.path, 'values.npy'), mmap_mode='r').view(np.ndarray)
+        self.times = np.load(os.path.join(self.path, 'times.npy'))
+        self.columns = meta['columns']
+        self.column_index = {name: i for i, name in enumerate(self.columns)}
+
+        # Equidistant time steps (start, step size) or lookup table of the time steps
+        self.t_start, self.dt = meta['t_start'], meta['dt']
+        self.row_index = None if self.dt is not None else {t: i for i, t in enumerate(self.times.tolist())}
+
+    @classmethod
+    def from_csv(cls, csv_path, path=None, index_col=0, interpolate=False, **kwargs):
+        """
+            Open the profiles of a .csv file (index column: time steps), converted once by convert_profiles().
+        """
+        return cls(convert_profiles(csv_path, path=path, index_col=index_col, **kwargs), interpolate=interpolate)
+
+    def get_time_step_value(self, time_step, profile_name, scale_factor=1.0):
+        """
+            Get the value of a profile (or the values of a list of profiles) at a time step.
+        """
+        column = self.get_column(profile_name)
+        if not self.interpolate:
+            return self.values[column, self.get_row(time_step)] * scale_factor
+
+        lo, hi, w = self._get_interpolation(time_step)
+        values = self.values[column, lo]
+        if w > 0:
+            values = values + w * (self.values[column, hi] - values)
+
+        return values * scale_factor
+
+    def get_time_steps_len(self):
+        return len(self.times)
+
+    def get_column(self, profile_name):
+        """
+            Get the column index of a profile name (or the column indices of a list of profile names).
+        """
+        try:
+            if isinstance(profile_name, (list, tuple, np.ndarray, pd.Index)):
+                return np.array([self.column_index[name] for name in profile_name], dtype=np.int64)
+            return self.column_index[profile_name]
+        except KeyError as error:
+            raise KeyError(f'Profile {error} cannot be found.')
+
+    def get_row(self, time_step):
+        """
+            Get the row of a stored time step.
+        """
+        if self.dt is None:
+            try:
+                return self.row_index[float(time_step)]
+            except KeyError:
+                raise KeyError(f'Time step {time_step} cannot be found in the profiles.')
+
+        position = (time_step - self.t_start) / self.dt
+        row = int(round(position))
+        if abs(position - row) > 1e-9 or not 0 <= row < len(self.times):
+            raise KeyError(f'Time step {time_step} cannot be found in the profiles.')
+
+        return row
+
+    def to_frame(self):
+        """
+            Get the profiles as DataFrame (time steps x profiles) backed by the memory map (no copy of the values).
+        """
+        return pd.DataFrame(self.values.T, index=pd.Index(self.times), columns=self.columns, copy=False)
+
+    def _get_interpolation(self, time_step):
+        # Rows and weight of the linear interpolation between the stored time steps
+        if not self.times[0] <= time_step <= self.times[-1]:
+            raise KeyError(f'Time step {time_step} is outside of the profiles ({self.times[0]} to {self.times[-1]}).')
+
+        if self.dt is not None:
+            position = (time_step - self.t_start) / self.dt
+            lo = min(int(position), len(self.times) - 1)
+            w = position - lo
+        else:
+            lo = int(np.searchsorted(self.times, time_step, side='right')) - 1
+            lo = min(lo, len(self.times) - 1)
+            w = (time_step - self.times[lo]) / (self.times[lo + 1] - self.times[lo]) if lo + 1 < len(self.times) else 0.
+
+        return lo, min(lo + 1, len(self.times) - 1), w
+
+
+def convert_profiles(csv_path, path=None, index_col=0, chunksize=DEFAULT_CHUNKSIZE, **kwargs):
+    """
+        Convert the profiles of a .csv file (index column: time steps, one column per profile) into the columnar
+        on-disk format of MemmapProfileData (default path: <csv path without extension>.profiles). The csv file is
+        parsed in chunks, the conversion is skipped if the converted profiles of the unchanged csv file exist.
+        Returns the path of the converted profiles.
+    """
+    csv_path = str(csv_path)
+    path = str(path) if path is not None else os.path.splitext(csv_path)[0] + '.profiles'
+    source = _get_source_signature(csv_path)
+    if _is_converted(path, source):
+        return path
+
+    parent = os.path.dirname(os.path.abspath(path))
+    directory = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+    try:
+        # Parse the csv file in chunks into a temporary row-major file (number of time steps is unknown)
+        columns = None
+        times = []
+        rows_path = os.path.join(directory, 'rows.bin')
+        with open(rows_path, 'wb') as fout:
+            for chunk in pd.read_csv(csv_path, index_col=index_col, chunksize=chunksize, **kwargs):
+                if columns is None:
+                    columns = [str(column) for column in chunk.columns]
+                times.append(chunk.index.values.astype(np.float64))
+                np.ascontiguousarray(chunk.values, dtype=np.float64).tofile(fout)
+        if not times or not sum([len(t) for t in times]):
+            raise ValueError(f'The profiles {csv_path} do not contain any time step.')
+        times = np.concatenate(times)
+        if np.any(np.diff(times) <= 0):
+            raise ValueError(f'The time steps of {csv_path} are not strictly increasing.')
+
+        # Transpose into the columnar layout (profiles x time steps) in blocks of rows
+        rows = np.memmap(rows_path, dtype=np.float64, mode='r', shape=(len(times), len(columns)))
+        values = np.lib.format.open_memmap(os.path.join(directory, 'values.npy'), mode='w+', dtype=np.float64,
+                                           shape=(len(columns), len(times)))
+        for start in range(0, len(times), chunksize):
+            values[:, start:start + chunksize] = rows[start:start + chunksize].T
+        values.flush()
+        del rows, values
+        os.remove(rows_path)
+
+        np.save(os.path.join(directory, 'times.npy'), times)
+        t_start, dt = _get_equidistant_steps(times)
+        with open(os.path.join(directory, 'meta.json'), 'w') as fout:
+            json.dump({'version': PROFILE_FORMAT_VERSION, 'source': source, 'columns': columns,
+                       't_start': t_start, 'dt': dt}, fout)
+
+        # Replace an outdated conversion
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.rename(directory, path)
+    except BaseException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+
+    return path
+
+def _get_source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {'path': os.path.abspath(csv_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def _is_converted(path, source):
+    try:
+        with open(os.path.join(path, 'meta.json')) as fin:
+            meta = json.load(fin)
+    except (OSError, ValueError):
+        return False
+
+    return meta.get('version') == PROFILE_FORMAT_VERSION and meta.get('source') == source
+
+def _get_equidistant_steps(times):
+    # Start and step size of equidistant time steps (step size None if the time steps are not equidistant)
+    if len(times) < 2:
+        return float(times[0]), 1.
+
+    t_start, dt = float(times[0]), float(times[1] - times[0])
+    if np.allclose(times, t_start + dt * np.arange(len(times)), rtol=0, atol=1e-9 * max(abs(dt), 1.)):
+        return t_start, dt
+
+    return t_start, None
@@ -0,0 +1,185 @@
+import queue
+import threading
+import numpy as np
+from ..results_recorder import ResultsRecorder, DEFAULT_CHUNK_SIZE
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Output file formats of the streaming writer
+STREAMING_FORMATS = ('parquet', 'arrow')
+DEFAULT_MAX_QUEUE = 4  # number of chunks waiting for the writer thread before the simulation is blocked
+
+
+class StreamingResultsWriter(ResultsRecorder):
+    """
+        Streaming output stage of result columns to Parquet or Arrow IPC files (requires pyarrow).
+
+        The writer records like a ResultsRecorder into a buffer of chunk_size time steps. Full buffers are handed over
+        as columnar record batches (one Parquet row group or IPC record batch per chunk) to a background writer thread,
+        so the simulation is not blocked on disk. The bounded queue of max_queue chunks applies back-pressure if the
+        disk is slower than the simulation, so the memory use is independent of the number of simulated time steps.
+
+        close() writes the remaining time steps and finishes the file. to_frame() and query() only contain the time
+        steps which are not written yet, finished files are read by read_results().
+    """
+
+    def __init__(self, path, channels, format='parquet', chunk_size=DEFAULT_CHUNK_SIZE, max_queue=DEFAULT_MAX_QUEUE):
+        if pa is None:
+            raise ImportError('The streaming results writer requires pyarrow (pip install pyarrow).')
+        if format not in STREAMING_FORMATS:
+            raise ValueError(f"Streaming format '{format}' does not exist. Available formats: {STREAMING_FORMATS}.")
+        super().__init__(channels, horizon=chunk_size, chunk_size=chunk_size)
+
+        self.path = path
+        self.format = format
+        self.queue = queue.Queue(maxsize=max(int(max_queue), 1))
+        self.thread = None
+        self.error = None
+        self.closed = False
+        self.chunks_written = 0
+        self.rows_written = 0
+
+    def __repr__(self):
+        return f'StreamingResultsWriter(path={self.path}, format={self.format}, channels={len(self.labels)}, ' \
+               f'rows_written={self.rows_written}, closed={self.closed})'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+            return
+        # Keep the exception of the with block (errors of the writer are dropped)
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def record(self, net, t, index):
+        """
+            Record the result columns of all channels for time step t (flushes the buffer if it is full).
+        """
+        if self.closed:
+            raise ValueError(f'Streaming results writer of {self.path} is closed.')
+        self._raise_error()
+        super().record(net, t, index)
+
+    def flush(self):
+        """
+            Hand over the buffered time steps to the writer thread (blocks while the queue is full).
+        """
+        if self.size == 0:
+            return
+        self._raise_error()
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._write, name='StreamingResultsWriter', daemon=True)
+            self.thread.start()
+
+        self.queue.put((self.times[:self.size], self.values[:self.size]))
+
+        # New buffer, the handed over buffer is owned by the writer thread
+        self.times = np.full(self.chunk_size, np.nan)
+        self.values = np.full((self.chunk_size, len(self.labels)), np.nan)
+        self.size = 0
+
+    def close(self):
+        """
+            Write the remaining time steps, finish the file and wait for the writer thread (also if the remaining time
+            steps raise a pending error of the writer thread).
+        """
+        if self.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.closed = True
+            if self.thread is not None:
+                self.queue.put(None)
+                self.thread.join()
+        self._raise_error()
+
+    def _grow(self):
+        # Flush the full buffer instead of extending it
+        self.flush()
+
+    def _raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def _write(self):
+        # Writer thread: convert and write the chunks until the end of the stream
+        writer = sink = None
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                break
+            if self.error is not None:
+                # Drain the queue after an error to release the simulation
+                continue
+            try:
+                batch = _get_record_batch(*chunk, self.labels)
+                if writer is None:
+                    writer, sink = _open_writer(self.path, self.format, batch.schema)
+                if self.format == 'parquet':
+                    writer.write_table(pa.Table.from_batches([batch]))
+                else:
+                    writer.write_batch(batch)
+                self.chunks_written += 1
+                self.rows_written += batch.num_rows
+            except Exception as error:
+                self.error = error
+
+        if writer is not None:
+            try:
+                writer.close()
+                if sink is not None:
+                    sink.close()
+            except Exception as error:
+                self.error = error
+
+
+def read_results(path, columns=None, format=None, memory_map=True):
+    """
+        Read a finished Parquet or Arrow IPC file of the streaming writer as pyarrow Table (memory mapped by default).
+        The format is derived from the file extension if not given ('.parquet': Parquet, otherwise Arrow IPC).
+    """
+    if pa is None:
+        raise ImportError('Reading streamed results requires pyarrow (pip install pyarrow).')
+
+    if format is None:
+        format = 'parquet' if str(path).endswith('.parquet') else 'arrow'
+    if format == 'parquet':
+        return pq.read_table(path, columns=columns, memory_map=memory_map)
+
+    source = pa.memory_map(str(path), 'r') if memory_map else pa.OSFile(str(path), 'rb')
+    table = ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(columns)
+
+    return table
+
+def _get_record_batch(times, values, labels):
+    """
+        Convert a chunk of time steps (time steps x channels) into a columnar record batch.
+    """
+    columns = np.ascontiguousarray(values.T)
+    arrays = [pa.array(times)] + [pa.array(column) for column in columns]
+
+    return pa.RecordBatch.from_arrays(arrays, names=['time'] + list(labels))
+
+def _open_writer(path, format, schema):
+    """
+        Open the Parquet or Arrow IPC file writer (and the file sink of the Arrow IPC writer).
+    """
+    if format == 'parquet':
+        return pq.ParquetWriter(str(path), schema), None
+
+    sink = pa.OSFile(str(path), 'wb')
+    return ipc.new_file(sink, schema), sink
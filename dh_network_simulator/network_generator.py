@@ -0,0 +1,129 @@
+import numpy as np
+import pandapipes as pp
+from .component_models.valve_control import CtrlValve
+
+# Design values of the synthetic networks
+SUPPLY_PRESSURE_BAR = 6.0
+RETURN_PRESSURE_BAR = 3.0
+SUPPLY_TEMPERATURE_K = 348.15
+RETURN_TEMPERATURE_K = 318.15
+DESIGN_VELOCITY_M_PER_S = 1.0
+MIN_DIAMETER_M = 0.05
+WATER_DENSITY_KG_PER_M3 = 975.
+WATER_HEAT_CAPACITY_J_PER_KGK = 4190.
+
+
+def create_synthetic_network(net, n_consumers, topology='radial', branching=2, pipe_length_km=0.1,
+                             service_length_km=0.01, qext_w=50e3, sections=1, seed=None):
+    """
+        Create a synthetic supply/return network with n_consumers consumer substations in an empty pandapipes network.
+        The components correspond to the test network: junctions, pipes, valves with CtrlValves, heat exchangers,
+        ext_grids, sinks and sources.
+
+        The trunk is a tree (branching factor) with one node (supply and return junction) per consumer. A substation
+        connects the supply and return junction of its node by a service pipe, a controlled valve, a heat exchanger and
+        a return service pipe (4 pipes per consumer). The plant supplies the root node by a pt ext_grid, the return
+        pressure is held by a p ext_grid. A sink and source at the plant return model make-up water (no mass flow).
+        Topologies:
+            radial: Trunk tree only
+            meshed: Trunk tree with additional ring pipes between neighbouring nodes of different parents
+
+        The pipe diameters are sized for the design velocity of the downstream consumers' mass flows. The heat demands
+        are varied by +-20 % if a seed is given. Returns the net.
+    """
+    if topology not in ('radial', 'meshed'):
+        raise ValueError(f"Topology '{topology}' does not exist, use 'radial' or 'meshed'.")
+    if n_consumers < 1:
+        raise ValueError('The network requires at least one consumer.')
+
+    # Heat demands and mass flow setpoints of the consumers
+    rng = np.random.default_rng(seed)
+    demands = qext_w * (rng.uniform(0.8, 1.2, n_consumers) if seed is not None else np.ones(n_consumers))
+    mdot_set = demands / (WATER_HEAT_CAPACITY_J_PER_KGK * (SUPPLY_TEMPERATURE_K - RETURN_TEMPERATURE_K))
+
+    # Tree of the consumer nodes and the downstream mass flows of the trunk pipes
+    parents = np.arange(-1, n_consumers - 1) // branching
+    downstream = mdot_set.copy()
+    for node in range(n_consumers - 1, 0, -1):
+        downstream[parents[node]] += downstream[node]
+
+    # Depth of the nodes in the tree (geodata)
+    depth = np.ones(n_consumers, dtype=np.int64)
+    for node in range(1, n_consumers):
+        depth[node] = depth[parents[node]] + 1
+    nodes = np.arange(n_consumers)
+
+    # Plant
+    plant_s, plant_r = _create_junctions(net, ['plant_s', 'plant_r'], [(0, 0), (0, -1)])
+    pp.create_ext_grid(net, junction=plant_s, p_bar=SUPPLY_PRESSURE_BAR, t_k=SUPPLY_TEMPERATURE_K, type='pt',
+                       name='plant_supply')
+    pp.create_ext_grid(net, junction=plant_r, p_bar=RETURN_PRESSURE_BAR, t_k=RETURN_TEMPERATURE_K, type='p',
+                       name='plant_return')
+    pp.create_sink(net, junction=plant_r, mdot_kg_per_s=0., name='plant_sink')
+    pp.create_source(net, junction=plant_r, mdot_kg_per_s=0., name='plant_source')
+
+    # Trunk nodes (bulk creation of the junctions and pipes)
+    geodata = np.column_stack([depth, nodes])
+    supply = _create_junctions(net, [f'n{node}s' for node in nodes], geodata)
+    ret = _create_junctions(net, [f'n{node}r' for node in nodes], geodata - [0, 0.5])
+    parent_supply = np.where(parents >= 0, supply[parents], plant_s)
+    parent_return = np.where(parents >= 0, ret[parents], plant_r)
+    diameters = _get_diameters(downstream)
+    _create_pipes(net, parent_supply, supply, pipe_length_km, diameters, sections, [f'l{node}s' for node in nodes])
+    _create_pipes(net, ret, parent_return, pipe_length_km, diameters, sections, [f'l{node}r' for node in nodes])
+
+    # Ring pipes between neighbouring nodes of different parents
+    if topology == 'meshed':
+        ring = nodes[1:-1][parents[1:-1] != parents[2:]]
+        diameters = _get_diameters(np.minimum(downstream[ring], downstream[ring + 1]))
+        _create_pipes(net, supply[ring], supply[ring + 1], pipe_length_km, diameters, sections,
+                      [f'ring{node}s' for node in ring])
+        _create_pipes(net, ret[ring + 1], ret[ring], pipe_length_km, diameters, sections,
+                      [f'ring{node}r' for node in ring])
+
+    # Consumer substations
+    geodata = np.column_stack([depth + 0.5, nodes])
+    service_s = _create_junctions(net, [f'n{node}sv' for node in nodes], geodata)
+    hex_s = _create_junctions(net, [f'n{node}hs' for node in nodes], geodata)
+    hex_r = _create_junctions(net, [f'n{node}hr' for node in nodes], geodata - [0, 0.5])
+    diameters = _get_diameters(mdot_set)
+    _create_pipes(net, supply, service_s, service_length_km, diameters, 1, [f'service{node}s' for node in nodes])
+    _create_pipes(net, hex_r, ret, service_length_km, diameters, 1, [f'service{node}r' for node in nodes])
+    valves = pp.create_valves(net, from_junctions=service_s, to_junctions=hex_s, diameter_m=diameters, opened=True,
+                              loss_coefficient=1000., name=[f'sub{node}_v' for node in nodes])
+
+    for node in nodes:
+        pp.create_heat_exchanger(net, from_junction=hex_s[node], to_junction=hex_r[node], diameter_m=diameters[node],
+                                 qext_w=demands[node], loss_coefficient=0., name=f'hex{node}')
+        CtrlValve(net=net,
+                  valve_id=int(valves[node]),
+                  mdot_set_kg_per_s=mdot_set[node],
+                  gain=-1000 / max(mdot_set[node], 0.1),
+                  tol=0.05 * mdot_set[node],
+                  level=0,
+                  order=node,
+                  name=f'sub{node}_ctrl')
+
+    return net
+
+def get_consumers_for_pipes(n_pipes, topology='radial', branching=2):
+    """
+        Get the number of consumers of a synthetic network with about n_pipes pipes (4 pipes per consumer and 2 ring pipes
+        per parent node of the meshed topology).
+    """
+    pipes_per_consumer = 4 if topology == 'radial' else 4 + 2 / branching
+    return max(1, int(round(n_pipes / pipes_per_consumer)))
+
+def _create_junctions(net, names, geodata):
+    return pp.create_junctions(net, len(names), pn_bar=SUPPLY_PRESSURE_BAR, tfluid_k=SUPPLY_TEMPERATURE_K, height_m=0.,
+                               name=names, geodata=np.asarray(geodata, dtype=np.float64))
+
+def _create_pipes(net, from_junctions, to_junctions, length_km, diameters, sections, names):
+    return pp.create_pipes_from_parameters(net, from_junctions=from_junctions, to_junctions=to_junctions,
+                                           length_km=length_km, diameter_m=diameters, k_mm=0.01, loss_coefficient=0.,
+                                           sections=sections, alpha_w_per_m2k=1.5, text_k=281.15, name=names)
+
+def _get_diameters(mdot):
+    # Diameters of the design velocity (rounded up to 1 cm)
+    diameters = np.sqrt(4 * np.asarray(mdot) / (WATER_DENSITY_KG_PER_M3 * np.pi * DESIGN_VELOCITY_M_PER_S))
+    return np.maximum(MIN_DIAMETER_M, np.ceil(diameters * 100) / 100)
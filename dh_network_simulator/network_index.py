@@ -0,0 +1,169 @@
+import numpy as np
+
+# Component tables of the network which are resolved by name
+COMPONENT_TABLES = ('junction', 'pipe', 'valve', 'heat_exchanger', 'sink', 'source', 'ext_grid', 'controller')
+
+# Component tables connecting two junctions (branches) and one junction (node elements)
+BRANCH_TABLES = ('pipe', 'valve', 'heat_exchanger')
+NODE_ELEMENT_TABLES = ('sink', 'source', 'ext_grid')
+
+
+class ComponentNotFoundError(KeyError, ValueError):
+    """
+        Unknown component name (KeyError of the index lookups and ValueError of the linear name search).
+    """
+
+    def __str__(self):
+        return str(self.args[0]) if self.args else ''
+
+
+class NetworkIndex():
+    """
+        Cached topology index of a pandapipes network containing the following lookups:
+            names: Maps the component names of every component table to their row index
+            adjacency: Maps every junction to the connected branches (from/to side) and node elements
+
+        The index is built once and only rebuilt by refresh() if the topology tables of the network have changed.
+    """
+
+    def __init__(self, net):
+        self.names = {}
+        self.adjacency = {}
+        self.signature = None
+        self.build_count = 0
+        self.build(net)
+
+    def __repr__(self):
+        sizes = ', '.join([f'{key}={len(names)}' for key, names in self.names.items()])
+        return f'NetworkIndex({sizes})'
+
+    def build(self, net):
+        """
+            Build the name lookups and junction adjacency of all component tables.
+        """
+        self.names = {key: _get_name_lookup(net, key) for key in COMPONENT_TABLES}
+
+        # Junction adjacency of branch components
+        self.adjacency = {}
+        for key in BRANCH_TABLES:
+            table = get_component_table(net, key)
+            if table is None:
+                self.adjacency[key] = {'from': {}, 'to': {}}
+                continue
+            self.adjacency[key] = {'from': _group_by_junction(table['from_junction'].values, table.index.values),
+                                   'to': _group_by_junction(table['to_junction'].values, table.index.values)}
+
+        # Junction adjacency of node elements
+        for key in NODE_ELEMENT_TABLES:
+            table = get_component_table(net, key)
+            if table is None:
+                self.adjacency[key] = {'junction': {}}
+                continue
+            self.adjacency[key] = {'junction': _group_by_junction(table['junction'].values, table.index.values)}
+
+        self.signature = get_topology_signature(net)
+        self.build_count += 1
+
+        return self
+
+    def refresh(self, net, deep=True):
+        """
+            Rebuild the index if the topology of the network has changed (deep=False only checks the table shapes).
+        """
+        signature = get_topology_signature(net, deep=deep)
+        if deep:
+            changed = signature != self.signature
+        else:
+            changed = signature != self.signature[:len(signature)]
+
+        if changed:
+            self.build(net)
+
+        return self
+
+    def position(self, type, name):
+        """
+            Get the row index of a network component by name.
+        """
+        try:
+            return self.names[type][name]
+        except KeyError:
+            raise ComponentNotFoundError(f"Component '{name}' of type '{type}' cannot be found.")
+
+    def positions(self, type, names):
+        """
+            Get the row indices of several network components of the same type by name.
+        """
+        return np.array([self.position(type, name) for name in names], dtype=np.int64)
+
+    def connected(self, type, junction, side='from'):
+        """
+            Get the row indices of all components of a type connected to a junction (side: 'from', 'to' or 'junction').
+        """
+        return self.adjacency[type][side].get(junction, [])
+
+
+def get_topology_signature(net, deep=True):
+    """
+        Get a hashable signature of the network topology tables. The shallow part (table lengths) is cheap enough to be
+        checked on every API call, the deep part hashes the names and junction connections of all components.
+    """
+    tables = [get_component_table(net, key) for key in COMPONENT_TABLES]
+    signature = tuple([len(table) if table is not None else -1 for table in tables])
+
+    if deep:
+        content = []
+        for key, table in zip(COMPONENT_TABLES, tables):
+            if table is None:
+                continue
+            if key == 'controller':
+                content.append(hash(tuple([getattr(c, 'name', None) for c in table['object']])))
+                continue
+            content.append(hash(tuple(table['name'].values)))
+            content.append(hash(table.index.values.tobytes()))
+            for column in ('from_junction', 'to_junction', 'junction'):
+                if column in table:
+                    content.append(hash(table[column].values.tobytes()))
+        signature += tuple(content)
+
+    return signature
+
+
+def get_component_table(net, key):
+    """
+        Get a component table of the network (None if no component of this type was created yet).
+    """
+    if key not in net:
+        return None
+
+    return net[key]
+
+
+def _get_name_lookup(net, key):
+    """
+        Map the component names of a table to their row index (the first component wins on duplicated names).
+    """
+    table = get_component_table(net, key)
+    if table is None:
+        return {}
+    if key == 'controller':
+        names = [getattr(c, 'name', None) for c in table['object']]
+    else:
+        names = table['name'].values
+
+    lookup = {}
+    for name, label in zip(names, table.index.values):
+        lookup.setdefault(name, int(label))
+
+    return lookup
+
+
+def _group_by_junction(junctions, labels):
+    """
+        Group the row indices of components by their connected junction.
+    """
+    groups = {}
+    for junction, label in zip(junctions, labels):
+        groups.setdefault(int(junction), []).append(int(label))
+
+    return groups
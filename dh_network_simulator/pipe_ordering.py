@@ -0,0 +1,188 @@
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class PipeFlowOrder():
+    """
+        Topological order of the network pipes along the current flow direction (from heat injection towards the
+        consumers) containing the following objects:
+            levels: List of pipe position arrays. All pipes feeding the inlet junction of a pipe are in a former level
+            pipe_inlet/pipe_outlet: Junction positions at the inlet and outlet of each pipe according to the flow sign
+            valve_inlet/valve_outlet, hex_inlet/hex_outlet: Same for the opened valves and the heat exchangers
+            cycles: Names of the pipes inside flow loops (calculated successively after the acyclic part)
+
+        The order is built from the signs of the branch mass flows and the opened valves. It is cached and only
+        rebuilt if a flow direction, a valve state or the network topology has changed.
+    """
+
+    def __init__(self):
+        self.signature = None
+        self.build_count = 0
+        self.reuse_count = 0
+        self.levels = []
+        self.cycles = []
+
+    def __repr__(self):
+        return f'PipeFlowOrder(levels={len(self.levels)}, cycles={len(self.cycles)}, builds={self.build_count}, ' \
+               f'reuses={self.reuse_count})'
+
+    @property
+    def stream(self):
+        """
+            Pipe positions in order of the temperature flow.
+        """
+        if not self.levels:
+            return np.array([], dtype=np.int64)
+
+        return np.concatenate(self.levels)
+
+    def stats(self):
+        """
+            Counters of the (re-)built and reused pipe orders.
+        """
+        return {'build_count': self.build_count,
+                'reuse_count': self.reuse_count}
+
+    def update(self, net, index):
+        """
+            Reuse the cached pipe order or rebuild it if the flow directions or valve states have changed.
+        """
+        signature = _get_flow_signature(net, index)
+        if signature == self.signature:
+            self.reuse_count += 1
+            return self
+
+        self.build(net)
+        self.signature = signature
+
+        return self
+
+    def build(self, net):
+        """
+            Build the topological pipe order of the directed junction graph (pipes, opened valves and heat exchangers).
+        """
+        junctions = pd.Index(net.junction.index)
+
+        # Directed branches according to the sign of the mass flows
+        pipe = net.pipe
+        self.pipe_direction = _get_flow_direction(net, 'pipe')
+        self.pipe_inlet, self.pipe_outlet = _get_directed_junctions(junctions, pipe, self.pipe_direction)
+
+        valve = _get_table(net, 'valve')
+        self.valve_ids = valve.index.values[valve['opened'].values.astype(bool)]
+        valve_direction = _get_flow_direction(net, 'valve')[valve['opened'].values.astype(bool)]
+        self.valve_inlet, self.valve_outlet = _get_directed_junctions(junctions, valve.loc[self.valve_ids],
+                                                                      valve_direction)
+
+        heat_exchanger = _get_table(net, 'heat_exchanger')
+        self.hex_direction = _get_flow_direction(net, 'heat_exchanger')
+        self.hex_inlet, self.hex_outlet = _get_directed_junctions(junctions, heat_exchanger, self.hex_direction)
+
+        self.levels, cyclic_pipes = get_pipe_levels(n_junctions=len(junctions),
+                                                    pipe_from=self.pipe_inlet,
+                                                    pipe_to=self.pipe_outlet,
+                                                    link_from=np.concatenate([self.valve_inlet, self.hex_inlet]),
+                                                    link_to=np.concatenate([self.valve_outlet, self.hex_outlet]))
+
+        # Pipes inside loops are calculated successively (sorted by the inlet pressures)
+        self.cycles = []
+        if len(cyclic_pipes):
+            if 'res_pipe' in net and 'p_from_bar' in net.res_pipe:
+                p_inlet = np.where(self.pipe_direction > 0, net.res_pipe['p_from_bar'].values,
+                                   net.res_pipe['p_to_bar'].values)
+                cyclic_pipes = cyclic_pipes[np.argsort(-p_inlet[cyclic_pipes], kind='stable')]
+            self.levels += [np.array([p], dtype=np.int64) for p in cyclic_pipes]
+            self.cycles = pipe['name'].values[cyclic_pipes].tolist()
+            logger.warning(f'FlowLoopDetected: Pipes {self.cycles} are part of or downstream of a flow loop and are '
+                           f'calculated successively.')
+
+        self.build_count += 1
+
+        return self
+
+
+def get_pipe_levels(n_junctions, pipe_from, pipe_to, link_from, link_to):
+    """
+        Group the pipes into topological levels. A pipe is assigned to the level after all pipes feeding its inlet
+        junction (directly or via links such as opened valves and heat exchangers).
+        Returns the levels of the acyclic part and the positions of the pipes inside or downstream of flow loops.
+    """
+    # Junction graph of pipes (weight 1) and links (weight 0)
+    edges_from = np.concatenate([pipe_from, link_from]).astype(np.int64)
+    edges_to = np.concatenate([pipe_to, link_to]).astype(np.int64)
+    weights = np.concatenate([np.ones(len(pipe_from), dtype=np.int64), np.zeros(len(link_from), dtype=np.int64)])
+
+    outgoing = [[] for _ in range(n_junctions)]
+    for e, j in enumerate(edges_from):
+        outgoing[j].append(e)
+    in_degree = np.bincount(edges_to, minlength=n_junctions)
+    depth = np.zeros(n_junctions, dtype=np.int64)
+
+    # Longest path of each junction by Kahn's algorithm
+    queue = [j for j in range(n_junctions) if in_degree[j] == 0]
+    visited = np.zeros(n_junctions, dtype=bool)
+    while queue:
+        j = queue.pop()
+        visited[j] = True
+        for e in outgoing[j]:
+            k = edges_to[e]
+            depth[k] = max(depth[k], depth[j] + weights[e])
+            in_degree[k] -= 1
+            if in_degree[k] == 0:
+                queue.append(k)
+
+    pipe_from = np.asarray(pipe_from, dtype=np.int64)
+    pipe_level = depth[pipe_from]
+    acyclic = visited[pipe_from] if len(pipe_from) else np.zeros(0, dtype=bool)
+    levels = [np.flatnonzero((pipe_level == level) & acyclic) for level in np.unique(pipe_level[acyclic])]
+
+    return levels, np.flatnonzero(~acyclic)
+
+
+def _get_flow_signature(net, index):
+    """
+        Get a signature of the flow directions of all branches, the valve states and the network topology.
+    """
+    signature = (index.build_count,
+                 _get_flow_direction(net, 'pipe').tobytes(),
+                 _get_flow_direction(net, 'valve').tobytes(),
+                 _get_table(net, 'valve')['opened'].values.astype(bool).tobytes(),
+                 _get_flow_direction(net, 'heat_exchanger').tobytes())
+
+    return signature
+
+
+def _get_flow_direction(net, key):
+    """
+        Get the flow direction of a branch component (+1: from -> to junction, -1: reversed flow).
+    """
+    n = len(_get_table(net, key))
+    result = 'res_' + key
+    if result not in net or 'mdot_from_kg_per_s' not in net[result] or len(net[result]) != n:
+        return np.ones(n, dtype=np.int8)
+
+    return np.where(net[result]['mdot_from_kg_per_s'].values < 0, -1, 1).astype(np.int8)
+
+
+def _get_directed_junctions(junctions, table, direction):
+    """
+        Get the junction positions at the inlet and outlet of branches according to their flow direction.
+    """
+    from_junction = junctions.get_indexer(table['from_junction'].values)
+    to_junction = junctions.get_indexer(table['to_junction'].values)
+    forward = direction > 0
+
+    return np.where(forward, from_junction, to_junction), np.where(forward, to_junction, from_junction)
+
+
+def _get_table(net, key):
+    """
+        Get a network table (empty table if no component of this type was created yet).
+    """
+    if key in net:
+        return net[key]
+
+    return pd.DataFrame(columns=['name', 'from_junction', 'to_junction', 'opened', 'qext_w'], dtype=np.float64)
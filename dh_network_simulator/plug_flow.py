@@ -0,0 +1,196 @@
+import numpy as np
+from .thermal_kernel import DynamicThermalKernel
+
+DEFAULT_PARCELS = 16  # number of fluid parcels stored per pipe
+
+
+class PlugFlowKernel(DynamicThermalKernel):
+    """
+        Lagrangian plug flow simulation of the network pipes (sim_mode 'plugflow').
+
+        Each pipe stores a fixed number of fluid parcels (mass, temperature) ordered from the inlet towards the outlet.
+        In every time step the parcels are advanced by the inflowing mass (mdot * dt), the outflowing parcels are mixed
+        to the pipe outlet temperature and the remaining parcels lose heat to the ambient (alpha_w_per_m2k, text_k).
+        The two adjacent parcels with the smallest combined mass are merged to keep the number of parcels constant.
+        The state is O(pipes x parcels) independent of the simulated time and does not require historical data.
+    """
+
+    def __init__(self, net=None, index=None, order=None, n_parcels=DEFAULT_PARCELS):
+        self.n_parcels = n_parcels
+        super().__init__(net, index, order)
+
+    def build(self, net, index):
+        """
+            Precompute the static pipe coefficients and reset the parcels of all pipes.
+        """
+        super().build(net, index)
+
+        # Fluid volume of the pipes
+        self.volume_m3 = np.pi * net.pipe['diameter_m'].values.astype(np.float64) ** 2 / 4 * self.length_m
+        self.fluid = net.fluid
+        self.reset()
+
+        return self
+
+    def reset(self):
+        """
+            Clear the stored parcels (the pipes are re-initialized with their steady-state temperature profile).
+        """
+        n_pipes = len(self.pipe_ids)
+        self.t = None
+        self.mass = np.zeros((n_pipes, self.n_parcels))  # parcels in from -> to junction direction
+        self.temp = np.full((n_pipes, self.n_parcels), np.nan)
+        self.initialized = np.zeros(n_pipes, dtype=bool)
+        self.previous = None
+
+    def get_state(self):
+        """
+            Get a copy of the parcel state of all pipes (snapshot of the simulator).
+        """
+        return _copy_state((self.t, self.mass, self.temp, self.initialized, self.previous))
+
+    def set_state(self, state):
+        """
+            Restore the parcel state of get_state() (the parcels are reset if the number of pipes has changed since).
+        """
+        t, mass, temp, initialized, previous = _copy_state(state)
+        if mass.shape != self.mass.shape:
+            self.reset()
+            return
+        self.t, self.mass, self.temp, self.initialized, self.previous = t, mass, temp, initialized, previous
+
+    def _prepare_step(self, historical_data, t, mdot, v_mean):
+        """
+            Get the inflowing mass of all pipes and the parcels in flow direction.
+        """
+        # Recalculation of the latest time step starts from the previous state
+        if self.previous is not None and t == self.t:
+            self.t, self.mass, self.temp, self.initialized = self.previous
+
+        dt = max(t - self.t, 0) if self.t is not None else 0
+        self.previous = (self.t, self.mass, self.temp, self.initialized)
+
+        self.dt = dt
+        self.mdot = mdot
+        self.inflow = np.nan_to_num(mdot) * dt
+
+        # Parcels ordered from the pipe inlet towards the outlet
+        reverse = (self.order.pipe_direction < 0)[:, None]
+        self.flow_mass = np.where(reverse, self.mass[:, ::-1], self.mass)
+        self.flow_temp = np.where(reverse, self.temp[:, ::-1], self.temp)
+        self.flow_initialized = self.initialized.copy()
+
+    def _calc_level(self, level, t_junction_in):
+        """
+            Advance the parcels of the pipes of one level by the inflow at the current inlet temperatures.
+        """
+        t_in = t_junction_in.copy()
+        t_ambient = self.text_k[level]
+
+        # Steady-state temperature profile of pipes without stored parcels
+        new = ~self.flow_initialized[level]
+        if new.any():
+            pipes = level[new]
+            with np.errstate(divide='ignore'):
+                decay = self.decay_coeff[pipes] / self.mdot[pipes]
+            mass, temp = init_parcels(pipe_mass=self.volume_m3[pipes] * self.fluid.get_density(t_in[new]),
+                                      t_in=t_in[new],
+                                      t_ambient=t_ambient[new],
+                                      decay=decay,
+                                      n_parcels=self.n_parcels)
+            self.flow_mass[pipes] = mass
+            self.flow_temp[pipes] = temp
+            self.flow_initialized[pipes] = True
+
+        # Advance the parcels and mix the outflowing parcels at the pipe outlet
+        mass, temp, t_out = advance_parcels(mass=self.flow_mass[level],
+                                            temp=self.flow_temp[level],
+                                            m_in=self.inflow[level],
+                                            t_in=t_in)
+
+        # Heat loss of the stored parcels during the time step
+        with np.errstate(divide='ignore', invalid='ignore'):
+            decay = np.exp(- self.decay_coeff[level] * self.dt / mass.sum(axis=1))
+        temp = t_ambient[:, None] + (temp - t_ambient[:, None]) * np.nan_to_num(decay, nan=1.)[:, None]
+
+        self.flow_mass[level] = mass
+        self.flow_temp[level] = temp
+
+        return t_in, t_out
+
+    def _finish_step(self, t):
+        """
+            Store the parcels in from -> to junction direction.
+        """
+        reverse = (self.order.pipe_direction < 0)[:, None]
+        self.mass = np.where(reverse, self.flow_mass[:, ::-1], self.flow_mass)
+        self.temp = np.where(reverse, self.flow_temp[:, ::-1], self.flow_temp)
+        self.initialized = self.flow_initialized
+        self.t = t
+
+
+def init_parcels(pipe_mass, t_in, t_ambient, decay, n_parcels):
+    """
+        Split the pipes into parcels of equal mass with the steady-state temperature profile along the pipes
+        (decay: exponent of the temperature drop over the full pipe length).
+    """
+    position = (np.arange(n_parcels) + 0.5) / n_parcels
+    with np.errstate(over='ignore', invalid='ignore'):
+        profile = np.exp(- np.asarray(decay)[:, None] * position[None, :])
+    profile = np.nan_to_num(profile, nan=0.)
+
+    mass = np.repeat(np.asarray(pipe_mass, dtype=np.float64)[:, None] / n_parcels, n_parcels, axis=1)
+    temp = t_ambient[:, None] + (t_in - t_ambient)[:, None] * profile
+
+    return mass, temp
+
+def advance_parcels(mass, temp, m_in, t_in):
+    """
+        Push the inflowing mass m_in at the temperature t_in into the pipes (parcels ordered from inlet to outlet).
+        Returns the remaining parcels (merged to the original number of parcels) and the mixed outlet temperatures.
+    """
+    n_pipes, n_parcels = mass.shape
+    rows = np.arange(n_pipes)
+
+    # Parcels including the inflowing parcel at the pipe inlet
+    mass = np.hstack([m_in[:, None], mass])
+    temp = np.hstack([t_in[:, None], temp])
+
+    # Outflowing mass of each parcel (the first m_in of mass counted from the outlet)
+    upstream_edge = np.cumsum(mass[:, ::-1], axis=1)[:, ::-1]
+    downstream_edge = upstream_edge - mass
+    outflow = np.clip(upstream_edge, 0, m_in[:, None]) - np.clip(downstream_edge, 0, m_in[:, None])
+
+    # Outlet temperature by mixing the outflowing parcels (last stored parcel if there is no outflow)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_out = np.sum(outflow * temp, axis=1) / m_in
+    filled = mass > 0
+    last = n_parcels - np.argmax(filled[:, ::-1], axis=1)
+    no_outflow = ~(m_in > 0)
+    t_out[no_outflow] = temp[rows, last][no_outflow]
+    mass = mass - outflow
+
+    # Merge the adjacent parcels with the smallest combined mass
+    k = np.argmin(mass[:, :-1] + mass[:, 1:], axis=1)
+    merged_mass = mass[rows, k] + mass[rows, k + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        merged_temp = np.where(merged_mass > 0,
+                               (mass[rows, k] * temp[rows, k] + mass[rows, k + 1] * temp[rows, k + 1]) / merged_mass,
+                               temp[rows, k + 1])
+
+    columns = np.arange(n_parcels)[None, :]
+    source = np.where(columns <= k[:, None], columns, columns + 1)
+    mass = mass[rows[:, None], source]
+    temp = temp[rows[:, None], source]
+    mass[rows, k] = merged_mass
+    temp[rows, k] = merged_temp
+
+    return mass, temp, t_out
+
+def _copy_state(state):
+    # Copy the arrays of a (nested) state tuple
+    if isinstance(state, tuple):
+        return tuple([_copy_state(value) for value in state])
+    if isinstance(state, np.ndarray):
+        return state.copy()
+    return state
@@ -0,0 +1,174 @@
+import atexit
+import cProfile
+import itertools
+import os
+import sys
+import threading
+import time
+import weakref
+
+# Environment variables of the profiling mode (output path prefix and window of steps 'start:stop')
+PROFILE_ENV = 'DHNSIM_PROFILE'
+PROFILE_STEPS_ENV = 'DHNSIM_PROFILE_STEPS'
+
+# Default interval of the stack sampler
+DEFAULT_SAMPLE_INTERVAL_S = 0.001
+
+# Profilers written at exit of the interpreter (not kept alive) and the counter of the unpickled copies
+_PROFILERS = weakref.WeakSet()
+_COPIES = itertools.count()
+
+
+class SimulationProfiler():
+    """
+        Opt-in profiler of a window of simulation steps (calls of run_simulation() with start <= step < stop).
+
+        The steps of the window are traced by cProfile and sampled by a background thread, which walks the stack of the
+        simulation thread up to run_simulation() in fixed intervals. The results are written to
+            <path>.prof: cProfile stats (pstats, snakeviz, gprof2dot)
+            <path>.collapsed: Collapsed stacks 'frame;frame;frame count' (flamegraph.pl, speedscope, inferno)
+        at the end of the window, by write()/close() or at exit of the interpreter. Processes which exit without
+        running the atexit hooks (e.g. pool workers) have to close() profilers of open-ended windows.
+    """
+
+    def __init__(self, path, start=0, stop=None, sample_interval_s=DEFAULT_SAMPLE_INTERVAL_S, trace=True):
+        self.path = str(path)
+        self.start = start
+        self.stop = stop
+        self.sample_interval_s = sample_interval_s
+        self.trace = trace
+
+        self.profile = cProfile.Profile() if trace else None
+        self.stacks = {}
+        self.steps = 0
+        self.steps_profiled = 0
+        self.written = False
+
+        # Profiled step
+        self._root = None
+        self._thread_id = None
+        self._sampler = None
+        self._sampling = threading.Event()
+
+        _PROFILERS.add(self)
+
+    def __repr__(self):
+        return f'SimulationProfiler(path={self.path}, window=({self.start}, {self.stop}), profiled={self.steps_profiled})'
+
+    def __getstate__(self):
+        # Copies (e.g. in worker processes) profile into their own files (suffix of the process and the copy)
+        return {'path': self.path, 'start': self.start, 'stop': self.stop, 'sample_interval_s': self.sample_interval_s,
+                'trace': self.trace}
+
+    def __setstate__(self, state):
+        state['path'] = f"{state['path']}-{os.getpid()}-{next(_COPIES)}"
+        self.__init__(**state)
+
+    @classmethod
+    def from_env(cls):
+        """
+            Create a profiler from the environment variables (None if DHNSIM_PROFILE is not set).
+        """
+        path = os.environ.get(PROFILE_ENV)
+        if not path:
+            return None
+
+        start, stop = 0, None
+        steps = os.environ.get(PROFILE_STEPS_ENV)
+        if steps:
+            start, _, stop = steps.partition(':')
+            start = int(start or 0)
+            stop = int(stop) if stop else None
+
+        return cls(path, start=start, stop=stop)
+
+    def in_window(self):
+        """
+            Check if the next step is within the profiled window.
+        """
+        return self.start <= self.steps and (self.stop is None or self.steps < self.stop)
+
+    def start_step(self):
+        """
+            Start profiling a step (called by run_simulation()). Returns False if the step is outside the window.
+        """
+        if not self.in_window():
+            self.steps += 1
+            return False
+
+        self._root = sys._getframe(1)
+        self._thread_id = threading.get_ident()
+        self._sampling.set()
+        self._sampler = threading.Thread(target=self._sample, name='dhnsim-profiler', daemon=True)
+        self._sampler.start()
+        if self.profile is not None:
+            self.profile.enable()
+        return True
+
+    def stop_step(self):
+        """
+            Stop profiling the current step and write the results at the end of the window.
+        """
+        if self.profile is not None:
+            self.profile.disable()
+        self._sampling.clear()
+        self._sampler.join()
+        self._root = None
+
+        self.steps += 1
+        self.steps_profiled += 1
+        if self.stop is not None and self.steps >= self.stop:
+            self.write()
+
+    def write(self):
+        """
+            Write the cProfile stats and the collapsed stacks of the profiled steps.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if self.profile is not None:
+            self.profile.dump_stats(self.path + '.prof')
+        with open(self.path + '.collapsed', 'w') as fout:
+            for stack, count in sorted(self.stacks.items()):
+                fout.write(f'{stack} {count}\n')
+
+        self.written = True
+
+    def close(self):
+        """
+            Write the profiled steps of an open-ended or unfinished window (if not written yet).
+        """
+        if self.steps_profiled and not self.written:
+            self.write()
+
+    def _sample(self):
+        # Sample the stack of the simulation thread up to the root frame (run_simulation) in fixed intervals
+        while self._sampling.is_set():
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_get_frame_label(frame))
+                if frame is self._root:
+                    break
+                frame = frame.f_back
+            else:
+                stack = None
+
+            if stack:
+                key = ';'.join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            time.sleep(self.sample_interval_s)
+
+
+def _get_frame_label(frame):
+    # Function name and file of a frame (without separators of the collapsed stack format, equal on all python versions)
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'.replace(';', ',')
+
+@atexit.register
+def _write_profilers():
+    # Write open-ended windows at exit of the interpreter
+    for profiler in list(_PROFILERS):
+        profiler.close()
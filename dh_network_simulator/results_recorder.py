@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+from .network_index import get_component_table
+
+DEFAULT_CHUNK_SIZE = 1024  # number of time steps the recorder grows by if the planned horizon is exceeded
+
+
+class ResultsRecorder():
+    """
+        Columnar in-memory recorder of result columns of the network components.
+
+        The recorder is configured by channel specs (component type, component names, result columns), where
+        names=None records all components of the type and the result columns are one column or a list of columns.
+        The values are stored in one preallocated float array (time steps x channels) sized for the planned horizon,
+        which grows in chunks if more time steps are recorded. Each time step is recorded by one vectorized gather per
+        channel spec and result column from the result tables net.res_*.
+
+        to_frame() and query() return DataFrames sharing the memory of the recorder (no copy).
+    """
+
+    def __init__(self, channels, horizon=DEFAULT_CHUNK_SIZE, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.specs = [spec for channel in channels for spec in _get_channel_specs(channel)]
+        self.chunk_size = max(int(chunk_size), 1)
+        self.labels = []
+        self.groups = []
+        self.index_signature = None
+        self.times = np.full(max(int(horizon), 1), np.nan)
+        self.values = None
+        self.size = 0
+        self.latest_time = None
+
+    def __repr__(self):
+        return f'ResultsRecorder(channels={len(self.labels)}, size={self.size}, capacity={self.capacity})'
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def capacity(self):
+        return len(self.times)
+
+    def resolve(self, net, index):
+        """
+            Resolve the channel specs to the row positions of the components in the result tables.
+        """
+        labels = []
+        groups = []
+        for type, names, column in self.specs:
+            table = get_component_table(net, type)
+            if table is None:
+                raise KeyError(f"Component type '{type}' cannot be found.")
+            if names is None:
+                names = list(table['name'].values)
+            rows = table.index.get_indexer(index.positions(type, names))
+            groups.append(('res_' + type, column, rows, slice(len(labels), len(labels) + len(rows))))
+            labels += [f'{name}.{column}' for name in names]
+
+        # Channels must not change once values are recorded
+        if self.values is not None and labels != self.labels:
+            raise ValueError('Channels of the recorder have changed after recording.')
+        if self.values is None:
+            self.values = np.full((self.capacity, len(labels)), np.nan)
+
+        self.labels = labels
+        self.groups = groups
+        self.index_signature = (id(index), index.build_count)
+
+        return self
+
+    def record(self, net, t, index):
+        """
+            Record the result columns of all channels for time step t (time steps are recorded in ascending order).
+        """
+        if self.index_signature != (id(index), index.build_count):
+            self.resolve(net, index)
+        if self.latest_time is not None and t < self.latest_time:
+            raise ValueError(f'Time step {t} is recorded before the latest recorded time step {self.latest_time}.')
+        if self.size == self.capacity:
+            self._grow()
+
+        row = self.values[self.size]
+        for key, column, rows, columns in self.groups:
+            if key in net and column in net[key]:
+                row[columns] = net[key][column].values[rows]
+            else:
+                row[columns] = np.nan
+        self.times[self.size] = t
+        self.size += 1
+        self.latest_time = t
+
+    def to_frame(self):
+        """
+            Get the recorded values as DataFrame (time steps x channels) without copying the values.
+        """
+        return self._get_frame(0, self.size)
+
+    def query(self, t_start=None, t_end=None):
+        """
+            Get the recorded values of the time range [t_start, t_end] as DataFrame without copying the values.
+        """
+        times = self.times[:self.size]
+        start = 0 if t_start is None else int(np.searchsorted(times, t_start, side='left'))
+        stop = self.size if t_end is None else int(np.searchsorted(times, t_end, side='right'))
+        return self._get_frame(start, stop)
+
+    def reset(self):
+        """
+            Discard all recorded time steps (the preallocated arrays are kept).
+        """
+        self.size = 0
+        self.latest_time = None
+
+    def _get_frame(self, start, stop):
+        values = self.values if self.values is not None else np.empty((self.capacity, 0))
+        return pd.DataFrame(values[start:stop], index=pd.Index(self.times[start:stop], name='time'),
+                            columns=self.labels, copy=False)
+
+    def _grow(self):
+        # Extend the arrays by one chunk of time steps
+        self.times = np.concatenate([self.times, np.full(self.chunk_size, np.nan)])
+        self.values = np.concatenate([self.values, np.full((self.chunk_size, self.values.shape[1]), np.nan)])
+
+
+def _get_channel_specs(channel):
+    """
+        Get the channel specs (type, names, column) of a channel (names: single name, list of names or None,
+        columns: single result column or list of result columns).
+    """
+    type, names, columns = channel
+    if isinstance(names, str):
+        names = [names]
+    elif names is not None:
+        names = list(names)
+    if isinstance(columns, str):
+        columns = [columns]
+
+    return [(type, names, column) for column in columns]
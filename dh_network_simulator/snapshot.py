@@ -0,0 +1,138 @@
+import copy
+import types
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_SNAPSHOTS = 8  # number of stored snapshots before the oldest is evicted
+
+# Attribute values which are stored by reference (immutable)
+ATOMIC_TYPES = (type(None), bool, int, float, complex, str, bytes, np.generic, type, types.FunctionType,
+                types.BuiltinFunctionType)
+
+
+class SnapshotStore():
+    """
+        Bounded in-memory store of simulator snapshots (see DHNetworkSimulator.snapshot()). Every snapshot gets a
+        unique integer token, the oldest snapshot is evicted once max_snapshots are stored. Restoring a snapshot keeps
+        it, so a time step can be retried several times from the same state.
+    """
+
+    def __init__(self, max_snapshots=DEFAULT_MAX_SNAPSHOTS):
+        if max_snapshots < 1:
+            raise ValueError('The snapshot store requires at least one snapshot.')
+        self.max_snapshots = max_snapshots
+        self.snapshots = OrderedDict()
+        self.next_token = 0
+        self.evicted = 0
+
+    def __repr__(self):
+        return f'SnapshotStore(snapshots={len(self)}, max_snapshots={self.max_snapshots}, evicted={self.evicted})'
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def __contains__(self, token):
+        return token in self.snapshots
+
+    def add(self, snapshot):
+        """
+            Store a snapshot and get its token (evicts the oldest snapshot of a full store).
+        """
+        token = self.next_token
+        self.next_token += 1
+        self.snapshots[token] = snapshot
+        while len(self.snapshots) > self.max_snapshots:
+            self.snapshots.popitem(last=False)
+            self.evicted += 1
+
+        return token
+
+    def get(self, token):
+        """
+            Get the snapshot of a token.
+        """
+        try:
+            return self.snapshots[token]
+        except KeyError:
+            raise KeyError(f'Snapshot {token} does not exist (evicted or not taken by this simulator).')
+
+    def clear(self):
+        self.snapshots.clear()
+
+
+def get_net_state(net):
+    """
+        Get a copy of the network tables (components, geodata, controller and results) and the component list.
+    """
+    tables = {key: value.copy() for key, value in net.items()
+              if isinstance(value, pd.DataFrame) and not key.startswith('_')}
+
+    return {'tables': tables,
+            'component_list': list(net.component_list),
+            'converged': net.converged}
+
+def set_net_state(net, state):
+    """
+        Restore the network tables of get_net_state() (tables created after the snapshot are removed).
+    """
+    for key in [key for key, value in net.items() if isinstance(value, pd.DataFrame) and not key.startswith('_')]:
+        if key not in state['tables']:
+            del net[key]
+    for key, table in state['tables'].items():
+        net[key] = table.copy()
+
+    net.component_list = list(state['component_list'])
+    net.converged = state['converged']
+
+def get_controller_state(net):
+    """
+        Get a copy of the attributes of all controllers of the network (e.g. valve positions and PID states). The
+        controllers referenced by other controllers and their data sources are shared, not copied.
+    """
+    controllers = list(net.controller['object'])
+    memo = _get_shared_memo(controllers)
+
+    return [(controller, _copy_attributes(controller.__dict__, memo)) for controller in controllers]
+
+def set_controller_state(state):
+    """
+        Restore the attributes of the controllers of get_controller_state().
+    """
+    memo = _get_shared_memo([controller for controller, _ in state])
+    for controller, attributes in state:
+        controller.__dict__.update(_copy_attributes(attributes, memo))
+
+def _copy_attributes(attributes, memo):
+    """
+        Copy the attributes of a controller: immutable values and shared objects by reference, arrays and flat
+        objects (e.g. the PID of a CtrlValve) by a shallow copy and all other values by a deep copy.
+    """
+    copied = {}
+    for key, value in attributes.items():
+        if _is_atomic(value) or id(value) in memo:
+            copied[key] = value
+        elif isinstance(value, np.ndarray):
+            copied[key] = value.copy()
+        elif hasattr(value, '__dict__') and all([_is_atomic(v) for v in vars(value).values()]):
+            copied[key] = copy.copy(value)
+        else:
+            copied[key] = copy.deepcopy(value, memo)
+
+    return copied
+
+def _is_atomic(value):
+    if isinstance(value, tuple):
+        return all([_is_atomic(v) for v in value])
+    return isinstance(value, ATOMIC_TYPES)
+
+def _get_shared_memo(controllers):
+    # Deepcopy memo of the objects which are shared instead of copied
+    memo = {}
+    for controller in controllers:
+        memo[id(controller)] = controller
+        data_source = getattr(controller, 'data_source', None)
+        if data_source is not None:
+            memo[id(data_source)] = data_source
+
+    return memo
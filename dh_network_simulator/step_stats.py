@@ -0,0 +1,77 @@
+import pandas as pd
+
+# Wall time phases of a simulation step
+STEP_PHASES = ('control', 'hydraulic', 'thermal', 'enqueue', 'record')
+
+
+class StepStats():
+    """
+        Performance counters of the simulation steps: the stats of the latest step (last) and cumulative counters of
+        all steps (totals, number of steps and non-converged control runs per controller name).
+
+        The stats of a step are a flat dict of counters and wall times (see DHNetworkSimulator.run_simulation()):
+            time_<phase>_s: Wall time of the phases control, hydraulic, thermal, enqueue and record
+            time_step_s: Wall time of the step
+            pipeflow_calls, control_solves, hydraulic_solves, heat_solves, newton_iterations: Pandapipes solves
+            controller_iterations: Controller iterations (control solves after the initial pipeflow)
+            not_converged: Names of the controllers which have not converged
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def __repr__(self):
+        return f'StepStats(steps={self.steps}, not_converged_steps={self.not_converged_steps})'
+
+    def reset(self):
+        """
+            Reset the stats of the latest step and the cumulative counters.
+        """
+        self.last = {}
+        self.totals = {}
+        self.steps = 0
+        self.not_converged_steps = 0
+        self.not_converged = {}
+
+    def add(self, stats):
+        """
+            Add the stats of a simulation step.
+        """
+        self.last = stats
+        self.steps += 1
+
+        # Sum up counters and wall times
+        for key, value in stats.items():
+            if _is_counter(key, value):
+                self.totals[key] = self.totals.get(key, 0) + value
+
+        # Count non-converged control runs per controller
+        if stats.get('not_converged'):
+            self.not_converged_steps += 1
+            for name in stats['not_converged']:
+                self.not_converged[name] = self.not_converged.get(name, 0) + 1
+
+    def to_dict(self):
+        """
+            Get the cumulative counters as dict.
+        """
+        return {'steps': self.steps,
+                'not_converged_steps': self.not_converged_steps,
+                **self.totals,
+                'not_converged': dict(self.not_converged)}
+
+    def to_frame(self):
+        """
+            Get the counters of the latest step, their totals and their means per step as DataFrame (rows: last, total,
+            mean).
+        """
+        last = {key: value for key, value in self.last.items() if _is_counter(key, value)}
+        total = pd.Series(self.totals, dtype='float64')
+        mean = total / self.steps if self.steps else total
+
+        return pd.DataFrame([pd.Series(last, dtype='float64'), total, mean], index=['last', 'total', 'mean'])
+
+
+def _is_counter(key, value):
+    # Numeric stats except the time of the step
+    return key != 't' and isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -0,0 +1,130 @@
+import multiprocessing
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from .timeseries import get_profiles_frame
+from .io.profile_data import MemmapProfileData
+
+# Worker state of the sweep processes (simulator snapshot and time series definition, set once per worker)
+_WORKER_STATE = {}
+
+
+class ParameterSweep():
+    """
+        Parameter sweep of scenario variants of one network on a persistent pool of worker processes.
+
+        The simulator is pickled once as snapshot (after loading the network) and shipped to every worker together
+        with the profiles and the time series definition, when the worker is started (inherited without copies by
+        fork if available). Each scenario is scheduled as single task, so that idle workers pick up the next scenario
+        (dynamic scheduling). A worker restores the snapshot, applies the parameter deltas of the scenario, runs the
+        time series (see run_timeseries()) and returns the results array.
+
+        scenarios: List of dicts with the optional keys
+            parameters: Maps (type, name, parameter) to the new value, e.g. ('controller', 'hex1_ctrl', 'gain')
+            profiles: Maps profile columns to a scaling factor, e.g. {'Qdot_cons1': 1.2}
+    """
+
+    def __init__(self, simulator, profiles, input_map, outputs, t_range=None, sim_mode='static', max_workers=None,
+                 mp_context=None):
+        # Memory mapped profiles are mapped again by the workers instead of being copied
+        shared_profiles = profiles if isinstance(profiles, MemmapProfileData) else None
+        profiles = get_profiles_frame(profiles)
+        self.t_range = np.asarray(profiles.index if t_range is None else list(t_range))
+        self.labels = list(outputs) if isinstance(outputs, dict) else [f'{name}.{parameter}'
+                                                                       for _, name, parameter in outputs]
+        self.max_workers = max_workers if max_workers is not None else os.cpu_count()
+
+        # Fork shares the snapshot copy-on-write with the workers
+        if mp_context is None and 'fork' in multiprocessing.get_all_start_methods():
+            mp_context = 'fork'
+        if isinstance(mp_context, str):
+            mp_context = multiprocessing.get_context(mp_context)
+
+        state = {'simulator': pickle.dumps(simulator, protocol=pickle.HIGHEST_PROTOCOL),
+                 'profiles': shared_profiles if shared_profiles is not None else profiles,
+                 'input_map': input_map,
+                 'outputs': outputs,
+                 't_range': self.t_range,
+                 'sim_mode': sim_mode}
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=mp_context,
+                                            initializer=_init_worker, initargs=(state,))
+        self.stats = []
+
+    def __repr__(self):
+        return f'ParameterSweep(workers={self.max_workers}, steps={len(self.t_range)}, outputs={len(self.labels)})'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def run(self, scenarios):
+        """
+            Run all scenarios and get their results as DataFrames (time steps x outputs, ordered like the scenarios).
+            The run times of the scenarios are stored in stats.
+        """
+        futures = {self.executor.submit(_run_scenario, scenario): i for i, scenario in enumerate(scenarios)}
+        results = [None] * len(futures)
+        stats = [None] * len(futures)
+        for future in as_completed(futures):
+            i = futures[future]
+            values, stats[i] = future.result()
+            results[i] = pd.DataFrame(values, index=self.t_range, columns=self.labels)
+        self.stats = stats
+
+        return results
+
+    def close(self):
+        """
+            Shut down the worker processes.
+        """
+        self.executor.shutdown(wait=True)
+
+
+def apply_scenario(simulator, profiles, scenario):
+    """
+        Apply the parameter deltas of a scenario to the simulator and get the scaled profiles.
+    """
+    for (type, name, parameter), value in scenario.get('parameters', {}).items():
+        simulator.set_value_of_network_component(type=type, name=name, parameter=parameter, value=value)
+
+    scaling = scenario.get('profiles', {})
+    if not scaling:
+        return profiles
+
+    profiles = profiles.copy()
+    for column, factor in scaling.items():
+        if column not in profiles:
+            raise KeyError(f"Profile column '{column}' cannot be found.")
+        profiles[column] = profiles[column] * factor
+
+    return profiles
+
+def _init_worker(state):
+    # Keep the snapshot and time series definition for all scenarios of the worker
+    _WORKER_STATE.clear()
+    _WORKER_STATE.update(state)
+
+def _run_scenario(scenario):
+    # Restore the simulator snapshot, apply the scenario and run the time series
+    start = time.perf_counter()
+    state = _WORKER_STATE
+    simulator = pickle.loads(state['simulator'])
+    profiles = apply_scenario(simulator, get_profiles_frame(state['profiles']), scenario)
+
+    results = simulator.run_timeseries(profiles=profiles,
+                                       input_map=state['input_map'],
+                                       outputs=state['outputs'],
+                                       t_range=state['t_range'],
+                                       sim_mode=state['sim_mode'])
+
+    # Write the profiled steps (workers exit without atexit hooks)
+    if simulator.profiler is not None:
+        simulator.profiler.close()
+
+    stats = {'pid': os.getpid(), 'run_time_s': time.perf_counter() - start}
+    return results.values, stats
@@ -1,7 +1,10 @@
 from dh_network_simulator.test import *
+from dh_network_simulator.test.benchmark import *
 from dh_network_simulator.test.io import *
 from dh_network_simulator.test.component_models import *
+from dh_network_simulator.test.cosim import *
 from dh_network_simulator.test.pipeflow import *
+from dh_network_simulator.test.topology import *
 
 import os
 from dh_network_simulator import dir
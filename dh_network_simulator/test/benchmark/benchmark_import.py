@@ -0,0 +1,85 @@
+"""
+    Import/export benchmark of the readable network files (json_readable) of synthetic networks (see
+    network_generator.py). Usage (results as JSON file or on stdout):
+
+        python -m dh_network_simulator.test.benchmark.benchmark_import --consumers 100 1000 5000 --output import.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import pandapipes as pp
+from dh_network_simulator.io import import_network_components, export_network_components
+from dh_network_simulator.network_generator import create_synthetic_network
+from dh_network_simulator.test.benchmark.benchmark_scaling import _get_meta_data
+
+# Default benchmark cases
+DEFAULT_CONSUMERS = (100, 1000, 5000)
+
+
+def run_import_benchmark(n_consumers=DEFAULT_CONSUMERS, topology='radial', repeat=1):
+    """
+        Run the import/export benchmark and get the results as JSON serializable dict (meta data and one result per
+        network size).
+    """
+    results = [benchmark_import(n, topology=topology, repeat=repeat) for n in n_consumers]
+
+    return {'meta': _get_meta_data(topology=topology, repeat=repeat),
+            'results': results}
+
+def benchmark_import(n_consumers, topology='radial', repeat=1):
+    """
+        Benchmark the export and import (json_readable) of a synthetic network with n_consumers consumers (minimum
+        of the repetitions).
+    """
+    net = create_synthetic_network(_create_empty_network(), n_consumers, topology=topology, seed=0)
+
+    export_s = []
+    import_s = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = directory + os.sep
+        for _ in range(repeat):
+            start = time.perf_counter()
+            export_network_components(net, path=path, format='json_readable')
+            export_s.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            imported = import_network_components(_create_empty_network(), path=path, format='json_readable')
+            import_s.append(time.perf_counter() - start)
+        size = sum([os.path.getsize(path + file) for file in os.listdir(path)])
+
+    return {'n_consumers': n_consumers,
+            'n_junctions': len(imported.junction),
+            'n_pipes': len(imported.pipe),
+            'n_controllers': len(imported.controller),
+            'export_s': min(export_s),
+            'import_s': min(import_s),
+            'file_size_mib': size / 2**20}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import/export benchmark of the readable network files.')
+    parser.add_argument('--consumers', type=int, nargs='+', default=list(DEFAULT_CONSUMERS))
+    parser.add_argument('--topology', default='radial')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--output', default=None, help='Path of the JSON file (stdout if not given)')
+    args = parser.parse_args(argv)
+
+    results = run_import_benchmark(n_consumers=args.consumers, topology=args.topology, repeat=args.repeat)
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=4)
+    else:
+        with open(args.output, 'w') as fout:
+            json.dump(results, fout, indent=4)
+
+    return results
+
+def _create_empty_network():
+    net = pp.create_empty_network("net", add_stdtypes=False)
+    pp.create_fluid_from_lib(net, "water", overwrite=True)
+    return net
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+    Scaling benchmark of synthetic networks (see network_generator.py): per-step latency and memory of the static and
+    dynamic simulation from 10 to 10,000 pipes. Usage (results as JSON file or on stdout):
+
+        python -m dh_network_simulator.test.benchmark.benchmark_scaling --pipes 10 100 1000 10000 --output scaling.json
+"""
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandapipes
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.network_generator import get_consumers_for_pipes
+
+# Default benchmark cases
+DEFAULT_PIPES = (10, 100, 1000, 10000)
+DEFAULT_SIM_MODES = ('static', 'dynamic')
+DEFAULT_TOPOLOGIES = ('radial',)
+
+# Variation of the consumer mass flow setpoints between the time steps
+SETPOINT_VARIATION = 0.1
+
+
+def run_scaling_benchmark(n_pipes=DEFAULT_PIPES, sim_modes=DEFAULT_SIM_MODES, topologies=DEFAULT_TOPOLOGIES, steps=5,
+                          dt=60, seed=0):
+    """
+        Run the scaling benchmark and get the results as JSON serializable dict (meta data and one result per case).
+    """
+    results = []
+    for topology in topologies:
+        for n in n_pipes:
+            for sim_mode in sim_modes:
+                results.append(benchmark_case(n, sim_mode, topology=topology, steps=steps, dt=dt, seed=seed))
+
+    return {'meta': _get_meta_data(steps=steps, dt=dt, seed=seed),
+            'results': results}
+
+def benchmark_case(n_pipes, sim_mode, topology='radial', steps=5, dt=60, seed=0):
+    """
+        Benchmark the time steps of a synthetic network with about n_pipes pipes. The first step (initial controller
+        iterations) is reported separately, the mass flow setpoints of the consumers vary in the following steps.
+    """
+    # Build network
+    start = time.perf_counter()
+    dhn_sim = DHNetworkSimulator(logging_enabled=False, collect_stats=True)
+    dhn_sim.load_synthetic_network(n_consumers=get_consumers_for_pipes(n_pipes, topology), topology=topology,
+                                   seed=seed)
+    build_s = time.perf_counter() - start
+
+    controllers = list(dhn_sim.net.controller['object'])
+    setpoints = np.array([c.mdot_set_kg_per_s for c in controllers])
+    variation = 1 + SETPOINT_VARIATION * np.sin(np.arange(steps + 2))
+
+    # Initial step
+    start = time.perf_counter()
+    dhn_sim.run_simulation(0, sim_mode=sim_mode)
+    first_step_s = time.perf_counter() - start
+    first_step_iterations = dhn_sim.last_step_stats['controller_iterations']
+
+    # Time steps with varying setpoints
+    step_s = []
+    iterations = []
+    pipeflow_calls = []
+    for step in range(1, steps + 1):
+        _set_setpoints(controllers, setpoints * variation[step])
+        start = time.perf_counter()
+        dhn_sim.run_simulation(step * dt, sim_mode=sim_mode)
+        step_s.append(time.perf_counter() - start)
+        iterations.append(dhn_sim.last_step_stats['controller_iterations'])
+        pipeflow_calls.append(dhn_sim.last_step_stats['pipeflow_calls'])
+
+    # Peak of the allocated memory within a time step
+    _set_setpoints(controllers, setpoints * variation[steps + 1])
+    tracemalloc.start()
+    dhn_sim.run_simulation((steps + 1) * dt, sim_mode=sim_mode)
+    _, step_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'topology': topology,
+            'sim_mode': sim_mode,
+            'n_pipes': len(dhn_sim.net.pipe),
+            'n_junctions': len(dhn_sim.net.junction),
+            'n_consumers': len(controllers),
+            'build_s': build_s,
+            'first_step_s': first_step_s,
+            'first_step_controller_iterations': first_step_iterations,
+            'step_mean_s': float(np.mean(step_s)),
+            'step_median_s': float(np.median(step_s)),
+            'step_min_s': float(np.min(step_s)),
+            'step_max_s': float(np.max(step_s)),
+            'controller_iterations_mean': float(np.mean(iterations)),
+            'pipeflow_calls_mean': float(np.mean(pipeflow_calls)),
+            'not_converged_steps': dhn_sim.step_stats.not_converged_steps,
+            'step_peak_memory_mib': step_peak / 2**20,
+            'max_rss_mib': _get_max_rss_mib()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scaling benchmark of synthetic district heating networks.')
+    parser.add_argument('--pipes', type=int, nargs='+', default=list(DEFAULT_PIPES))
+    parser.add_argument('--modes', nargs='+', default=list(DEFAULT_SIM_MODES))
+    parser.add_argument('--topologies', nargs='+', default=list(DEFAULT_TOPOLOGIES))
+    parser.add_argument('--steps', type=int, default=5)
+    parser.add_argument('--output', default=None, help='Path of the JSON file (stdout if not given)')
+    args = parser.parse_args(argv)
+
+    results = run_scaling_benchmark(n_pipes=args.pipes, sim_modes=args.modes, topologies=args.topologies,
+                                    steps=args.steps)
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=4)
+    else:
+        with open(args.output, 'w') as fout:
+            json.dump(results, fout, indent=4)
+
+    return results
+
+def _set_setpoints(controllers, setpoints):
+    for c, setpoint in zip(controllers, setpoints):
+        c.mdot_set_kg_per_s = setpoint
+
+def _get_meta_data(**kwargs):
+    try:
+        from importlib.metadata import version
+        package_version = version('dh_network_simulator')
+    except Exception:
+        package_version = None
+
+    return {'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'dh_network_simulator': package_version,
+            'pandapipes': pandapipes.__version__,
+            'numpy': np.__version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            **kwargs}
+
+def _get_max_rss_mib():
+    # Peak resident memory of the process (not available on windows)
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == 'darwin' else rss / 2**10
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+import json
+import pytest
+from dh_network_simulator.test.benchmark.benchmark_import import main
+
+
+def test_import_benchmark(tmp_path):
+    path = tmp_path / 'import.json'
+    main(['--consumers', '5', '20', '--output', str(path)])
+
+    with open(path) as fin:
+        results = json.load(fin)
+
+    # assert machine-readable results of the imported networks
+    assert 'pandapipes' in results['meta'] and 'timestamp' in results['meta']
+    assert [result['n_consumers'] for result in results['results']] == [5, 20]
+    assert [result['n_pipes'] for result in results['results']] == [20, 80]
+    assert [result['n_controllers'] for result in results['results']] == [5, 20]
+    for result in results['results']:
+        assert result['import_s'] > 0 and result['export_s'] > 0
+
+
+if __name__ == '__main__':
+    pytest.main(["test_import_benchmark.py"])
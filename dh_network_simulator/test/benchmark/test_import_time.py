@@ -0,0 +1,60 @@
+import json
+import subprocess
+import sys
+import pytest
+import dh_network_simulator
+from dh_network_simulator.test import test_dir
+
+# Upper limit of the import time of the package on top of its dependencies (regression guard, ~0.05 s measured)
+IMPORT_BUDGET_S = 0.5
+
+# Modules which are only loaded on first use
+LAZY_MODULES = ['dh_network_simulator.timeseries',
+                'dh_network_simulator.sweep',
+                'dh_network_simulator.io.streaming',
+                'simple_pid',
+                'concurrent.futures.process']
+
+# Import of the package in a fresh interpreter, the dependencies are imported first as baseline
+_IMPORT_SCRIPT = """
+import json, sys, time, warnings
+warnings.simplefilter('ignore')
+start = time.perf_counter()
+import pandapipes, pandapower.control
+baseline = time.perf_counter()
+import dh_network_simulator
+end = time.perf_counter()
+print(json.dumps({'dependencies_s': baseline - start, 'package_s': end - baseline, 'modules': list(sys.modules)}))
+"""
+
+
+def measure_import_time(repeat=3):
+    """
+        Measure the cold start import time of the package in fresh interpreters (minimum of the repetitions).
+    """
+    results = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', _IMPORT_SCRIPT], check=True, capture_output=True, text=True,
+                                cwd=test_dir+'/../..').stdout
+        results.append(json.loads(output.splitlines()[-1]))
+
+    return min(results, key=lambda result: result['package_s'])
+
+def test_import_time():
+    result = measure_import_time()
+    print(f"\nImport time: dependencies {result['dependencies_s']:.3f} s, package {result['package_s']:.3f} s")
+
+    # assert
+    assert result['package_s'] < IMPORT_BUDGET_S
+    assert [module for module in LAZY_MODULES if module in result['modules']] == []
+
+def test_lazy_attributes():
+    # assert lazily loaded attributes are imported on first access
+    assert dh_network_simulator.ParameterSweep.__name__ == 'ParameterSweep'
+    assert dh_network_simulator.TimeseriesRunner.__name__ == 'TimeseriesRunner'
+    with pytest.raises(AttributeError):
+        dh_network_simulator.unknown_attribute
+
+
+if __name__ == '__main__':
+    pytest.main(["test_import_time.py", "-s"])
@@ -0,0 +1,25 @@
+import json
+import pytest
+from dh_network_simulator.test.benchmark.benchmark_scaling import main
+
+
+def test_scaling_benchmark(tmp_path):
+    path = tmp_path / 'scaling.json'
+    main(['--pipes', '10', '40', '--modes', 'static', 'dynamic', '--steps', '2', '--output', str(path)])
+
+    with open(path) as fin:
+        results = json.load(fin)
+
+    # assert machine-readable results of all cases
+    assert results['meta']['steps'] == 2
+    assert 'pandapipes' in results['meta'] and 'timestamp' in results['meta']
+    assert len(results['results']) == 4
+    assert [result['n_pipes'] for result in results['results']] == [8, 8, 40, 40]
+    for result in results['results']:
+        assert result['step_min_s'] <= result['step_median_s'] <= result['step_max_s']
+        assert result['step_peak_memory_mib'] > 0
+        assert result['not_converged_steps'] == 0
+
+
+if __name__ == '__main__':
+    pytest.main(["test_scaling_benchmark.py"])
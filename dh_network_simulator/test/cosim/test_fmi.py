@@ -0,0 +1,126 @@
+import xml.etree.ElementTree as ET
+import numpy as np
+import pandas as pd
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.cosim import DHNetworkFMU, build_fmu, read_model_description, simulate_fmu, \
+    write_model_description
+from dh_network_simulator.test import test_dir
+
+# Input variables of the FMU and their profile columns
+INPUT_COLUMNS = {'sink.sink_grid.mdot_kg_per_s': 'mdot_grid_set',
+                 'controller.hex1_ctrl.mdot_set_kg_per_s': 'mdot_cons1_set',
+                 'controller.hex2_ctrl.mdot_set_kg_per_s': 'mdot_cons2_set',
+                 'controller.grid_ctrl.mdot_set_kg_per_s': 'mdot_grid_set'}
+
+# Output variables of the FMU and the profile columns of their expected values
+OUTPUT_COLUMNS = {'valve.grid_v1.mdot_from_kg_per_s': 'mdot_grid_set',
+                  'valve.sub_v1.mdot_from_kg_per_s': 'mdot_cons1_set',
+                  'valve.sub_v2.mdot_from_kg_per_s': 'mdot_cons2_set'}
+
+
+def _load_network():
+    dhn_sim = DHNetworkSimulator(logging_enabled=False)
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    return dhn_sim
+
+def _get_input(profiles, t_range):
+    # Inputs of the FMU (tank flows of the profiles, constant bypass flow)
+    input = pd.DataFrame({name: profiles[column].loc[t_range] for name, column in INPUT_COLUMNS.items()})
+    input['sink.sink_tank.mdot_kg_per_s'] = - profiles['mdot_tank_in_set'].loc[t_range]
+    input['controller.tank_ctrl.mdot_set_kg_per_s'] = - profiles['mdot_tank_in_set'].loc[t_range]
+    input['controller.bypass_ctrl.mdot_set_kg_per_s'] = 0.5
+    input['ext_grid.supply_tank.t_k'] = profiles['T_tank_forward'].loc[t_range] + 273.15
+    input['heat_exchanger.hex1.qext_w'] = profiles['Qdot_cons1'].loc[t_range] * 1000
+    input['heat_exchanger.hex2.qext_w'] = profiles['Qdot_cons2'].loc[t_range] * 1000
+    input['heat_exchanger.hp_evap.qext_w'] = - profiles['Qdot_evap'].loc[t_range] * 1000
+    return input
+
+def test_model_description(tmp_path):
+    dhn_sim = _load_network()
+    fmu = build_fmu(dhn_sim, tmp_path / 'network.fmu', model_name='TestNetwork')
+    model_description = read_model_description(tmp_path / 'network.fmu')
+
+    assert model_description['fmiVersion'] == '2.0'
+    assert model_description['modelName'] == 'TestNetwork'
+    assert model_description['guid'] == fmu.guid
+
+    # assert consecutive value references of the generated variables
+    variables = {variable['name']: variable for variable in model_description['variables']}
+    assert [v['valueReference'] for v in model_description['variables']] == list(range(len(variables)))
+    assert variables['controller.hex1_ctrl.mdot_set_kg_per_s']['causality'] == 'input'
+    assert variables['ext_grid.supply_tank.t_k']['start'] == \
+           dhn_sim.net.ext_grid.set_index('name').at['supply_tank', 't_k']
+    assert variables['heat_exchanger.hex1.qext_w']['unit'] == 'W'
+    assert variables['junction.n1r.t_k']['causality'] == 'output'
+    assert variables['valve.sub_v1.mdot_from_kg_per_s']['unit'] == 'kg/s'
+    assert len([v for v in variables.values() if v['causality'] == 'input']) == \
+           len(dhn_sim.net.controller) + len(dhn_sim.net.heat_exchanger) + len(dhn_sim.net.ext_grid) + \
+           len(dhn_sim.net.sink) + len(dhn_sim.net.source)
+
+def test_model_description_file(tmp_path, monkeypatch):
+    fmu = DHNetworkFMU(_load_network())
+    write_model_description(fmu, tmp_path / 'indent.xml')
+
+    # assert equal files without ET.indent (Python < 3.9)
+    monkeypatch.delattr(ET, 'indent', raising=False)
+    write_model_description(fmu, tmp_path / 'modelDescription.xml')
+    assert (tmp_path / 'modelDescription.xml').read_text() == (tmp_path / 'indent.xml').read_text()
+    assert read_model_description(tmp_path / 'modelDescription.xml')['guid'] == fmu.guid
+
+def test_value_references():
+    dhn_sim = _load_network()
+    fmu = DHNetworkFMU(dhn_sim)
+    fmu.setup_experiment(start_time=0.)
+    fmu.enter_initialization_mode()
+    profiles = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+    input = _get_input(profiles, [0])
+    fmu.set_real(fmu.get_value_references(list(input.columns)), input.values[0])
+    fmu.exit_initialization_mode()
+
+    # assert outputs of arbitrary value reference arrays equal the result tables
+    outputs = [variable for variable in fmu.variables if variable['causality'] == 'output']
+    selected = [outputs[i] for i in np.random.default_rng(0).permutation(len(outputs))[:40]]
+    values = fmu.get_real([variable['valueReference'] for variable in selected])
+    for variable, value in zip(selected, values):
+        table = dhn_sim.net[variable['type']]
+        row = table.index[table['name'] == variable['component']][0]
+        expected = dhn_sim.net['res_' + variable['type']].at[row, variable['parameter']]
+        assert value == pytest.approx(expected, nan_ok=True)
+
+    # assert inputs are written to the component tables and controllers
+    vrs = fmu.get_value_references(['heat_exchanger.hex2.qext_w', 'controller.hex1_ctrl.mdot_set_kg_per_s',
+                                    'heat_exchanger.hex1.qext_w'])
+    fmu.set_real(vrs, [2000., 1.5, 1000.])
+    assert list(dhn_sim.net.heat_exchanger.set_index('name').loc[['hex1', 'hex2'], 'qext_w']) == [1000., 2000.]
+    assert dhn_sim.get_value_of_network_component('controller', 'hex1_ctrl', 'mdot_set_kg_per_s') == 1.5
+    assert list(fmu.get_real(vrs)) == [2000., 1.5, 1000.]
+
+    # assert reset restores the state of the initialization
+    fmu.do_step(0., 60.)
+    fmu.reset()
+    assert fmu.get_real(vrs[:1])[0] != 2000.
+
+    with pytest.raises(KeyError):
+        fmu.get_real([len(fmu.variables)])
+    with pytest.raises(KeyError):
+        DHNetworkFMU(dhn_sim, inputs={'heat_exchanger': ['qext_kw']})
+
+def test_fmu_runner(tmp_path):
+    build_fmu(_load_network(), tmp_path / 'network.fmu', sim_mode='dynamic')
+    profiles = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+    input = _get_input(profiles, range(0, 600, 60))
+
+    results = simulate_fmu(tmp_path / 'network.fmu', start_time=0, stop_time=600, step_size=60, input=input,
+                           output=list(OUTPUT_COLUMNS), logging_enabled=False)
+
+    # assert mass flows of the communication points (inputs are held over the communication steps)
+    assert list(results.index) == list(range(0, 660, 60))
+    for name, column in OUTPUT_COLUMNS.items():
+        expected = profiles[column].loc[range(0, 600, 60)].values
+        assert np.allclose(results[name].values[1:], expected, atol=0.25)
+        assert results[name].values[0] == pytest.approx(expected[0], abs=0.25)
+
+
+if __name__ == '__main__':
+    pytest.main(["test_fmi.py"])
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.cosim import DHNetworkMosaikAdapter
+from dh_network_simulator.test import test_dir
+from dh_network_simulator.test.pipeflow.test_pipeflow import _assert_mass_flows
+
+# Attributes read by the orchestrator in each step
+OUTPUTS = {'Valve-sub_v1': ['mdot_from_kg_per_s', 'p_to_bar'],
+           'Valve-sub_v2': ['mdot_from_kg_per_s', 'p_to_bar'],
+           'HeatExchanger-hex1': ['t_from_k', 't_to_k'],
+           'HeatExchanger-hex2': ['t_from_k', 't_to_k'],
+           'Junction-n1r': ['t_k'],
+           'CtrlValve-hex1_ctrl': ['loss_coeff'],
+           'CtrlValve-hex2_ctrl': ['loss_coeff']}
+
+
+def _run_world(adapter, steps, get_inputs, outputs):
+    """
+        In-process stand-in of the mosaik orchestrator: steps the adapter with the inputs of the time step (one source
+        per attribute) and gets the outputs after each step.
+    """
+    data = []
+    time = steps[0]
+    while time < steps[-1]:
+        inputs = {eid: {attr: {f'profiles-0.{eid}': value} for attr, value in attrs.items()}
+                  for eid, attrs in get_inputs(time).items()}
+        time = adapter.step(time, inputs, max_advance=steps[-1])
+        data.append(adapter.get_data(outputs))
+    return data
+
+def _get_inputs(inputs, time_resolution):
+    def get_inputs(time):
+        row = inputs.loc[time * time_resolution]
+        return {'Sink-sink_grid': {'mdot_kg_per_s': row['mdot_grid_set']},
+                'Sink-sink_tank': {'mdot_kg_per_s': - row['mdot_tank_in_set']},
+                'ExtGrid-supply_tank': {'t_k': row['T_tank_forward'] + 273.15},
+                'HeatExchanger-hex1': {'qext_w': row['Qdot_cons1'] * 1000},
+                'HeatExchanger-hex2': {'qext_w': row['Qdot_cons2'] * 1000},
+                'HeatExchanger-hp_evap': {'qext_w': - row['Qdot_evap'] * 1000},
+                'CtrlValve-bypass_ctrl': {'mdot_set_kg_per_s': 0.5},
+                'CtrlValve-hex1_ctrl': {'mdot_set_kg_per_s': row['mdot_cons1_set']},
+                'CtrlValve-hex2_ctrl': {'mdot_set_kg_per_s': row['mdot_cons2_set']},
+                'CtrlValve-grid_ctrl': {'mdot_set_kg_per_s': row['mdot_grid_set']},
+                'CtrlValve-tank_ctrl': {'mdot_set_kg_per_s': - row['mdot_tank_in_set']}}
+    return get_inputs
+
+def test_mosaik_adapter():
+    adapter = DHNetworkMosaikAdapter()
+    meta = adapter.init('DHNetwork-0', time_resolution=60., network_path=test_dir+'/resources/import/', step_size=1,
+                        sim_mode='dynamic', logging_enabled=False)
+    assert 'mdot_from_kg_per_s' in meta['models']['Valve']['attrs']
+
+    # create entities of the exchanged network components
+    entities = adapter.create(2, 'Sink', names=['sink_grid', 'sink_tank'])
+    entities += adapter.create(1, 'ExtGrid', name='supply_tank')
+    entities += adapter.create(3, 'HeatExchanger', names=['hex1', 'hex2', 'hp_evap'])
+    entities += adapter.create(2, 'Valve', names=['sub_v1', 'sub_v2'])
+    entities += adapter.create(1, 'Junction', name='n1r')
+    entities += adapter.create(5, 'CtrlValve', names=['bypass_ctrl', 'hex1_ctrl', 'hex2_ctrl', 'grid_ctrl',
+                                                      'tank_ctrl'])
+    assert entities[0] == {'eid': 'Sink-sink_grid', 'type': 'Sink'}
+    adapter.setup_done()
+
+    # run the co-simulation
+    inputs = outputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+    data = _run_world(adapter, [0, 10], _get_inputs(inputs, 60), OUTPUTS)
+    adapter.finalize()
+
+    # assert inputs were written and outputs equal the single value getter
+    dhn_sim = adapter.dhn_sim
+    _assert_mass_flows(dhn_sim, outputs, 540)
+    assert dhn_sim.get_value_of_network_component('sink', 'sink_grid', 'mdot_kg_per_s') == \
+           pytest.approx(inputs['mdot_grid_set'].loc[540])
+    for eid, attrs in OUTPUTS.items():
+        type, name = adapter.entities[eid]
+        for attr in attrs:
+            assert data[-1][eid][attr] == dhn_sim.get_value_of_network_component(type, name, attr)
+
+    # assert the exchange layouts were resolved once
+    assert len(data) == 10
+    assert len(adapter.input_plans) == 1 and len(adapter.output_plans) == 1
+
+def test_mosaik_adapter_synthetic_network():
+    dhn_sim = DHNetworkSimulator(logging_enabled=False)
+    dhn_sim.load_synthetic_network(n_consumers=200, seed=0)
+    adapter = DHNetworkMosaikAdapter(dhn_sim)
+    adapter.init('DHNetwork-0', step_size=60)
+
+    # create all substations
+    hex_names = list(dhn_sim.net.heat_exchanger['name'])
+    ctrl_names = [c.name for c in dhn_sim.net.controller['object']]
+    adapter.create(len(hex_names), 'HeatExchanger', names=hex_names)
+    adapter.create(len(ctrl_names), 'CtrlValve', names=ctrl_names)
+    outputs = {**{f'HeatExchanger-{name}': ['qext_w', 'mdot_from_kg_per_s', 't_to_k'] for name in hex_names},
+               **{f'CtrlValve-{name}': ['loss_coeff'] for name in ctrl_names}}
+
+    # set demands of all substations and step
+    qext_w = np.linspace(1000., 5000., len(hex_names))
+    adapter.step(0, {f'HeatExchanger-{name}': {'qext_w': value} for name, value in zip(hex_names, qext_w)})
+    data = adapter.get_data(outputs)
+
+    assert np.allclose([data[f'HeatExchanger-{name}']['qext_w'] for name in hex_names], qext_w)
+    for name in hex_names[::20]:
+        assert data[f'HeatExchanger-{name}']['t_to_k'] == \
+               dhn_sim.get_value_of_network_component('heat_exchanger', name, 't_to_k')
+    for name in ctrl_names[::20]:
+        assert data[f'CtrlValve-{name}']['loss_coeff'] == \
+               dhn_sim.get_value_of_network_component('controller', name, 'loss_coeff')
+
+def test_mosaik_adapter_errors():
+    adapter = DHNetworkMosaikAdapter()
+    adapter.init('DHNetwork-0', network_path=test_dir+'/resources/import/', logging_enabled=False)
+
+    with pytest.raises(ValueError):
+        adapter.create(1, 'Transformer', name='hex1')
+    with pytest.raises(ValueError):
+        adapter.create(2, 'Sink', name='sink_grid')
+    with pytest.raises(KeyError):
+        adapter.create(1, 'Sink', name='missing_sink')
+
+    adapter.create(1, 'Sink', name='sink_grid')
+    with pytest.raises(KeyError):
+        adapter.get_data({'Sink-sink_tank': ['mdot_kg_per_s']})
+    with pytest.raises(KeyError):
+        adapter.get_data({'Sink-sink_grid': ['qext_w']})
+
+def test_mosaik_adapter_boolean_attrs():
+    adapter = DHNetworkMosaikAdapter()
+    adapter.init('DHNetwork-0', network_path=test_dir+'/resources/import/', logging_enabled=False)
+    adapter.create(2, 'Valve', names=['bypass', 'sub_v1'])
+
+    # assert float inputs keep the boolean column of the valve states
+    adapter.set_data({'Valve-bypass': {'opened': {'ctrl-0.bypass': 0.}, 'loss_coefficient': 2.},
+                      'Valve-sub_v1': {'opened': 1.}})
+    valves = adapter.dhn_sim.net.valve.set_index('name')
+    assert adapter.dhn_sim.net.valve['opened'].dtype == bool
+    assert list(valves.loc[['bypass', 'sub_v1'], 'opened']) == [False, True]
+    assert valves.at['bypass', 'loss_coefficient'] == 2.
+    assert adapter.get_data({'Valve-bypass': ['opened']}) == {'Valve-bypass': {'opened': 0.}}
+
+
+if __name__ == '__main__':
+    pytest.main(["test_mosaik_adapter.py"])
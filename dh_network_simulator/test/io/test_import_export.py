@@ -41,6 +41,22 @@ def test_import_json_readable():
     assert_frame_equal(net.ext_grid, test_net.ext_grid)
     assert_frame_equal(net.heat_exchanger, test_net.heat_exchanger)
 
+def test_export_import_json_readable(tmp_path):
+    # create test network
+    test_net = _create_test_network()
+
+    # export and re-import network (json_readable)
+    export_network_components(test_net, path=str(tmp_path)+'/', format='json_readable')
+    net = pp.create_empty_network("net", add_stdtypes=False)
+    pp.create_fluid_from_lib(net, "water", overwrite=True)
+    net = import_network_components(net, path=str(tmp_path)+'/', format='json_readable')
+
+    # assert
+    assert_frame_equal(net.controller.loc[:, net.controller.columns != 'object'],
+                       test_net.controller.loc[:, test_net.controller.columns != 'object'])
+    for table in ['junction', 'junction_geodata', 'pipe', 'valve', 'sink', 'source', 'ext_grid', 'heat_exchanger']:
+        assert_frame_equal(net[table], test_net[table])
+
 #### create pandapipes network ####
 def _create_test_network():
     net = pp.create_empty_network("net", add_stdtypes=False)
@@ -0,0 +1,112 @@
+import os
+import pickle
+import shutil
+import pandapipes as pp
+import pytest
+from pandas._testing import assert_frame_equal
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.test import test_dir
+
+pytest.importorskip('pyarrow')
+import dh_network_simulator.io.network_cache as network_cache
+from dh_network_simulator.io.network_cache import import_network_components_cached, get_cache_key
+
+TABLES = ['junction', 'junction_geodata', 'pipe', 'valve', 'sink', 'source', 'ext_grid', 'heat_exchanger']
+
+
+def _load_network(cache_dir, path=test_dir+'/resources/import/', network_cache=True, **kwargs):
+    dhn_sim = DHNetworkSimulator(network_cache=network_cache, network_cache_dir=str(cache_dir), **kwargs)
+    dhn_sim.load_network(from_file=True, path=path, format='json_readable')
+    return dhn_sim
+
+def test_network_cache(tmp_path):
+    reference = _load_network(tmp_path, network_cache=False)
+    assert not os.listdir(tmp_path)
+
+    # first load writes the cache, second load reads it
+    _load_network(tmp_path)
+    assert os.listdir(tmp_path) == [get_cache_key(test_dir+'/resources/import/')]
+    dhn_sim = _load_network(tmp_path)
+
+    # assert
+    for table in TABLES:
+        assert_frame_equal(dhn_sim.net[table], reference.net[table])
+    assert_frame_equal(dhn_sim.net.controller.drop(columns='object'), reference.net.controller.drop(columns='object'))
+    assert [c.name for c in dhn_sim.net.controller['object']] == [c.name for c in reference.net.controller['object']]
+    assert dhn_sim.net.component_list == reference.net.component_list
+    assert dhn_sim.network_index.names == reference.network_index.names
+    assert dhn_sim.network_index.adjacency == reference.network_index.adjacency
+    assert dhn_sim.network_index.signature == reference.network_index.signature
+    assert dhn_sim.net.junction['pn_bar'].values.flags.writeable
+
+def test_network_cache_disabled(tmp_path, monkeypatch):
+    # assert the cache is opt-in (no cache entries of the default simulator)
+    monkeypatch.setenv('DHNSIM_CACHE_DIR', str(tmp_path))
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    assert not os.listdir(tmp_path)
+
+def test_network_cache_versions(monkeypatch):
+    key = get_cache_key(test_dir+'/resources/import/')
+
+    # assert new cache keys of upgraded dependencies
+    monkeypatch.setattr(pp, '__version__', pp.__version__ + '.dev0')
+    assert get_cache_key(test_dir+'/resources/import/') != key
+
+def test_network_cache_changed_files(tmp_path):
+    path = str(tmp_path / 'network') + '/'
+    shutil.copytree(test_dir+'/resources/import/', path)
+    cache_dir = tmp_path / 'cache'
+    _load_network(cache_dir, path=path)
+
+    # change a component file
+    with open(path + 'heat_exchangers.json') as fin:
+        content = fin.read()
+    with open(path + 'heat_exchangers.json', 'w') as fout:
+        fout.write(content.replace('"hex1"', '"hex_changed"'))
+    dhn_sim = _load_network(cache_dir, path=path)
+
+    # assert new cache entry of the changed files
+    assert len(os.listdir(cache_dir)) == 2
+    assert dhn_sim.network_index.position('heat_exchanger', 'hex_changed') == 0
+
+def test_network_cache_damaged_entry(tmp_path):
+    reference = _load_network(tmp_path, network_cache=False)
+    _load_network(tmp_path)
+    cache_path = tmp_path / get_cache_key(test_dir+'/resources/import/')
+    with open(cache_path / 'pipe.arrow', 'wb') as fout:
+        fout.write(b'damaged')
+
+    # assert import of the network files and a rewritten cache entry
+    dhn_sim = _load_network(tmp_path)
+    for table in TABLES:
+        assert_frame_equal(dhn_sim.net[table], reference.net[table])
+    assert dhn_sim.net.component_list == reference.net.component_list
+    assert len(dhn_sim.net.controller) == len(reference.net.controller)
+    assert os.path.getsize(cache_path / 'pipe.arrow') > len(b'damaged')
+    assert_frame_equal(_load_network(tmp_path).net.pipe, reference.net.pipe)
+
+def test_network_cache_failed_write(tmp_path, monkeypatch):
+    def dump(*args, **kwargs):
+        raise pickle.PicklingError('controller cannot be pickled')
+    monkeypatch.setattr(network_cache.pickle, 'dump', dump)
+
+    # assert the import is kept without cache entries and temporary directories
+    dhn_sim = _load_network(tmp_path)
+    assert len(dhn_sim.net.pipe) > 0 and len(dhn_sim.net.controller) > 0
+    assert not os.listdir(tmp_path)
+
+def test_network_cache_non_empty_network(tmp_path):
+    net = pp.create_empty_network("net", add_stdtypes=False)
+    pp.create_fluid_from_lib(net, "water", overwrite=True)
+    pp.create_junction(net, pn_bar=6, tfluid_k=300, name='existing')
+
+    # assert import without cache
+    net, network_index = import_network_components_cached(net, path=test_dir+'/resources/import/', cache_dir=tmp_path)
+    assert network_index is None
+    assert not os.listdir(tmp_path)
+    assert net.junction['name'].iloc[0] == 'existing'
+
+
+if __name__ == '__main__':
+    pytest.main(["test_network_cache.py"])
@@ -0,0 +1,85 @@
+import os
+import pickle
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+from pandapower.timeseries.data_sources.frame_data import DFData
+from dh_network_simulator.io.profile_data import MemmapProfileData, convert_profiles
+from dh_network_simulator.test import test_dir
+from dh_network_simulator.test.pipeflow.test_timeseries import INPUT_MAP, _init_simulator
+
+
+def _write_profiles(tmp_path, index):
+    profiles = pd.DataFrame({f'building{i}': np.arange(len(index)) * (i + 1.) for i in range(5)}, index=index)
+    path = tmp_path / 'profiles.csv'
+    profiles.to_csv(path)
+    return path, profiles
+
+@pytest.mark.parametrize('index', [[0, 60, 120, 180, 240], [0, 60, 180, 200, 600]])
+def test_profile_data(tmp_path, index):
+    path, profiles = _write_profiles(tmp_path, index)
+    data_source = MemmapProfileData.from_csv(path, chunksize=2)
+    reference = DFData(pd.read_csv(path, index_col=0))
+
+    # assert values equal to DFData
+    for t in index:
+        for name in profiles.columns:
+            assert data_source.get_time_step_value(t, name) == reference.get_time_step_value(t, name)
+    assert np.array_equal(data_source.get_time_step_value(index[2], ['building4', 'building0'], scale_factor=2),
+                          [2 * 2 * 5., 2 * 2 * 1.])
+    assert data_source.get_time_steps_len() == len(index)
+    assert isinstance(data_source.values.base, np.memmap)
+    with pytest.raises(KeyError):
+        data_source.get_time_step_value(30, 'building0')
+    with pytest.raises(KeyError):
+        data_source.get_time_step_value(0, 'unknown')
+
+def test_profile_data_interpolation(tmp_path):
+    path, _ = _write_profiles(tmp_path, [0, 60, 180])
+    data_source = MemmapProfileData.from_csv(path, interpolate=True)
+
+    # assert
+    assert data_source.get_time_step_value(30, 'building1') == pytest.approx(1.)
+    assert data_source.get_time_step_value(120, 'building1') == pytest.approx(3.)
+    assert data_source.get_time_step_value(180, 'building1') == pytest.approx(4.)
+    with pytest.raises(KeyError):
+        data_source.get_time_step_value(240, 'building1')
+
+def test_profile_data_conversion(tmp_path):
+    path, profiles = _write_profiles(tmp_path, [0, 60, 120])
+    converted = convert_profiles(path)
+    mtime = os.path.getmtime(os.path.join(converted, 'values.npy'))
+
+    # assert conversion is reused and pickled data sources are mapped again
+    assert convert_profiles(path) == converted
+    assert os.path.getmtime(os.path.join(converted, 'values.npy')) == mtime
+    data_source = pickle.loads(pickle.dumps(MemmapProfileData(converted)))
+    assert isinstance(data_source.values.base, np.memmap)
+    assert len(pickle.dumps(data_source)) < 1000
+    assert np.array_equal(data_source.to_frame().values, profiles.values)
+
+    # assert changed csv file is converted again
+    (profiles * 2).to_csv(path)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+    assert MemmapProfileData.from_csv(path).get_time_step_value(60, 'building0') == 2.
+
+def test_profile_data_controller(tmp_path):
+    dhn_sim = _init_simulator()
+    path = shutil.copy(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', tmp_path)
+    data_source = dhn_sim.load_data(path, memory_map=True)
+    ctrl = dhn_sim.net.controller['object'].iloc[dhn_sim.network_index.position('controller', 'hex1_ctrl')]
+    ctrl.data_source = data_source
+    ctrl.profile_name = 'mdot_cons1_set'
+
+    # assert setpoint of the profile
+    ctrl.time_step(dhn_sim.net, 60)
+    assert ctrl.mdot_set_kg_per_s == pd.read_csv(path, index_col=0).at[60, 'mdot_cons1_set']
+
+    # assert time series of memory mapped profiles
+    results = dhn_sim.run_timeseries(data_source, INPUT_MAP, [('junction', 'n5s', 't_k')], t_range=[0, 60])
+    assert results['n5s.t_k'].between(273.15, 373.15).all()
+
+
+if __name__ == '__main__':
+    pytest.main(["test_profile_data.py"])
@@ -0,0 +1,107 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.test import test_dir
+from dh_network_simulator.test.pipeflow.test_pipeflow import _init_network_controls
+from dh_network_simulator.test.pipeflow.test_results_recorder import _create_junction_network
+
+pytest.importorskip('pyarrow')
+from dh_network_simulator.io.streaming import StreamingResultsWriter, read_results
+
+
+@pytest.mark.parametrize('format', ['parquet', 'arrow'])
+def test_streaming_chunks(tmp_path, format):
+    net, index = _create_junction_network(n_junctions=500)
+    path = tmp_path / f'results.{format}'
+    writer = StreamingResultsWriter(path, [('junction', None, 'p_bar')], format=format, chunk_size=64, max_queue=2)
+    writer.resolve(net, index)
+
+    with writer:
+        for t in range(1000):
+            net.res_junction['p_bar'] = np.arange(len(net.junction)) + t
+            writer.record(net, t, index=index)
+            # assert flat memory use (buffer of one chunk)
+            assert writer.capacity == 64
+
+    table = read_results(path)
+
+    # assert
+    assert writer.rows_written == 1000
+    assert writer.chunks_written == 16
+    assert table.num_rows == 1000
+    assert table.column_names[:2] == ['time', 'j0.p_bar']
+    assert np.array_equal(table.column('time').to_numpy(), np.arange(1000))
+    assert np.array_equal(table.column('j499.p_bar').to_numpy(), np.arange(1000) + 499)
+    with pytest.raises(ValueError):
+        writer.record(net, 1000, index=index)
+
+def test_streaming_simulation(tmp_path):
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+    path = tmp_path / 'results.parquet'
+    writer = dhn_sim.attach_recorder(StreamingResultsWriter(path, [('junction', None, 't_k'),
+                                                                   ('valve', None, ['mdot_from_kg_per_s', 'v_mean_m_per_s'])],
+                                                            chunk_size=2))
+
+    for t in range(0, 60*3, 60):
+        _init_network_controls(dhn_sim, inputs, t)
+        dhn_sim.run_simulation(t, sim_mode='static')
+    writer.close()
+
+    results = read_results(path, columns=['time', 'sub_v1.mdot_from_kg_per_s']).to_pandas()
+
+    # assert
+    assert list(results['time']) == [0, 60, 120]
+    assert results['sub_v1.mdot_from_kg_per_s'].iloc[-1] == \
+           dhn_sim.get_value_of_network_component(type='valve', name='sub_v1', parameter='mdot_from_kg_per_s')
+
+def test_writer_error(tmp_path):
+    net, index = _create_junction_network(n_junctions=10)
+    writer = StreamingResultsWriter(tmp_path / 'missing' / 'results.arrow', [('junction', None, 'p_bar')],
+                                    format='arrow', chunk_size=1)
+    writer.resolve(net, index)
+    writer.record(net, 0, index=index)
+
+    # assert errors of the writer thread are raised in the simulation thread
+    with pytest.raises(OSError):
+        for t in range(1, 10):
+            writer.record(net, t, index=index)
+        writer.close()
+
+def test_close_after_writer_error(tmp_path):
+    net, index = _create_junction_network(n_junctions=10)
+    writer = StreamingResultsWriter(tmp_path / 'missing' / 'results.arrow', [('junction', None, 'p_bar')],
+                                    format='arrow', chunk_size=2)
+    writer.resolve(net, index)
+    writer.record(net, 0, index=index)
+    writer.flush()
+    while writer.error is None:
+        time.sleep(0.01)
+
+    # remaining time step recorded before the error of the writer thread is raised
+    error, writer.error = writer.error, None
+    writer.record(net, 1, index=index)
+    writer.error = error
+
+    # assert the writer thread is finished although the remaining time step raises the pending error
+    with pytest.raises(OSError):
+        writer.close()
+    assert writer.closed
+    assert not writer.thread.is_alive()
+
+    # assert errors of the with block are kept
+    writer = StreamingResultsWriter(tmp_path / 'missing' / 'results.arrow', [('junction', None, 'p_bar')],
+                                    format='arrow', chunk_size=1)
+    writer.resolve(net, index)
+    with pytest.raises(RuntimeError):
+        with writer:
+            writer.record(net, 0, index=index)
+            raise RuntimeError('simulation failed')
+    assert not writer.thread.is_alive()
+
+
+if __name__ == '__main__':
+    pytest.main(["test_streaming.py"])
@@ -0,0 +1,49 @@
+import copy
+import numpy as np
+import pandas as pd
+import pandapipes as pp
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.test import test_dir
+from dh_network_simulator.test.pipeflow.test_pipeflow import _init_network_controls
+
+
+def test_fused_step_equals_full_pipeflow():
+    dhn_sim = DHNetworkSimulator(fused_step=True)
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+
+    for t in range(0, 60*3, 60):
+        _init_network_controls(dhn_sim, inputs, t)
+        dhn_sim.run_simulation(t, sim_mode='static')
+
+        # Recalculate the time step by a full hydraulic and heat transfer solve
+        net = copy.deepcopy(dhn_sim.net)
+        pp.pipeflow(net, transient=False, mode="all", max_iter=100, heat_transfer=True)
+
+        # assert
+        for key, column in [('res_junction', 't_k'), ('res_pipe', 't_to_k'), ('res_pipe', 'mdot_from_kg_per_s'),
+                            ('res_heat_exchanger', 't_to_k'), ('res_heat_exchanger', 'mdot_from_kg_per_s')]:
+            assert np.allclose(dhn_sim.net[key][column], net[key][column])
+
+def test_saved_pipeflow_solves():
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+    saved = {}
+    for name, kwargs in [('default', {}), ('fused', {'fused_step': True}), ('sparse', {'static_engine': 'sparse'})]:
+        dhn_sim = DHNetworkSimulator(collect_stats=True, **kwargs)
+        dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+        _init_network_controls(dhn_sim, inputs, 0)
+        dhn_sim.run_simulation(0, sim_mode='static')
+        stats = dhn_sim.pipeflow_stats
+
+        # assert controller iterations are counted as hydraulic solves
+        assert stats['control_solves'] > 0
+        assert stats['hydraulic_solves'] >= stats['control_solves']
+        saved[name] = stats['saved_solves']
+
+    # assert
+    assert saved == {'default': 0, 'fused': 1, 'sparse': 2}
+
+
+if __name__ == '__main__':
+    pytest.main(["test_fused_step.py"])
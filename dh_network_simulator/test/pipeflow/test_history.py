@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.history import HistoryBuffer
+from dh_network_simulator.test import test_dir
+from dh_network_simulator.test.pipeflow.test_pipeflow import _init_network_controls
+
+
+def test_interp_equals_numpy():
+    # fill buffer beyond its capacity to wrap around
+    history = HistoryBuffer(names=['j1', 'j2'], capacity=5)
+    ts = np.arange(0, 8 * 60, 60)
+    values = np.vstack([np.sin(ts / 100), np.cos(ts / 100)])
+    for i, t in enumerate(ts):
+        history.append(t, values[:, i])
+
+    # assert stored time steps and interpolation incl. clamping outside the stored range
+    assert len(history) == 5
+    assert [t for t, _ in history.to_records('j1')] == ts[-5:].tolist()
+    delayed_t = np.array([0, 150, 180, 200.5, 310, 419, 420, 1000])
+    for row in range(2):
+        expected = np.interp(delayed_t, ts[-5:], values[row, -5:])
+        assert history.interp(np.full(len(delayed_t), row), delayed_t) == pytest.approx(expected)
+
+def test_append_discards_newer_time_steps():
+    history = HistoryBuffer(names=['j1'], capacity=4)
+    for t in [0, 60, 120]:
+        history.append(t, [t])
+
+    # repeated time step replaces the stored values
+    history.append(60, [-1])
+    assert history.to_records('j1') == [(0, 0), (60, -1)]
+
+def test_fit_horizon():
+    history = HistoryBuffer(names=['j1'], capacity=4, max_horizon_s=3600)
+    for t in range(0, 4 * 60, 60):
+        history.append(t, [t])
+
+    # grow to the required horizon and keep chronological order
+    history.fit_horizon(600)
+    assert history.capacity >= 600 / 60 + 2
+    assert [t for t, _ in history.to_records('j1')] == [0, 60, 120, 180]
+
+    # horizon is limited by the maximum horizon
+    history.fit_horizon(1e9)
+    assert history.capacity == 3600 / 60 + 2
+
+def test_bounded_history_of_dynamic_simulation():
+    dhn_sim = DHNetworkSimulator(history_max_horizon_s=30 * 60)
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+
+    for t in range(0, 60*60, 60):
+        _init_network_controls(dhn_sim, inputs, t)
+        dhn_sim.run_simulation(t, sim_mode='dynamic')
+
+    # assert history is bounded by the maximum horizon
+    history = dhn_sim.historical_data['junction']['t_k']
+    assert history.capacity <= 30 + 2
+    assert history.values.shape == (len(dhn_sim.net.junction), history.capacity)
+    assert history.to_records('n1s')[-1][0] == 60*59
+
+
+if __name__ == '__main__':
+    pytest.main(["test_history.py"])
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.constants import ISOBARIC_SPECIFIC_HEAT_WATER
+from dh_network_simulator.incidence import JunctionIncidence, mix_temperatures, hex_return_temperatures
+from dh_network_simulator.pipe_ordering import PipeFlowOrder
+from dh_network_simulator.test import test_dir
+
+
+def _init_incidence():
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    order = PipeFlowOrder().update(dhn_sim.net, dhn_sim.network_index)
+    incidence = JunctionIncidence().update(order, n_junctions=len(dhn_sim.net.junction))
+
+    return dhn_sim, order, incidence
+
+def test_mix_equals_adjacency():
+    dhn_sim, order, incidence = _init_incidence()
+    net, index = dhn_sim.net, dhn_sim.network_index
+
+    for j in range(len(net.junction)):
+        # incoming pipes of the junction and of junctions connected via opened valves
+        conn_j = [j] + [net.valve.at[v, 'from_junction'] for v in index.connected('valve', j, side='to')
+                        if net.valve.at[v, 'opened']]
+        pipes_in = sorted(set([p for c in conn_j for p in index.connected('pipe', c, side='to')]))
+
+        # assert
+        assert incidence.mix[j].indices.tolist() == pipes_in
+
+    # assert batch mix of all junctions
+    mdot = np.arange(1., len(net.pipe) + 1)
+    t_outlet = np.full(len(net.pipe), 350.)
+    t_mix = mix_temperatures(incidence.mix, mdot, t_outlet)
+    connected = np.asarray(incidence.mix.sum(axis=1)).ravel() > 0
+    assert np.allclose(t_mix[connected], 350.)
+    assert np.isnan(t_mix[~connected]).all()
+
+def test_hex_return_temperatures():
+    dhn_sim, order, incidence = _init_incidence()
+    net = dhn_sim.net
+    t_junction = np.linspace(330., 350., len(net.junction))
+    qext_w = net.heat_exchanger['qext_w'].values
+    mdot = np.full(len(net.heat_exchanger), 0.5)
+
+    forward_temp, return_temp = hex_return_temperatures(incidence.hex_in, t_junction, qext_w, mdot)
+
+    # assert
+    assert np.allclose(forward_temp, t_junction[net.heat_exchanger['from_junction'].values])
+    assert np.allclose(return_temp, forward_temp - qext_w / (ISOBARIC_SPECIFIC_HEAT_WATER * mdot))
+
+def test_rebuild_on_valve_state():
+    dhn_sim, order, incidence = _init_incidence()
+    n_junctions = len(dhn_sim.net.junction)
+
+    # assert reuse of unchanged pipe order
+    incidence.update(order.update(dhn_sim.net, dhn_sim.network_index), n_junctions)
+    assert incidence.build_count == 1
+
+    # assert rebuild after a valve state change
+    dhn_sim.set_value_of_network_component(type='valve', name='bypass', parameter='opened', value=False)
+    incidence.update(order.update(dhn_sim.net, dhn_sim.network_index), n_junctions)
+    assert incidence.build_count == 2
+    assert incidence.valve.nnz == len(order.valve_ids)
+
+
+if __name__ == '__main__':
+    pytest.main(["test_incidence.py"])
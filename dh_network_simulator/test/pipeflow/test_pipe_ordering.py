@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pandapipes as pp
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.network_index import NetworkIndex
+from dh_network_simulator.pipe_ordering import PipeFlowOrder, get_pipe_levels
+from dh_network_simulator.test import test_dir
+from dh_network_simulator.test.pipeflow.test_pipeflow import _init_network_controls
+
+
+def _create_line_network(reversed_pipe=False):
+    # ext_grid -> j0 -> j1 -> j2 -> sink (optionally with the second pipe defined against the flow)
+    net = pp.create_empty_network(fluid='water')
+    j = [pp.create_junction(net, pn_bar=5, tfluid_k=350, name=f'j{i}') for i in range(3)]
+    pp.create_ext_grid(net, junction=j[0], p_bar=5, t_k=350, name='grid')
+    pp.create_pipe_from_parameters(net, j[0], j[1], length_km=0.1, diameter_m=0.1, name='p0')
+    if reversed_pipe:
+        pp.create_pipe_from_parameters(net, j[2], j[1], length_km=0.1, diameter_m=0.1, name='p1')
+    else:
+        pp.create_pipe_from_parameters(net, j[1], j[2], length_km=0.1, diameter_m=0.1, name='p1')
+    pp.create_sink(net, junction=j[2], mdot_kg_per_s=1, name='sink')
+    pp.pipeflow(net, mode='hydraulics')
+
+    return net
+
+def test_order_reuse_across_steps():
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+
+    for t in range(0, 60*5, 60):
+        _init_network_controls(dhn_sim, inputs, t)
+        dhn_sim.run_simulation(t, sim_mode='dynamic')
+
+    # assert order is built once and reused in all following steps (unchanged flow directions)
+    assert dhn_sim.pipe_flow_order.stats() == {'build_count': 1, 'reuse_count': 4}
+    assert dhn_sim.pipe_flow_order.cycles == []
+
+def test_reference_engine_uses_order():
+    dhn_sim = DHNetworkSimulator(dynamic_engine='reference')
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+
+    for t in range(0, 60*3, 60):
+        _init_network_controls(dhn_sim, inputs, t)
+        dhn_sim.run_simulation(t, sim_mode='dynamic')
+
+    # assert
+    assert dhn_sim.thermal_kernel is None
+    assert dhn_sim.pipe_flow_order.stats() == {'build_count': 1, 'reuse_count': 2}
+
+def test_rebuild_on_flow_reversal():
+    net = _create_line_network()
+    index = NetworkIndex(net)
+    order = PipeFlowOrder().update(net, index)
+    assert order.build_count == 1
+
+    # assert rebuild if the sign of a mass flow changes
+    net.res_pipe.loc[1, 'mdot_from_kg_per_s'] *= -1
+    order.update(net, index)
+    assert order.build_count == 2
+    assert order.pipe_direction.tolist() == [1, -1]
+
+    # assert reuse if nothing has changed
+    order.update(net, index)
+    assert order.stats() == {'build_count': 2, 'reuse_count': 1}
+
+def test_reversed_pipe_inlet_outlet():
+    net = _create_line_network(reversed_pipe=True)
+    order = PipeFlowOrder().update(net, NetworkIndex(net))
+
+    # assert inlet/outlet junctions follow the flow direction and not the from/to definition
+    assert net.res_pipe['mdot_from_kg_per_s'].values[1] < 0
+    assert order.pipe_direction.tolist() == [1, -1]
+    assert order.pipe_inlet.tolist() == [0, 1]
+    assert order.pipe_outlet.tolist() == [1, 2]
+    assert [level.tolist() for level in order.levels] == [[0], [1]]
+
+def test_cycle_detection(caplog):
+    # pipes 0 -> 1 -> 2 -> 0 form a loop, pipe 3 leaves it
+    levels, cyclic_pipes = get_pipe_levels(n_junctions=4,
+                                           pipe_from=np.array([0, 1, 2, 2]),
+                                           pipe_to=np.array([1, 2, 0, 3]),
+                                           link_from=np.array([], dtype=np.int64),
+                                           link_to=np.array([], dtype=np.int64))
+    # assert
+    assert levels == []
+    assert cyclic_pipes.tolist() == [0, 1, 2, 3]
+
+    # assert loop is appended successively (sorted by the inlet pressures) and reported
+    net = _create_line_network()
+    pp.create_pipe_from_parameters(net, 2, 0, length_km=0.1, diameter_m=0.1, name='p2')
+    net.res_pipe = pd.DataFrame({'mdot_from_kg_per_s': [1., 1., 1.],
+                                 'p_from_bar': [5., 4., 3.],
+                                 'p_to_bar': [4., 3., 2.]})
+    order = PipeFlowOrder().update(net, NetworkIndex(net))
+    assert order.cycles == ['p0', 'p1', 'p2']
+    assert all([len(level) == 1 for level in order.levels])
+    assert 'FlowLoopDetected' in caplog.text
+
+
+if __name__ == '__main__':
+    pytest.main(["test_pipe_ordering.py"])
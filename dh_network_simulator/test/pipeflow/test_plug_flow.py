@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pandapipes as pp
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.constants import ISOBARIC_SPECIFIC_HEAT_WATER
+from dh_network_simulator.network_index import NetworkIndex
+from dh_network_simulator.plug_flow import PlugFlowKernel, advance_parcels
+from dh_network_simulator.test import test_dir
+from dh_network_simulator.test.pipeflow.test_pipeflow import _init_network_controls
+
+
+def test_advance_parcels():
+    mass = np.array([[2., 2., 2., 2.], [2., 2., 2., 2.]])
+    temp = np.array([[80., 70., 60., 50.], [80., 70., 60., 50.]])
+
+    # assert pure transport of half a parcel and of more than the pipe content
+    mass_new, temp_new, t_out = advance_parcels(mass, temp, m_in=np.array([1., 10.]), t_in=np.array([90., 90.]))
+    assert t_out.tolist() == [50., (8 * 65. + 2 * 90.) / 10]
+    assert mass_new.shape == (2, 4)
+    assert mass_new.sum(axis=1).tolist() == [8., 8.]
+    assert np.sum(mass_new * temp_new, axis=1)[0] == 1 * 90 + 2 * (80 + 70 + 60) + 1 * 50
+    assert np.all(temp_new[1][mass_new[1] > 0] == 90.)
+
+    # assert outlet temperature without inflow
+    _, _, t_out = advance_parcels(mass, temp, m_in=np.array([0., 0.]), t_in=np.array([90., 90.]))
+    assert t_out.tolist() == [50., 50.]
+
+def test_steady_state_equals_static_temperature_drop():
+    net = pp.create_empty_network(fluid='water')
+    j = [pp.create_junction(net, pn_bar=5, tfluid_k=350, name=f'j{i}') for i in range(2)]
+    pp.create_ext_grid(net, junction=j[0], p_bar=5, t_k=350, name='grid')
+    pp.create_pipe_from_parameters(net, j[0], j[1], length_km=0.5, diameter_m=0.1, alpha_w_per_m2k=10, text_k=280,
+                                   name='p0')
+    pp.create_sink(net, junction=j[1], mdot_kg_per_s=2, name='sink')
+    pp.pipeflow(net, mode='hydraulics')
+    net.res_junction['t_k'] = 350.
+
+    # run until the pipe content is exchanged several times
+    kernel = PlugFlowKernel(net, index=NetworkIndex(net), n_parcels=64)
+    for t in range(0, 3600 * 3, 30):
+        kernel.run(net, historical_data=None, t=t)
+
+    # assert
+    mdot = net.res_pipe.at[0, 'mdot_from_kg_per_s']
+    t_static = 280 + 70 * np.exp(- 10 * np.pi * 0.1 * 500 / (ISOBARIC_SPECIFIC_HEAT_WATER * mdot))
+    assert net.res_pipe.at[0, 't_to_k'] == pytest.approx(t_static, abs=1e-3)
+    assert net.res_junction.at[1, 't_k'] == pytest.approx(t_static, abs=1e-3)
+    assert kernel.mass.shape == (1, 64)
+
+def test_plugflow_mode():
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+
+    for t in range(0, 60*5, 60):
+        _init_network_controls(dhn_sim, inputs, t)
+        dhn_sim.run_simulation(t, sim_mode='plugflow')
+
+    # assert bounded parcel state and no historical data
+    kernel = dhn_sim.plug_flow_kernel
+    assert kernel.mass.shape == (len(dhn_sim.net.pipe), dhn_sim.plugflow_parcels)
+    assert len(dhn_sim.historical_data['junction']['t_k']) == 0
+    assert dhn_sim.net.res_junction['t_k'].notna().all()
+
+    # assert recalculation of the latest time step starts from the previous state
+    t_k = dhn_sim.net.res_junction['t_k'].copy()
+    mass = kernel.mass.copy()
+    dhn_sim.run_simulation(t, sim_mode='plugflow')
+    assert np.allclose(dhn_sim.net.res_junction['t_k'], t_k)
+    assert np.allclose(kernel.mass, mass)
+
+
+if __name__ == '__main__':
+    pytest.main(["test_plug_flow.py"])
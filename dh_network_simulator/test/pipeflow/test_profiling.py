@@ -0,0 +1,88 @@
+import gc
+import os
+import pickle
+import pstats
+import weakref
+import pandas as pd
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.profiling import SimulationProfiler
+from dh_network_simulator.test import test_dir
+from dh_network_simulator.test.pipeflow.test_pipeflow import _init_network_controls
+
+
+def test_profiling_window(tmp_path):
+    path = tmp_path / 'profile' / 'dhnsim'
+    dhn_sim = DHNetworkSimulator(profile_path=str(path), profile_steps=(1, 3))
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+    for t in range(0, 60*4, 60):
+        _init_network_controls(dhn_sim, inputs, t)
+        dhn_sim.run_simulation(t, sim_mode='dynamic')
+
+    # assert profiled steps of the window
+    assert dhn_sim.profiler.steps == 4
+    assert dhn_sim.profiler.steps_profiled == 2
+    assert dhn_sim.profiler.written
+
+    # assert cProfile stats
+    stats = pstats.Stats(str(path) + '.prof')
+    functions = [function for _, _, function in stats.stats]
+    assert functions.count('run_hydraulic_control') == 1
+    assert stats.stats[[key for key in stats.stats if key[2] == '_run_simulation_step'][0]][0] == 2
+
+    # assert collapsed stacks (root frame run_simulation)
+    with open(str(path) + '.collapsed') as fin:
+        lines = fin.read().splitlines()
+    assert len(lines) > 0
+    for line in lines:
+        stack, count = line.rsplit(' ', 1)
+        assert stack.startswith('run_simulation (dh_network_simulator.py:')
+        assert int(count) > 0
+
+def test_profiling_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv('DHNSIM_PROFILE', str(tmp_path / 'env'))
+    monkeypatch.setenv('DHNSIM_PROFILE_STEPS', '2:5')
+    dhn_sim = DHNetworkSimulator()
+
+    # assert
+    assert dhn_sim.profiler.path == str(tmp_path / 'env')
+    assert (dhn_sim.profiler.start, dhn_sim.profiler.stop) == (2, 5)
+
+    # assert copies of the profiler (e.g. in worker processes) write into their own files
+    copy = pickle.loads(pickle.dumps(dhn_sim.profiler))
+    assert copy.path.startswith(f"{tmp_path / 'env'}-{os.getpid()}-")
+    assert copy.steps_profiled == 0
+    assert pickle.loads(pickle.dumps(dhn_sim.profiler)).path != copy.path
+
+def test_profiling_close(tmp_path):
+    profiler = SimulationProfiler(tmp_path / 'open', start=0, stop=None)
+    dhn_sim = DHNetworkSimulator(logging_enabled=False)
+    dhn_sim.profiler = profiler
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+    _init_network_controls(dhn_sim, inputs, 0)
+    dhn_sim.run_simulation(0, sim_mode='static')
+
+    # assert open-ended windows are written by close()
+    assert not profiler.written
+    profiler.close()
+    assert profiler.written and os.path.isfile(str(tmp_path / 'open') + '.collapsed')
+
+    # assert profilers are not kept alive by the atexit hook
+    reference = weakref.ref(profiler)
+    del dhn_sim, profiler
+    gc.collect()
+    assert reference() is None
+
+def test_profiling_disabled(monkeypatch):
+    monkeypatch.delenv('DHNSIM_PROFILE', raising=False)
+    dhn_sim = DHNetworkSimulator()
+
+    # assert
+    assert dhn_sim.profiler is None
+    assert SimulationProfiler.from_env() is None
+
+
+if __name__ == '__main__':
+    pytest.main(["test_profiling.py"])
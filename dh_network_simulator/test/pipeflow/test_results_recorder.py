@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pandapipes as pp
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.network_index import NetworkIndex
+from dh_network_simulator.results_recorder import ResultsRecorder
+from dh_network_simulator.test import test_dir
+from dh_network_simulator.test.pipeflow.test_pipeflow import _init_network_controls
+
+
+def test_record_simulation():
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+    recorder = dhn_sim.attach_recorder([('junction', None, 't_k'),
+                                        ('valve', ['sub_v1', 'sub_v2'], 'mdot_from_kg_per_s')])
+
+    expected = []
+    for t in range(0, 60*3, 60):
+        _init_network_controls(dhn_sim, inputs, t)
+        dhn_sim.run_simulation(t, sim_mode='dynamic')
+        expected.append(dhn_sim.get_value_of_network_component(type='valve', name='sub_v2',
+                                                               parameter='mdot_from_kg_per_s'))
+
+    results = recorder.to_frame()
+
+    # assert
+    assert list(results.index) == [0, 60, 120]
+    assert len(results.columns) == len(dhn_sim.net.junction) + 2
+    assert np.array_equal(results['sub_v2.mdot_from_kg_per_s'].values, expected)
+    assert np.array_equal(results.filter(like='.t_k').values[-1], dhn_sim.net.res_junction['t_k'].values)
+
+def test_growth_and_query():
+    net, index = _create_junction_network(n_junctions=10000)
+    recorder = ResultsRecorder([('junction', None, 'p_bar')], horizon=4, chunk_size=3)
+    recorder.resolve(net, index)
+
+    for t in range(0, 600, 60):
+        net.res_junction['p_bar'] = np.arange(len(net.junction)) + t
+        recorder.record(net, t, index=index)
+
+    # assert growth in chunks
+    assert recorder.size == 10
+    assert recorder.capacity == 10
+    assert recorder.to_frame().shape == (10, 10000)
+
+    # assert time range queries without copies
+    results = recorder.query(t_start=120, t_end=240)
+    assert list(results.index) == [120, 180, 240]
+    assert np.array_equal(results['j9999.p_bar'].values, [9999 + 120, 9999 + 180, 9999 + 240])
+    assert np.shares_memory(results.values, recorder.values)
+
+    with pytest.raises(ValueError):
+        recorder.record(net, 0, index=index)
+
+def _create_junction_network(n_junctions):
+    net = pp.create_empty_network(fluid='water')
+    pp.create_junctions(net, n_junctions, pn_bar=5, tfluid_k=350, name=[f'j{i}' for i in range(n_junctions)])
+    net['res_junction'] = pd.DataFrame({'p_bar': np.zeros(n_junctions)}, index=net.junction.index)
+    return net, NetworkIndex(net)
+
+
+if __name__ == '__main__':
+    pytest.main(["test_results_recorder.py"])
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas._testing import assert_frame_equal
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.test import test_dir
+from dh_network_simulator.test.pipeflow.test_pipeflow import _init_network_controls, _assert_mass_flows
+
+
+def _run_steps(dhn_sim, inputs, steps, sim_mode):
+    for t in steps:
+        _init_network_controls(dhn_sim, inputs, t)
+        dhn_sim.run_simulation(t, sim_mode=sim_mode)
+
+@pytest.mark.parametrize('sim_mode', ['dynamic', 'plugflow'])
+def test_snapshot_restore(sim_mode):
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = outputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+    _run_steps(dhn_sim, inputs, range(0, 600, 60), sim_mode)
+
+    # take snapshot before the time step
+    token = dhn_sim.snapshot()
+    res_junction = dhn_sim.net.res_junction.copy()
+    loss_coeff = [c.loss_coeff for c in dhn_sim.net.controller['object']]
+    history = dhn_sim.historical_data['junction']['t_k'].to_records('n1r')
+
+    # first try of the time step, then rollback
+    _run_steps(dhn_sim, inputs, [600, 660], sim_mode)
+    first_try = dhn_sim.net.res_junction.copy()
+    dhn_sim.restore(token)
+
+    # assert restored state
+    assert_frame_equal(dhn_sim.net.res_junction, res_junction)
+    assert [c.loss_coeff for c in dhn_sim.net.controller['object']] == loss_coeff
+    assert dhn_sim.historical_data['junction']['t_k'].to_records('n1r') == history
+
+    # assert retried time steps equal the first try
+    _run_steps(dhn_sim, inputs, [600, 660], sim_mode)
+    _assert_mass_flows(dhn_sim, outputs, 660)
+    assert np.allclose(dhn_sim.net.res_junction['t_k'], first_try['t_k'], atol=0.5)
+
+    # assert snapshot can be restored again
+    dhn_sim.restore(token)
+    assert_frame_equal(dhn_sim.net.res_junction, res_junction)
+
+def test_snapshot_eviction():
+    dhn_sim = DHNetworkSimulator(max_snapshots=2)
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    tokens = [dhn_sim.snapshot() for _ in range(3)]
+
+    # assert oldest snapshot is evicted
+    assert len(dhn_sim.snapshots) == 2
+    assert tokens[0] not in dhn_sim.snapshots
+    with pytest.raises(KeyError):
+        dhn_sim.restore(tokens[0])
+    dhn_sim.restore(tokens[2])
+
+def test_snapshot_topology_change():
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    token = dhn_sim.snapshot()
+    n_junctions = len(dhn_sim.net.junction)
+
+    # add component after the snapshot
+    dhn_sim.net.junction.loc[n_junctions] = dhn_sim.net.junction.iloc[0]
+    dhn_sim.net.junction.at[n_junctions, 'name'] = 'added'
+    dhn_sim.restore(token)
+
+    # assert restored tables and topology index
+    assert len(dhn_sim.net.junction) == n_junctions
+    with pytest.raises(KeyError):
+        dhn_sim.network_index.position('junction', 'added')
+
+
+if __name__ == '__main__':
+    pytest.main(["test_snapshot.py"])
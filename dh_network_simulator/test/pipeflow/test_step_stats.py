@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.step_stats import STEP_PHASES
+from dh_network_simulator.test import test_dir
+from dh_network_simulator.test.pipeflow.test_pipeflow import _init_network_controls
+
+
+@pytest.mark.parametrize('sim_mode', ['static', 'dynamic'])
+def test_step_stats(sim_mode):
+    dhn_sim = DHNetworkSimulator(collect_stats=True)
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+    control_solves = 0
+    for t in range(0, 60*3, 60):
+        _init_network_controls(dhn_sim, inputs, t)
+        dhn_sim.run_simulation(t, sim_mode=sim_mode)
+        control_solves += dhn_sim.pipeflow_stats['control_solves']
+
+    stats = dhn_sim.last_step_stats
+    totals = dhn_sim.step_stats.to_dict()
+
+    # assert stats of the latest step
+    assert stats['t'] == 120
+    assert stats['not_converged'] == []
+    assert stats['control_solves'] == dhn_sim.pipeflow_stats['control_solves']
+    assert stats['controller_iterations'] == stats['control_solves'] - 1
+    assert all([stats[f'time_{phase}_s'] >= 0 for phase in STEP_PHASES])
+    assert stats['time_control_s'] > 0
+    assert stats['time_step_s'] >= sum([stats[f'time_{phase}_s'] for phase in STEP_PHASES])
+    if sim_mode == 'static':
+        assert stats['pipeflow_calls'] == stats['control_solves'] + 1
+        assert stats['time_hydraulic_s'] > 0
+    else:
+        assert stats['pipeflow_calls'] == stats['control_solves']
+        assert stats['time_thermal_s'] > 0 and stats['time_enqueue_s'] > 0
+
+    # assert cumulative counters
+    assert totals['steps'] == 3
+    assert totals['control_solves'] == control_solves
+    assert totals['not_converged'] == {}
+    frame = dhn_sim.step_stats.to_frame()
+    assert list(frame.index) == ['last', 'total', 'mean']
+    assert frame.at['mean', 'control_solves'] == pytest.approx(control_solves / 3)
+
+def test_not_converged_controllers():
+    dhn_sim = DHNetworkSimulator(logging_enabled=False, collect_stats=True)
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+    _init_network_controls(dhn_sim, inputs, 0)
+    dhn_sim.set_value_of_network_component(type='controller', name='hex1_ctrl', parameter='tol', value=0)
+    dhn_sim.run_simulation(0, sim_mode='static')
+
+    # assert
+    assert dhn_sim.last_step_stats['not_converged'] == ['hex1_ctrl']
+    assert dhn_sim.step_stats.not_converged == {'hex1_ctrl': 1}
+    assert dhn_sim.step_stats.not_converged_steps == 1
+
+def test_disabled_step_stats():
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+    _init_network_controls(dhn_sim, inputs, 0)
+    dhn_sim.run_simulation(0, sim_mode='static')
+
+    # assert
+    assert dhn_sim.last_step_stats == {}
+    assert dhn_sim.step_stats.steps == 0
+    # assert plain controller iterations (not counted) followed by the temperature flow solve
+    assert dhn_sim.pipeflow_stats['control_solves'] == 0
+    assert dhn_sim.pipeflow_stats['hydraulic_solves'] == 1
+
+
+if __name__ == '__main__':
+    pytest.main(["test_step_stats.py"])
@@ -0,0 +1,79 @@
+import os
+import numpy as np
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.profiling import SimulationProfiler
+from dh_network_simulator.sweep import ParameterSweep, apply_scenario
+from dh_network_simulator.test import test_dir
+from dh_network_simulator.test.pipeflow.test_timeseries import INPUT_MAP, OUTPUTS, _init_simulator
+
+PROFILES = test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv'
+
+
+def test_sweep_scenarios():
+    dhn_sim = _init_simulator()
+    t_range = range(0, 60*3, 60)
+    scenarios = [{},
+                 {'parameters': {('controller', 'hex1_ctrl', 'tol'): 0.2,
+                                 ('controller', 'hex1_ctrl', 'gain'): -2000}},
+                 {'profiles': {'Qdot_cons1': 1.2}}]
+
+    results = dhn_sim.run_sweep(scenarios, PROFILES, INPUT_MAP, OUTPUTS, t_range=t_range, max_workers=2)
+
+    # assert results of the scenarios (mass flows within the controller tolerances)
+    profiles = dhn_sim.load_data(PROFILES).df
+    mdot_set = profiles['mdot_cons1_set'].loc[t_range].values
+    assert len(results) == 3
+    assert list(results[0].columns) == list(OUTPUTS)
+    assert np.allclose(results[0]['mdot_cons1'], mdot_set, atol=0.1)
+    assert np.allclose(results[1]['mdot_cons1'], mdot_set, atol=0.2)
+    assert np.allclose(results[2]['mdot_cons1'], mdot_set, atol=0.1)
+
+    # assert the network of the simulator is unchanged
+    assert dhn_sim.get_value_of_network_component(type='controller', name='hex1_ctrl', parameter='gain') != -2000
+
+def test_persistent_workers():
+    dhn_sim = _init_simulator()
+    scenarios = [{'profiles': {'Qdot_cons1': factor}} for factor in [0.5, 1., 1.5, 2.]]
+
+    with ParameterSweep(dhn_sim, PROFILES, INPUT_MAP, [('junction', 'n5r', 't_k')], t_range=[0], max_workers=2) as sweep:
+        results = sweep.run(scenarios)
+        pids = set([stats['pid'] for stats in sweep.stats])
+        results_repeated = sweep.run(scenarios[:1])
+
+        # assert the workers are reused
+        assert 1 <= len(pids) <= 2
+        assert sweep.stats[0]['pid'] in pids
+
+    # assert higher heat demands lead to lower return temperatures
+    t_return = [result['n5r.t_k'].iloc[0] for result in results]
+    assert np.all(np.diff(t_return) < 0)
+    assert results_repeated[0]['n5r.t_k'].iloc[0] == pytest.approx(t_return[0], abs=0.1)
+
+def test_sweep_profiling(tmp_path):
+    dhn_sim = _init_simulator()
+    dhn_sim.profiler = SimulationProfiler(tmp_path / 'sweep')
+    scenarios = [{'profiles': {'Qdot_cons1': factor}} for factor in [0.5, 1.5]]
+    dhn_sim.run_sweep(scenarios, PROFILES, INPUT_MAP, OUTPUTS, t_range=[0], max_workers=1)
+
+    # assert open-ended windows of the workers are written into one file per scenario
+    assert len([name for name in os.listdir(tmp_path) if name.endswith('.collapsed')]) == len(scenarios)
+
+def test_apply_scenario():
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    profiles = dhn_sim.load_data(PROFILES).df
+
+    scaled = apply_scenario(dhn_sim, profiles, {'parameters': {('controller', 'grid_ctrl', 'gain'): -500},
+                                                'profiles': {'Qdot_evap': 2.}})
+
+    # assert
+    assert dhn_sim.net.controller.at[dhn_sim.network_index.position('controller', 'grid_ctrl'), 'object'].pid.Kp == -500
+    assert np.allclose(scaled['Qdot_evap'], 2 * profiles['Qdot_evap'])
+    assert np.array_equal(scaled['Qdot_cons1'], profiles['Qdot_cons1'])
+    with pytest.raises(KeyError):
+        apply_scenario(dhn_sim, profiles, {'profiles': {'unknown': 2.}})
+
+
+if __name__ == '__main__':
+    pytest.main(["test_sweep.py"])
@@ -0,0 +1,65 @@
+import copy
+import pandas as pd
+import pytest
+from pandas._testing import assert_series_equal
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.dh_network_simulator_core import _dynamic_temp_flow_sim
+from dh_network_simulator.thermal_kernel import DynamicThermalKernel
+from dh_network_simulator.test import test_dir
+from dh_network_simulator.test.pipeflow.test_pipeflow import _init_network_controls
+
+
+def test_vectorized_equals_reference_engine():
+    dhn_sim = DHNetworkSimulator(dynamic_engine='reference')
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+
+    for t in range(0, 60*10, 60):
+        _init_network_controls(dhn_sim, inputs, t)
+        dhn_sim.run_simulation(t, sim_mode='dynamic')
+
+        # Recalculate the time step by the reference and vectorized engine
+        ref_net = copy.deepcopy(dhn_sim.net)
+        vec_net = copy.deepcopy(dhn_sim.net)
+        _dynamic_temp_flow_sim(ref_net, historical_data=dhn_sim.historical_data, t=t, index=dhn_sim.network_index)
+        kernel = DynamicThermalKernel(vec_net, index=dhn_sim.network_index)
+        kernel.run(vec_net, historical_data=dhn_sim.historical_data, t=t)
+
+        # assert
+        assert_series_equal(vec_net.res_junction['t_k'], ref_net.res_junction['t_k'])
+        assert_series_equal(vec_net.res_pipe['t_from_k'], ref_net.res_pipe['t_from_k'])
+        assert_series_equal(vec_net.res_pipe['t_to_k'], ref_net.res_pipe['t_to_k'])
+        assert_series_equal(vec_net.res_heat_exchanger['t_to_k'], ref_net.res_heat_exchanger['t_to_k'])
+
+def test_pipe_levels():
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    kernel = DynamicThermalKernel(dhn_sim.net, index=dhn_sim.network_index)
+    pipes = dhn_sim.net.pipe['name'].values
+    level_of = {pipes[p]: i for i, level in enumerate(kernel.levels) for p in level}
+
+    # assert all pipes are assigned to exactly one level
+    assert sorted(level_of) == sorted(pipes)
+
+    # assert pipe order from heat injection towards the consumers
+    assert level_of['l1s'] < level_of['l2s'] < level_of['l3s']
+    assert level_of['l1s_tank'] < level_of['l2s'] < level_of['l4s'] < level_of['l6s']
+    assert level_of['l3s'] < level_of['l3r'] < level_of['l2r'] < level_of['l1r']
+
+def test_kernel_rebuild_on_valve_state():
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    kernel = DynamicThermalKernel(dhn_sim.net, index=dhn_sim.network_index)
+
+    kernel.refresh(dhn_sim.net, index=dhn_sim.network_index)
+    assert kernel.order.build_count == 1
+
+    dhn_sim.set_value_of_network_component(type='valve', name='bypass', parameter='opened', value=False)
+    kernel.refresh(dhn_sim.net, index=dhn_sim.network_index)
+    assert kernel.build_count == 1
+    assert kernel.order.build_count == 2
+    assert kernel.order_build_count == 2
+
+
+if __name__ == '__main__':
+    pytest.main(["test_thermal_kernel.py"])
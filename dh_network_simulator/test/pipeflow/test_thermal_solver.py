@@ -0,0 +1,118 @@
+import copy
+import numpy as np
+import pandas as pd
+import pandapipes as pp
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.constants import ISOBARIC_SPECIFIC_HEAT_WATER
+from dh_network_simulator.network_index import NetworkIndex
+from dh_network_simulator.thermal_solver import ThermalNetworkSolver
+from dh_network_simulator.test import test_dir
+from dh_network_simulator.test.pipeflow.test_pipeflow import _init_network_controls
+
+
+def _create_ring_network():
+    # ext_grid -> j0 -> ring (j1 -> j2 -> j3 -> j1) with two consumers and a heat exchanger inside the ring
+    net = pp.create_empty_network(fluid='water')
+    j = [pp.create_junction(net, pn_bar=5, tfluid_k=350, name=f'j{i}') for i in range(5)]
+    pp.create_ext_grid(net, junction=j[0], p_bar=5, t_k=350, name='grid')
+    pipe_args = dict(length_km=0.5, diameter_m=0.1, alpha_w_per_m2k=10, text_k=280)
+    pp.create_pipe_from_parameters(net, j[0], j[1], name='p0', **pipe_args)
+    pp.create_pipe_from_parameters(net, j[1], j[2], name='p1', **pipe_args)
+    pp.create_pipe_from_parameters(net, j[2], j[3], name='p2', **pipe_args)
+    pp.create_pipe_from_parameters(net, j[3], j[1], name='p3', **pipe_args)
+    pp.create_pipe_from_parameters(net, j[1], j[4], name='p4', **pipe_args)
+    pp.create_heat_exchanger(net, j[4], j[3], diameter_m=0.1, qext_w=50000, name='hex')
+    pp.create_sink(net, junction=j[2], mdot_kg_per_s=1, name='sink2')
+    pp.create_sink(net, junction=j[3], mdot_kg_per_s=2, name='sink3')
+
+    return net
+
+def test_meshed_network_equals_pandapipes():
+    net = _create_ring_network()
+    pp.pipeflow(net, mode='all')
+    t_pandapipes = net.res_junction['t_k'].values.copy()
+
+    # Recalculate temperatures by the sparse solver based on the hydraulic results
+    pp.pipeflow(net, mode='hydraulics')
+    solver = ThermalNetworkSolver()
+    solver.solve(net, index=NetworkIndex(net))
+
+    # assert (deviations due to the pipe discretization of pandapipes)
+    assert np.allclose(net.res_junction['t_k'].values, t_pandapipes, atol=0.2)
+
+def test_flow_loop_equals_fixed_point():
+    # circulating flow j1 -> j2 -> j3 -> j1 fed by j0 (hydraulic results are given)
+    net = _create_ring_network()
+    pp.pipeflow(net, mode='hydraulics')
+    net.res_pipe['mdot_from_kg_per_s'] = [1., 3., 3., 2., 0.]
+    net.res_heat_exchanger['mdot_from_kg_per_s'] = [0.]
+    solver = ThermalNetworkSolver()
+    t_junction = solver.solve(net, index=NetworkIndex(net))
+
+    # Successive pipe sweeps until convergence
+    decay = np.exp(- 10 * np.pi * 0.1 * 500 / (ISOBARIC_SPECIFIC_HEAT_WATER * np.array([1., 3., 3., 2.])))
+    t = np.full(4, 350.)
+    for _ in range(200):
+        t_out = 280 + (t[[0, 1, 2, 3]] - 280) * decay
+        t[1] = (1 * t_out[0] + 2 * t_out[3]) / 3
+        t[2] = t_out[1]
+        t[3] = t_out[2]
+
+    # assert
+    assert sorted(solver.order.cycles) == ['p1', 'p2', 'p3', 'p4']
+    assert np.allclose(t_junction[:4], t)
+
+def test_static_mode_equals_pandapipes():
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+
+    for t in range(0, 60*3, 60):
+        _init_network_controls(dhn_sim, inputs, t)
+        dhn_sim.run_simulation(t, sim_mode='static')
+
+        # Recalculate the temperatures of the time step by the sparse solver
+        net = copy.deepcopy(dhn_sim.net)
+        ThermalNetworkSolver().solve(net, index=dhn_sim.network_index)
+
+        # assert
+        assert np.allclose(net.res_junction['t_k'], dhn_sim.net.res_junction['t_k'], atol=0.1)
+        assert np.allclose(net.res_heat_exchanger['t_to_k'], dhn_sim.net.res_heat_exchanger['t_to_k'], atol=0.1)
+
+def test_sparse_static_engine():
+    dhn_sim = DHNetworkSimulator(static_engine='sparse')
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv', index_col=[0])
+
+    for t in range(0, 60*3, 60):
+        _init_network_controls(dhn_sim, inputs, t)
+        dhn_sim.run_simulation(t, sim_mode='static')
+
+    # assert
+    assert dhn_sim.thermal_solver.stats()['solve_count'] == 3
+    assert dhn_sim.net.res_junction['t_k'].notna().all()
+
+def test_factorization_reuse():
+    net = _create_ring_network()
+    pp.pipeflow(net, mode='hydraulics')
+    index = NetworkIndex(net)
+    solver = ThermalNetworkSolver()
+    t_before = solver.solve(net, index=index).copy()
+
+    # assert reuse of the factorization for unchanged mass flows
+    net.heat_exchanger.at[0, 'qext_w'] = 100000
+    t_after = solver.solve(net, index=index)
+    assert solver.stats() == {'factorization_count': 1, 'solve_count': 2}
+    assert t_after[4] == t_before[4]
+    assert t_after[3] < t_before[3]
+
+    # assert new factorization for changed mass flows
+    net.sink.at[0, 'mdot_kg_per_s'] = 1.5
+    pp.pipeflow(net, mode='hydraulics')
+    solver.solve(net, index=index)
+    assert solver.stats() == {'factorization_count': 2, 'solve_count': 3}
+
+
+if __name__ == '__main__':
+    pytest.main(["test_thermal_solver.py"])
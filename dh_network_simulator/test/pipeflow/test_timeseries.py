@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.test import test_dir
+
+# Input map equal to _init_network_controls of test_pipeflow.py
+INPUT_MAP = {
+    'mdot_grid_set': [('sink', 'sink_grid', 'mdot_kg_per_s'),
+                      ('controller', 'grid_ctrl', 'mdot_set_kg_per_s')],
+    'mdot_cons1_set': ('controller', 'hex1_ctrl', 'mdot_set_kg_per_s'),
+    'mdot_cons2_set': ('controller', 'hex2_ctrl', 'mdot_set_kg_per_s'),
+    'mdot_tank_in_set': [('sink', 'sink_tank', 'mdot_kg_per_s', 'negate'),
+                         ('controller', 'tank_ctrl', 'mdot_set_kg_per_s', 'negate')],
+    'T_tank_forward': ('ext_grid', 'supply_tank', 't_k', 'degC_to_K'),
+    'Qdot_cons1': ('heat_exchanger', 'hex1', 'qext_w', 'kW_to_W'),
+    'Qdot_cons2': ('heat_exchanger', 'hex2', 'qext_w', 'kW_to_W'),
+    'Qdot_evap': ('heat_exchanger', 'hp_evap', 'qext_w', 'kW_to_W'),
+}
+
+OUTPUTS = {
+    'mdot_grid': ('valve', 'grid_v1', 'mdot_from_kg_per_s'),
+    'mdot_tank': ('valve', 'tank_v1', 'mdot_from_kg_per_s'),
+    'mdot_cons1': ('valve', 'sub_v1', 'mdot_from_kg_per_s'),
+    'mdot_cons2': ('valve', 'sub_v2', 'mdot_from_kg_per_s'),
+    'T_supply_cons1': ('junction', 'n5s', 't_k'),
+    'loss_coeff_cons1': ('controller', 'hex1_ctrl', 'loss_coeff'),
+}
+
+
+def _init_simulator():
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir+'/resources/import/', format='json_readable')
+    dhn_sim.set_value_of_network_component(name='bypass_ctrl', type='controller', parameter='mdot_set_kg_per_s',
+                                           value=0.5)
+    return dhn_sim
+
+def test_run_timeseries():
+    dhn_sim = _init_simulator()
+    profiles = dhn_sim.load_data(test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv')
+    t_range = range(0, 60*10, 60)
+
+    results = dhn_sim.run_timeseries(profiles, INPUT_MAP, OUTPUTS, t_range=t_range, sim_mode='dynamic')
+    outputs = profiles.df
+
+    # assert inputs of the last time step
+    hex_id = dhn_sim.network_index.position('heat_exchanger', 'hp_evap')
+    assert dhn_sim.net.heat_exchanger.at[hex_id, 'qext_w'] == pytest.approx(outputs['Qdot_evap'].loc[540] * 1000)
+    assert dhn_sim.get_value_of_network_component(name='tank_ctrl', type='controller', parameter='mdot_set_kg_per_s') == \
+           pytest.approx(- outputs['mdot_tank_in_set'].loc[540])
+
+    # assert outputs (mass flows within the controller tolerances)
+    assert list(results.index) == list(t_range)
+    assert list(results.columns) == list(OUTPUTS)
+    assert results.notna().all().all()
+    for name, ctrl in [('mdot_grid', 'grid_ctrl'), ('mdot_cons1', 'hex1_ctrl'), ('mdot_cons2', 'hex2_ctrl')]:
+        tol = dhn_sim.get_value_of_network_component(type='controller', name=ctrl, parameter='tol')
+        assert np.allclose(results[name], outputs[name + '_set'].loc[t_range], atol=tol)
+    tol = dhn_sim.get_value_of_network_component(type='controller', name='tank_ctrl', parameter='tol')
+    assert np.allclose(- results['mdot_tank'], outputs['mdot_tank_in_set'].loc[t_range], atol=tol)
+    assert results['loss_coeff_cons1'].iloc[-1] == \
+           dhn_sim.get_value_of_network_component(name='hex1_ctrl', type='controller', parameter='loss_coeff')
+
+def test_run_timeseries_from_csv():
+    dhn_sim = _init_simulator()
+    path = test_dir+'/resources/pipeflow/dynamic-pipeflow-results.csv'
+
+    results = dhn_sim.run_timeseries(path, INPUT_MAP, [('junction', 'n5s', 't_k')], t_range=[0, 60])
+
+    # assert
+    assert list(results.columns) == ['n5s.t_k']
+    assert results['n5s.t_k'].between(273.15, 373.15).all()
+
+def test_unresolved_inputs():
+    dhn_sim = _init_simulator()
+    profiles = pd.DataFrame({'Qdot': [1., 2.]}, index=[0, 60])
+
+    # assert errors before the first time step
+    with pytest.raises(KeyError):
+        dhn_sim.run_timeseries(profiles, {'Qdot': ('heat_exchanger', 'unknown', 'qext_w')}, [])
+    with pytest.raises(KeyError):
+        dhn_sim.run_timeseries(profiles, {'Qdot': ('heat_exchanger', 'hex1', 'qext_w', 'unknown')}, [])
+    with pytest.raises(KeyError):
+        dhn_sim.run_timeseries(profiles, {'Qdot': ('heat_exchanger', 'hex1', 'qext_w')}, [], t_range=[120])
+
+
+if __name__ == '__main__':
+    pytest.main(["test_timeseries.py"])
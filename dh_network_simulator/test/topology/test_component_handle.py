@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pandapipes as pp
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.test import test_dir
+from dh_network_simulator.test.pipeflow.test_pipeflow import _init_network_controls
+
+
+def test_get_set_values():
+    dhn_sim = _load_test_network()
+    names = ['hex2', 'hp_evap', 'hex1']
+    handle = dhn_sim.resolve(type='heat_exchanger', names=names, parameters='qext_w')
+
+    dhn_sim.set_values(handle, np.array([2000., 3000., 1000.]))
+
+    # assert values equal the single getter/setter
+    for name, value in zip(names, [2000., 3000., 1000.]):
+        h_id = dhn_sim.network_index.position('heat_exchanger', name)
+        assert dhn_sim.net.heat_exchanger.at[h_id, 'qext_w'] == value
+    assert np.array_equal(dhn_sim.get_values(handle), [2000., 3000., 1000.])
+
+    # assert result parameters after the simulation
+    handle = dhn_sim.resolve(type='valve', names=['sub_v1', 'grid_v1'],
+                             parameters=['mdot_from_kg_per_s', 'v_mean_m_per_s'])
+    inputs = pd.read_csv(test_dir+'/resources/pipeflow/static-pipeflow-results.csv', index_col=[0])
+    _init_network_controls(dhn_sim, inputs, 0)
+    dhn_sim.run_simulation(0, sim_mode='static')
+    values = dhn_sim.get_values(handle)
+    assert not np.isnan(values).any()
+    assert values[0] == dhn_sim.get_value_of_network_component(type='valve', name='sub_v1',
+                                                                parameter='mdot_from_kg_per_s')
+    assert values[1] == dhn_sim.get_value_of_network_component(type='valve', name='grid_v1',
+                                                                parameter='v_mean_m_per_s')
+
+def test_controller_values():
+    dhn_sim = _load_test_network()
+    names = ['hex1_ctrl', 'hex2_ctrl', 'grid_ctrl']
+    handle = dhn_sim.resolve(type='controller', names=names, parameters='mdot_set_kg_per_s')
+
+    dhn_sim.set_values(handle, [1.5, 2.5, 4.])
+
+    # assert
+    for name, value in zip(names, [1.5, 2.5, 4.]):
+        assert dhn_sim.get_value_of_network_component(type='controller', name=name,
+                                                      parameter='mdot_set_kg_per_s') == value
+    assert np.array_equal(dhn_sim.get_values(handle), [1.5, 2.5, 4.])
+
+def test_handle_refresh():
+    dhn_sim = _load_test_network()
+    handle = dhn_sim.resolve(type='pipe', names=['l1s'], parameters='length_km')
+    length = dhn_sim.get_values(handle)[0]
+
+    # assert the handle is resolved again after a topology change
+    net = dhn_sim.net
+    l1s = dhn_sim.network_index.position('pipe', 'l1s')
+    pp.create_pipe_from_parameters(net, from_junction=0, to_junction=1, length_km=0.01, diameter_m=0.1, name='l0',
+                                   index=-1)
+    net.pipe.sort_index(inplace=True)
+    assert dhn_sim.get_values(handle)[0] == length
+    assert net.pipe.at[l1s, 'length_km'] == length
+
+    with pytest.raises(KeyError):
+        dhn_sim.resolve(type='pipe', names=['unknown_pipe'], parameters='length_km')
+    with pytest.raises(ValueError):
+        dhn_sim.resolve(type='pipe', names=['l1s'], parameters=['length_km', 'diameter_m'])
+
+def _load_test_network():
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir + '/resources/import/', format='json_readable')
+    return dhn_sim
+
+
+if __name__ == '__main__':
+    pytest.main(["test_component_handle.py"])
@@ -0,0 +1,60 @@
+import json
+import numpy as np
+import pandapipes as pp
+import pytest
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.component_models import CtrlValve
+from dh_network_simulator.network_generator import create_synthetic_network, get_consumers_for_pipes
+
+
+def _create_empty_network():
+    net = pp.create_empty_network("net", add_stdtypes=False)
+    pp.create_fluid_from_lib(net, "water", overwrite=True)
+    return net
+
+@pytest.mark.parametrize('topology', ['radial', 'meshed'])
+def test_synthetic_network(topology):
+    n_consumers = 9
+    net = create_synthetic_network(_create_empty_network(), n_consumers, topology=topology, seed=1)
+
+    # assert components of the test network
+    assert len(net.valve) == len(net.heat_exchanger) == len(net.controller) == n_consumers
+    assert all([isinstance(c, CtrlValve) for c in net.controller['object']])
+    assert list(net.ext_grid['type']) == ['pt', 'p']
+    assert len(net.sink) == len(net.source) == 1
+    assert len(net.junction) == 2 + 5 * n_consumers
+    assert net.junction['name'].is_unique and net.pipe['name'].is_unique
+    if topology == 'radial':
+        assert len(net.pipe) == 4 * n_consumers
+    else:
+        assert len(net.pipe) > 4 * n_consumers
+    assert abs(len(net.pipe) - 4 * get_consumers_for_pipes(len(net.pipe), topology)) <= 2 * n_consumers
+
+    # assert controllers can be exported (json_readable)
+    assert json.dumps([c.to_json() for c in net.controller['object']])
+
+@pytest.mark.parametrize('topology', ['radial', 'meshed'])
+def test_synthetic_network_simulation(topology):
+    dhn_sim = DHNetworkSimulator(collect_stats=True)
+    dhn_sim.load_synthetic_network(n_consumers=6, topology=topology, seed=2)
+    dhn_sim.run_simulation(0, sim_mode='static')
+    dhn_sim.run_simulation(60, sim_mode='dynamic')
+
+    # assert mass flows within the controller tolerances and the cooled return flow
+    mdot = dhn_sim.net.res_valve['mdot_from_kg_per_s'].values
+    mdot_set = np.array([c.mdot_set_kg_per_s for c in dhn_sim.net.controller['object']])
+    tol = np.array([c.tol for c in dhn_sim.net.controller['object']])
+    assert dhn_sim.last_step_stats['not_converged'] == []
+    assert np.all(np.abs(mdot - mdot_set) <= tol)
+    t_return = dhn_sim.get_value_of_network_component(type='junction', name='n0r', parameter='t_k')
+    assert 310 < t_return < 325
+
+def test_synthetic_network_errors():
+    with pytest.raises(ValueError):
+        create_synthetic_network(_create_empty_network(), 5, topology='ring')
+    with pytest.raises(ValueError):
+        create_synthetic_network(_create_empty_network(), 0)
+
+
+if __name__ == '__main__':
+    pytest.main(["test_network_generator.py"])
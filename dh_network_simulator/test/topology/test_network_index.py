@@ -0,0 +1,97 @@
+import pytest
+import pandapipes as pp
+from dh_network_simulator import DHNetworkSimulator
+from dh_network_simulator.dh_network_simulator_core import get_value_of, set_value_of
+from dh_network_simulator.network_index import NetworkIndex
+from dh_network_simulator.test import test_dir
+
+
+def test_name_lookups():
+    dhn_sim = _load_test_network()
+    net = dhn_sim.net
+    index = dhn_sim.network_index
+
+    # assert positions equal the linear search by name
+    for key in ['junction', 'pipe', 'valve', 'heat_exchanger', 'sink', 'source', 'ext_grid']:
+        for name in net[key]['name']:
+            assert index.position(key, name) == net[key]['name'].to_list().index(name)
+
+    controllers = [c.name for c in net.controller['object']]
+    for name in controllers:
+        assert index.position('controller', name) == controllers.index(name)
+
+    with pytest.raises(KeyError):
+        index.position('pipe', 'unknown_pipe')
+    with pytest.raises(ValueError, match="Component 'unknown_pipe' of type 'pipe' cannot be found."):
+        index.position('pipe', 'unknown_pipe')
+
+def test_junction_adjacency():
+    dhn_sim = _load_test_network()
+    net = dhn_sim.net
+    index = dhn_sim.network_index
+
+    # assert connected branches of junction n4s
+    j_id = index.position('junction', 'n4s')
+    pipes_from = net.pipe.index[net.pipe['from_junction'] == j_id].to_list()
+    pipes_to = net.pipe.index[net.pipe['to_junction'] == j_id].to_list()
+    assert index.connected('pipe', j_id, side='from') == pipes_from
+    assert index.connected('pipe', j_id, side='to') == pipes_to
+
+    # assert valve and heat exchanger of substation 1
+    j_id = index.position('junction', 'n5s')
+    assert index.connected('valve', j_id, side='to') == [index.position('valve', 'sub_v1')]
+    assert index.connected('heat_exchanger', j_id, side='from') == [index.position('heat_exchanger', 'hex1')]
+
+def test_index_refresh():
+    dhn_sim = _load_test_network()
+    net = dhn_sim.net
+    index = dhn_sim.network_index
+    build_count = index.build_count
+
+    # unchanged topology does not rebuild the index
+    index.refresh(net)
+    assert index.build_count == build_count
+
+    # new pipe invalidates the index
+    j = net.junction['name'].to_list()
+    pp.create_pipe_from_parameters(net, from_junction=j.index('n8s'), to_junction=j.index('n8r'), length_km=0.01,
+                                   diameter_m=0.1, name="l7", type='pipe')
+    index.refresh(net, deep=False)
+    assert index.build_count == build_count + 1
+    assert index.position('pipe', 'l7') == len(net.pipe) - 1
+
+    # renamed component invalidates the index (deep check)
+    net.pipe.at[0, 'name'] = 'l1s_renamed'
+    index.refresh(net)
+    assert index.position('pipe', 'l1s_renamed') == 0
+
+def test_default_index():
+    dhn_sim = DHNetworkSimulator()
+    assert isinstance(dhn_sim.network_index, NetworkIndex)
+    assert dhn_sim.network_index.names['pipe'] == {}
+
+def test_unknown_component_names():
+    dhn_sim = _load_test_network()
+    net = dhn_sim.net
+
+    # assert equal exception types of the indexed and of the linear name search
+    for index in [dhn_sim.network_index, None]:
+        with pytest.raises(ValueError):
+            get_value_of(net.pipe, 'unknown_pipe', 'pipe', 'length_km', net.pipe, index=index)
+        with pytest.raises(ValueError):
+            set_value_of(net.pipe, 'unknown_pipe', 'pipe', 'length_km', 1., index=index)
+        with pytest.raises(ValueError):
+            get_value_of(net.controller, 'unknown_ctrl', 'controller', 'gain', None, index=index)
+    with pytest.raises(ValueError):
+        dhn_sim.get_value_of_network_component(type='controller', name='unknown_ctrl', parameter='gain')
+    with pytest.raises(ValueError):
+        dhn_sim.set_value_of_network_component(type='sink', name='unknown_sink', parameter='mdot_kg_per_s', value=1.)
+
+def _load_test_network():
+    dhn_sim = DHNetworkSimulator()
+    dhn_sim.load_network(from_file=True, path=test_dir + '/resources/import/', format='json_readable')
+    return dhn_sim
+
+
+if __name__ == '__main__':
+    pytest.main(["test_network_index.py"])
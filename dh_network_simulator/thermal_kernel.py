@@ -0,0 +1,195 @@
+import numpy as np
+from .constants import ISOBARIC_SPECIFIC_HEAT_WATER
+from .pipe_ordering import PipeFlowOrder, _get_table
+from .incidence import JunctionIncidence, mix_temperatures, hex_return_temperatures
+
+
+class DynamicThermalKernel():
+    """
+        Vectorized dynamic temperature flow simulation of the network pipes.
+
+        The pipes are grouped into topological levels along the flow direction (PipeFlowOrder). Each level is
+        computed in one NumPy pass based on the static per-pipe coefficients, followed by the mass flow weighted
+        temperature mixing at the connected junctions and the return temperatures of the connected heat exchangers
+        (sparse mat-vec products of the JunctionIncidence).
+        For forward flows the results are equal to the successive per-pipe calculation of _dynamic_temp_flow_sim_of().
+    """
+
+    def __init__(self, net=None, index=None, order=None):
+        self.build_count = 0
+        self.index_build_count = None
+        self.order = order if order is not None else PipeFlowOrder()
+        self.incidence = JunctionIncidence()
+
+        # Build kernel immediately if a network is given (otherwise on the first refresh)
+        if net is not None:
+            self.refresh(net, index)
+
+    def __repr__(self):
+        return f'DynamicThermalKernel(builds={self.build_count}, levels={len(self.levels)})'
+
+    @property
+    def levels(self):
+        return self.order.levels
+
+    def build(self, net, index):
+        """
+            Precompute the static pipe coefficients and the junction connections of the pipe levels.
+        """
+        self.index_build_count = index.build_count
+
+        self.junction_ids = net.junction.index.values
+        self.pipe_ids = net.pipe.index.values
+        self.hex_ids = _get_table(net, 'heat_exchanger').index.values
+
+        # Static per-pipe coefficients
+        pipe = net.pipe
+        self.length_m = pipe['length_km'].values.astype(np.float64) * 1000
+        self.loss_coeff = pipe['alpha_w_per_m2k'].values * np.pi * pipe['diameter_m'].values  # Heat loss coefficient in [W/mK]
+        self.decay_coeff = self.loss_coeff * self.length_m / ISOBARIC_SPECIFIC_HEAT_WATER
+        self.text_k = pipe['text_k'].values.astype(np.float64)
+
+        self.order.update(net, index)
+        self._init_level_connections(n_junctions=len(self.junction_ids))
+        self.build_count += 1
+
+        return self
+
+    def refresh(self, net, index):
+        """
+            Rebuild the kernel if the network topology, the flow directions or the valve states have changed.
+        """
+        if self.index_build_count != index.build_count:
+            return self.build(net, index)
+
+        self.order.update(net, index)
+        if self.order.build_count != self.order_build_count:
+            self._init_level_connections(n_junctions=len(self.junction_ids))
+
+        return self
+
+    def _init_level_connections(self, n_junctions):
+        """
+            Precompute the junctions and heat exchangers which are updated after each pipe level.
+        """
+        order = self.order
+        self.order_build_count = order.build_count
+        incidence = self.incidence.update(order, n_junctions)
+
+        self.level_connections = []
+        for level in order.levels:
+            # Junctions connected to the pipe outlets and their incoming pipes weighted in the temperature mix
+            targets = incidence.targets_of(level)
+
+            # Heat exchangers connected to the target junctions and pipes connected to their outlets
+            hexes = incidence.hexes_of(targets)
+            hex_pipe, hex_pipe_hex = incidence.hex_pipe[:, hexes].nonzero()
+
+            self.level_connections.append({'targets': targets,
+                                           'mix': incidence.mix[targets],
+                                           'hexes': hexes,
+                                           'hex_in': incidence.hex_in[hexes],
+                                           'hex_pipe_hex': hex_pipe_hex,
+                                           'hex_pipe': hex_pipe})
+
+    def run(self, net, historical_data, t):
+        """
+            Dynamic temperature flow simulation step of all pipes considering the thermal inertia in the network.
+        """
+        order = self.order
+        forward = order.pipe_direction > 0
+        hex_forward = order.hex_direction > 0
+
+        # Get current results of the network (result tables share the index of the component tables)
+        t_junction = _get_column(net.res_junction, 't_k')
+        t_from = _get_column(net.res_pipe, 't_from_k')
+        t_to = _get_column(net.res_pipe, 't_to_k')
+        mdot = np.abs(_get_column(net.res_pipe, 'mdot_from_kg_per_s'))
+        v_mean = np.abs(_get_column(net.res_pipe, 'v_mean_m_per_s'))
+        t_inlet = np.where(forward, t_from, t_to)
+        t_outlet = np.where(forward, t_to, t_from)
+
+        res_hex = _get_table(net, 'res_heat_exchanger')
+        hex_t_from = _get_column(res_hex, 't_from_k')
+        hex_t_to = _get_column(res_hex, 't_to_k')
+        hex_mdot = np.abs(_get_column(res_hex, 'mdot_from_kg_per_s'))
+        hex_qext = _get_column(_get_table(net, 'heat_exchanger'), 'qext_w')
+        hex_t_inlet = np.where(hex_forward, hex_t_from, hex_t_to)
+        hex_t_outlet = np.where(hex_forward, hex_t_to, hex_t_from)
+
+        # Prepare the pipe calculation of the time step
+        self._prepare_step(historical_data=historical_data,
+                           t=t,
+                           mdot=mdot,
+                           v_mean=v_mean)
+
+        for level, conn in zip(order.levels, self.level_connections):
+            # Inlet and outlet temperatures of the pipes
+            t_inlet[level], t_outlet[level] = self._calc_level(level=level,
+                                                               t_junction_in=t_junction[order.pipe_inlet[level]])
+
+            # Temperature mix at the connected junctions weighted by the incoming mass flows
+            t_junction[conn['targets']] = mix_temperatures(mix=conn['mix'],
+                                                           mdot=mdot,
+                                                           t_outlet=t_outlet)
+
+            # Return temperatures of the connected heat exchangers
+            h = conn['hexes']
+            if len(h):
+                forward_temp, return_temp = hex_return_temperatures(hex_in=conn['hex_in'],
+                                                                    t_junction=t_junction,
+                                                                    qext_w=hex_qext[h],
+                                                                    mdot=hex_mdot[h])
+                hex_t_inlet[h] = forward_temp
+                hex_t_outlet[h] = return_temp
+                t_junction[order.hex_outlet[h]] = return_temp
+                t_inlet[conn['hex_pipe']] = return_temp[conn['hex_pipe_hex']]
+
+        self._finish_step(t=t)
+
+        # Write results back to the network
+        net.res_pipe['t_from_k'] = np.where(forward, t_inlet, t_outlet)
+        net.res_pipe['t_to_k'] = np.where(forward, t_outlet, t_inlet)
+        net.res_junction['t_k'] = t_junction
+        if len(self.hex_ids):
+            net.res_heat_exchanger['t_from_k'] = np.where(hex_forward, hex_t_inlet, hex_t_outlet)
+            net.res_heat_exchanger['t_to_k'] = np.where(hex_forward, hex_t_outlet, hex_t_inlet)
+
+    def _prepare_step(self, historical_data, t, mdot, v_mean):
+        """
+            Get the historic inlet temperatures and the temperature decay of all pipes.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.t_delayed = historical_data['junction']['t_k'].interp(self.order.pipe_inlet, t - self.length_m / v_mean)
+            self.decay = np.exp(- self.decay_coeff / mdot)
+
+    def _calc_level(self, level, t_junction_in):
+        """
+            Dynamic temperature drop along the pipes of one level based on their historic inlet temperatures.
+        """
+        # Pipe inlet temperature (historic or current junction temperature)
+        t_in = self.t_delayed[level]
+        missing = np.isnan(t_in)
+        t_in[missing] = t_junction_in[missing]
+
+        # Dynamic temperature drop along the pipes
+        t_ambient = self.text_k[level]
+        t_out = t_ambient + (t_in - t_ambient) * self.decay[level]
+
+        return t_in, t_out
+
+    def _finish_step(self, t):
+        """
+            Finish the time step after all pipe levels are calculated.
+        """
+        pass
+
+
+def _get_column(table, column):
+    """
+        Get a float copy of a result column (NaN if the column does not exist yet).
+    """
+    if column in table:
+        return table[column].values.astype(np.float64)
+
+    return np.full(len(table), np.nan)
@@ -0,0 +1,172 @@
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from .constants import ISOBARIC_SPECIFIC_HEAT_WATER
+from .pipe_ordering import PipeFlowOrder, _get_table
+
+
+class ThermalNetworkSolver():
+    """
+        Implicit quasi-steady temperature flow calculation of the network as one sparse linear system of the junction
+        temperatures, driven by the current hydraulic results (mass flows and flow directions).
+
+        Each junction with incoming mass flows is described by the mass flow weighted mix of the branch outlet
+        temperatures (pipes: exponential temperature decay, opened valves: no losses, heat exchangers: heat extraction
+        qext_w). Junctions of external grids with fixed temperatures (type 't' or 'pt') and junctions without incoming
+        mass flows keep their temperatures. Flow loops are solved without iterations.
+
+        The sparse LU factorization of the system is reused as long as the mass flows and the flow order are unchanged
+        (only the right hand side is updated, e.g. for changed heat demands or ambient temperatures).
+    """
+
+    def __init__(self, order=None):
+        self.order = order if order is not None else PipeFlowOrder()
+        self.signature = None
+        self.factor = None
+        self.factorization_count = 0
+        self.solve_count = 0
+
+    def __repr__(self):
+        return f'ThermalNetworkSolver(factorizations={self.factorization_count}, solves={self.solve_count})'
+
+    def stats(self):
+        """
+            Counters of the sparse factorizations and linear solves.
+        """
+        return {'factorization_count': self.factorization_count,
+                'solve_count': self.solve_count}
+
+    def solve(self, net, index):
+        """
+            Calculate the temperatures of all junctions, pipes and heat exchangers and write them to the result tables.
+        """
+        Cp_w = ISOBARIC_SPECIFIC_HEAT_WATER
+        order = self.order.update(net, index)
+        n_junctions = len(net.junction)
+
+        # Branch coefficients (outlet temperature = coeff * inlet temperature + const)
+        pipe = net.pipe
+        pipe_mdot = _get_mass_flows(net, 'pipe')
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            loss_coeff = pipe['alpha_w_per_m2k'].values * np.pi * pipe['diameter_m'].values
+            pipe_coeff = np.exp(- loss_coeff * pipe['length_km'].values * 1000 / (Cp_w * pipe_mdot))
+            pipe_const = pipe['text_k'].values * (1 - pipe_coeff) - _get_qext(pipe) / (Cp_w * pipe_mdot)
+        pipe_coeff = np.nan_to_num(pipe_coeff, nan=0.)
+        pipe_const = np.where(pipe_mdot > 0, pipe_const, pipe['text_k'].values)
+
+        valve = _get_table(net, 'valve')
+        valve_mdot = _get_mass_flows(net, 'valve')[valve.index.get_indexer(order.valve_ids)]
+
+        heat_exchanger = _get_table(net, 'heat_exchanger')
+        hex_mdot = _get_mass_flows(net, 'heat_exchanger')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hex_const = np.where(hex_mdot > 0, - _get_qext(heat_exchanger) / (Cp_w * hex_mdot), 0.)
+
+        branch_inlet = np.concatenate([order.pipe_inlet, order.valve_inlet, order.hex_inlet]).astype(np.int64)
+        branch_outlet = np.concatenate([order.pipe_outlet, order.valve_outlet, order.hex_outlet]).astype(np.int64)
+        branch_mdot = np.concatenate([pipe_mdot, valve_mdot, hex_mdot])
+        branch_coeff = np.concatenate([pipe_coeff, np.ones(len(valve_mdot)), np.ones(len(hex_mdot))])
+        branch_const = np.concatenate([pipe_const, np.zeros(len(valve_mdot)), hex_const])
+        flowing = branch_mdot > 0
+
+        # Junctions with fixed temperatures (external grids) or without incoming mass flows
+        t_fixed = _get_fixed_temperatures(net)
+        inflow = np.bincount(branch_outlet[flowing], weights=branch_mdot[flowing], minlength=n_junctions)
+        fixed = ~np.isnan(t_fixed) | ~(inflow > 0)
+
+        # Factorize the system matrix if the mass flows have changed
+        signature = (id(order), order.build_count, branch_mdot.tobytes(), branch_coeff.tobytes(), fixed.tobytes())
+        if signature != self.signature:
+            self.factor = spla.splu(_build_system_matrix(n_junctions, branch_inlet, branch_outlet, branch_mdot,
+                                                         branch_coeff, inflow, fixed, flowing))
+            self.signature = signature
+            self.factorization_count += 1
+
+        # Right hand side of the system
+        rhs = np.bincount(branch_outlet[flowing], weights=(branch_mdot * branch_const)[flowing], minlength=n_junctions)
+        t_current = _get_current_temperatures(net)
+        rhs[fixed] = np.where(np.isnan(t_fixed), t_current, t_fixed)[fixed]
+
+        t_junction = self.factor.solve(rhs)
+        self.solve_count += 1
+
+        # Write results back to the network
+        pipe_in = t_junction[order.pipe_inlet]
+        pipe_out = np.where(pipe_mdot > 0, pipe_coeff * pipe_in + pipe_const, pipe_in)
+        forward = order.pipe_direction > 0
+        net.res_junction['t_k'] = t_junction
+        net.res_pipe['t_from_k'] = np.where(forward, pipe_in, pipe_out)
+        net.res_pipe['t_to_k'] = np.where(forward, pipe_out, pipe_in)
+        if len(heat_exchanger):
+            hex_in = t_junction[order.hex_inlet]
+            hex_out = hex_in + hex_const
+            hex_forward = order.hex_direction > 0
+            net.res_heat_exchanger['t_from_k'] = np.where(hex_forward, hex_in, hex_out)
+            net.res_heat_exchanger['t_to_k'] = np.where(hex_forward, hex_out, hex_in)
+
+        return t_junction
+
+
+def _build_system_matrix(n_junctions, branch_inlet, branch_outlet, branch_mdot, branch_coeff, inflow, fixed, flowing):
+    """
+        Build the sparse system matrix of the junction temperatures (CSC format for the LU factorization).
+    """
+    # Off-diagonal entries of the incoming branches of junctions without fixed temperatures
+    mask = flowing & ~fixed[branch_outlet]
+    rows = np.concatenate([branch_outlet[mask], np.arange(n_junctions)])
+    columns = np.concatenate([branch_inlet[mask], np.arange(n_junctions)])
+    data = np.concatenate([- (branch_mdot * branch_coeff)[mask], np.where(fixed, 1., inflow)])
+
+    return sp.csc_matrix((data, (rows, columns)), shape=(n_junctions, n_junctions))
+
+def _get_mass_flows(net, key):
+    """
+        Get the absolute mass flows of a branch component (zero for missing results or out of service components).
+    """
+    table = _get_table(net, key)
+    result = 'res_' + key
+    if result not in net or 'mdot_from_kg_per_s' not in net[result] or len(net[result]) != len(table):
+        return np.zeros(len(table))
+
+    mdot = np.nan_to_num(np.abs(net[result]['mdot_from_kg_per_s'].values.astype(np.float64)))
+    if 'in_service' in table:
+        mdot[~table['in_service'].values.astype(bool)] = 0.
+
+    return mdot
+
+def _get_qext(table):
+    """
+        Get the external heat extraction of a branch component in [W].
+    """
+    if 'qext_w' not in table:
+        return np.zeros(len(table))
+
+    return np.nan_to_num(table['qext_w'].values.astype(np.float64))
+
+def _get_fixed_temperatures(net):
+    """
+        Get the fixed junction temperatures of the external grids (NaN for all other junctions).
+    """
+    t_fixed = np.full(len(net.junction), np.nan)
+    ext_grid = _get_table(net, 'ext_grid')
+    if not len(ext_grid):
+        return t_fixed
+
+    active = ext_grid['type'].astype(str).str.contains('t').values
+    if 'in_service' in ext_grid:
+        active &= ext_grid['in_service'].values.astype(bool)
+    junctions = net.junction.index.get_indexer(ext_grid['junction'].values[active])
+    t_fixed[junctions] = ext_grid['t_k'].values[active]
+
+    return t_fixed
+
+def _get_current_temperatures(net):
+    """
+        Get the current junction temperatures (initial fluid temperatures if no results are available).
+    """
+    t_initial = net.junction['tfluid_k'].values.astype(np.float64)
+    if 'res_junction' in net and 't_k' in net.res_junction and len(net.res_junction) == len(net.junction):
+        t_current = net.res_junction['t_k'].values.astype(np.float64)
+        return np.where(np.isnan(t_current), t_initial, t_current)
+
+    return t_initial
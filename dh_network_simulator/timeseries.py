@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+from .constants import NORMAL_TEMPERATURE
+from .component_handle import ComponentHandle
+
+# Unit transforms of the profile columns to the units of the network component parameters
+UNIT_TRANSFORMS = {
+    'kW_to_W': lambda values: values * 1000,
+    'MW_to_W': lambda values: values * 1e6,
+    'degC_to_K': lambda values: values + NORMAL_TEMPERATURE,
+    'negate': lambda values: - values,
+}
+
+
+class TimeseriesRunner():
+    """
+        Batch time series driver of the network with resolved inputs and outputs.
+
+        The profile columns of the input map are transformed into the parameter units once, and all component names
+        are resolved to ComponentHandles (one per component type) once. Per time step, the inputs are written as
+        vectors and the outputs are read as vectors into a preallocated array.
+
+        input_map: Maps the profile columns to a target (type, name, parameter) or (type, name, parameter, transform)
+                   or to a list of targets. The transform is a callable or a key of UNIT_TRANSFORMS.
+        outputs: List of (type, name, parameter) or dict of output labels and (type, name, parameter).
+    """
+
+    def __init__(self, net, index, profiles, input_map, outputs, t_range=None):
+        self.profiles = get_profiles_frame(profiles)
+        self.t_range = np.asarray(self.profiles.index if t_range is None else list(t_range))
+
+        # Profile rows of the simulated time steps
+        self.rows = self.profiles.index.get_indexer(self.t_range)
+        if (self.rows < 0).any():
+            missing = self.t_range[self.rows < 0].tolist()
+            raise KeyError(f'Time steps {missing[:5]} cannot be found in the profiles.')
+
+        self.inputs = _resolve_inputs(net, index, self.profiles, input_map, self.rows)
+        self.labels, self.outputs = _resolve_outputs(net, index, outputs)
+        self.results = np.full((len(self.t_range), len(self.labels)), np.nan)
+
+    def __repr__(self):
+        n_inputs = sum([len(handle) for handle, _ in self.inputs])
+        return f'TimeseriesRunner(steps={len(self.t_range)}, inputs={n_inputs}, outputs={len(self.labels)})'
+
+    def set_inputs(self, net, step):
+        """
+            Write the transformed profile values of a time step to the network components.
+        """
+        for handle, values in self.inputs:
+            handle.set(net, values[step])
+
+    def get_outputs(self, net, step):
+        """
+            Read the outputs of a time step from the result tables and controllers into the results array.
+        """
+        for handle, columns in self.outputs:
+            self.results[step, columns] = handle.get(net)
+
+    def to_frame(self):
+        """
+            Get the results as DataFrame (time steps x outputs).
+        """
+        return pd.DataFrame(self.results, index=self.t_range, columns=self.labels)
+
+
+def get_profiles_frame(profiles):
+    """
+        Get the profiles as DataFrame (from a DataFrame, a pandapower DFData data source, a MemmapProfileData data source
+        or the path of a .csv file).
+    """
+    from pandapower.timeseries.data_sources.frame_data import DFData
+    from .io.profile_data import MemmapProfileData
+
+    if isinstance(profiles, DFData):
+        return profiles.df
+    if isinstance(profiles, MemmapProfileData):
+        return profiles.to_frame()
+    if isinstance(profiles, pd.DataFrame):
+        return profiles
+
+    return pd.read_csv(profiles, index_col=0)
+
+def get_transform(transform):
+    """
+        Get the unit transform of a profile column (callable or key of UNIT_TRANSFORMS).
+    """
+    if transform is None or callable(transform):
+        return transform
+    try:
+        return UNIT_TRANSFORMS[transform]
+    except KeyError:
+        raise KeyError(f"Unit transform '{transform}' does not exist. Available transforms: {list(UNIT_TRANSFORMS)}.")
+
+def _resolve_inputs(net, index, profiles, input_map, rows):
+    """
+        Resolve the targets of the input map to one handle per component type with the transformed profile values of
+        the simulated time steps (time steps x targets).
+    """
+    targets = {}
+    for profile_column, column_targets in input_map.items():
+        if profile_column not in profiles:
+            raise KeyError(f"Profile column '{profile_column}' cannot be found.")
+        values = profiles[profile_column].values[rows].astype(np.float64)
+
+        # Single target or list of targets
+        if isinstance(column_targets, tuple):
+            column_targets = [column_targets]
+        for target in column_targets:
+            type, name, parameter = target[:3]
+            transform = get_transform(target[3] if len(target) > 3 else None)
+            target_values = np.asarray(transform(values) if transform is not None else values, dtype=np.float64)
+            targets.setdefault(type, []).append((name, parameter, target_values))
+
+    inputs = []
+    for type, type_targets in targets.items():
+        names, parameters, values = zip(*type_targets)
+        handle = ComponentHandle(type, names, parameters, net=net, index=index)
+        inputs.append((handle, np.column_stack(values)))
+
+    return inputs
+
+def _resolve_outputs(net, index, outputs):
+    """
+        Resolve the outputs to one handle per component type with the columns of the outputs in the results array.
+    """
+    if not isinstance(outputs, dict):
+        outputs = {f'{name}.{parameter}': (type, name, parameter) for type, name, parameter in outputs}
+
+    targets = {}
+    for column, (type, name, parameter) in enumerate(outputs.values()):
+        targets.setdefault(type, []).append((name, parameter, column))
+
+    handles = []
+    for type, type_targets in targets.items():
+        names, parameters, columns = zip(*type_targets)
+        handles.append((ComponentHandle(type, names, parameters, net=net, index=index), np.array(columns)))
+
+    return list(outputs), handles
@@ -9,9 +9,11 @@ setup(
     author='Christopher W. Wild',
     author_email='cwowi@elektro.dtu.dk',
     description='A pipeflow simulation tool that complements pandapipes and enables static and dynamic heat transfer simulation in district heating systems.',
-    install_requires=["pandapipes>=0.3.0", "numpy", "pandas", "dataclasses", "simple_pid"],
+    install_requires=["pandapipes>=0.3.0", "numpy", "scipy", "pandas", "dataclasses", "simple_pid"],
     extras_require={"docs": ["numpydoc", "sphinx", "sphinxcontrib.bibtex"],
                     "plotting": ["matplotlib"],
+                    "arrow": ["pyarrow"],
+                    "mosaik": ["mosaik-api-v3"],
                     "test": ["pytest"]},
     python_requires='>=3, <4',
     packages=find_packages(),